@@ -1,14 +1,45 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse, Response, ORJSONResponse
+from typing import Optional
+import orjson
 import random
-from datetime import datetime, timedelta
-from app.services.kisSpotClient import KisSpotClient
-from app.services.kisClient import KisClient
-from app.crud.portfolio import read_future_balance, read_spot_balance
+import asyncio
+from datetime import date, datetime, timedelta
+from app.services.kisClient import get_kis_client
+from app.crud.portfolio import (
+    read_pnl_aggregate,
+    read_pnl_page,
+    read_cumulative_pnl_before,
+    stream_pnl_aggregate,
+)
+from app.crud.balance_snapshots import read_balance_snapshot_ohlc
+from app.services.snapshotRecorder import snapshot_recorder
+from app.services.livePnl import live_pnl
+from app.services.warmup import warmup
+from app.services.pnlInvalidation import pnl_invalidation_listener
+from app.database.connection import get_pool_stats
+from app.database.tables import AGGREGATE_ACCOUNT_ID
+from app.services.accounts import get_account, gather_accounts, resolve_account_ids
+from app.utils.token_cache import get_token_cache_stats
+from app.services.kisRateLimiter import get_rate_limiter_stats
+from app.services.kisTransport import get_kis_cache_stats
+from app.services.performanceMetrics import performance_engine, format_metrics
+from app.utils.cache import MISSING
+from app.utils.market_hours import now_kst
+from app.utils import metrics
+from app.utils.logger import get_logger, get_logger_stats
+from app.utils.pnl_cache import (
+    historical_pnl_cache,
+    live_pnl_cache,
+    get_pnl_cache_stats,
+)
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 router = APIRouter(tags=["general"])
 
 
@@ -16,79 +47,150 @@ def random_int(a, b):
     return random.randint(a, b)
 
 
-async def generate_daily_pnl(n):
+def _nth_weekday_back(day: datetime, n: int) -> datetime:
+    """day 를 포함해 과거로 n 번째 평일을 반환합니다."""
+    count = 0
+    while True:
+        if day.weekday() < 5:
+            count += 1
+            if count == n:
+                return day
+        day -= timedelta(days=1)
 
-    res = []
-    today = datetime.now()
 
-    # KIS API에서 데이터 가져오기
+# SSE 연결 유지용 heartbeat 간격(초)
+LIVE_PNL_HEARTBEAT = float(os.getenv("LIVE_PNL_HEARTBEAT", "15"))
+
+# /pnl 페이지 크기 기본값과 최대값
+PNL_PAGE_SIZE = int(os.getenv("PNL_PAGE_SIZE", "500"))
+PNL_PAGE_MAX = int(os.getenv("PNL_PAGE_MAX", "5000"))
+
+# 데이터 소스별 타임아웃(초)
+PNL_DB_TIMEOUT = float(os.getenv("PNL_DB_TIMEOUT", "5"))
+PNL_KIS_TIMEOUT = float(os.getenv("PNL_KIS_TIMEOUT", "3"))
+
+# /pnl/accounts 에서 동시에 조회하는 계좌 수 (커넥션 풀을 혼자 다 쓰지 않도록)
+PNL_ACCOUNT_CONCURRENCY = int(os.getenv("PNL_ACCOUNT_CONCURRENCY", "4"))
+
+
+async def _fetch_source(name: str, coro, timeout: float):
+    """
+    데이터 소스 하나를 타임아웃과 함께 조회합니다.
+    실패하면 예외를 전파하지 않고 None 을 반환하여 다른 소스에 영향을 주지 않습니다.
+    """
     try:
-        portfolio_start_date = (today - timedelta(days=n - 1)).strftime("%Y-%m-%d")
-        portfolio_end_date = today.strftime("%Y-%m-%d")
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        logger.warning("pnl.source_timeout", source=name, timeout=timeout)
+    except Exception as e:
+        logger.warning("pnl.source_failed", source=name, error=e)
+    return None
+
+
+async def _read_pnl_cached(start_date: str, end_date: str, granularity: str):
+    """
+    구간별 손익 이력을 캐시를 거쳐 조회합니다.
+    캐시는 적재 경로에서 해당 날짜가 쓰일 때 무효화됩니다.
+
+    Returns:
+        (bucket, stock_pnl, future_pnl) 튜플 목록
+    """
+    key = (
+        granularity,
+        datetime.strptime(start_date, "%Y-%m-%d").date(),
+        datetime.strptime(end_date, "%Y-%m-%d").date(),
+    )
+    cached = historical_pnl_cache.get(key)
+    if cached is not MISSING:
+        return cached
+
+    version = historical_pnl_cache.version
+    pnl_rows = await read_pnl_aggregate(start_date, end_date, granularity)
+    result = [
+        (row["bucket"], float(row["stock_pnl"]), float(row["future_pnl"]))
+        for row in pnl_rows
+    ]
+    historical_pnl_cache.set_if_unchanged(key, result, version)
+    return result
 
-        spot_output_data = await read_spot_balance(
-            portfolio_start_date, portfolio_end_date
-        )
 
-        future_output_data = await read_future_balance(
-            portfolio_start_date, portfolio_end_date
-        )
+async def _read_daily_pnl_maps(start_date: str, end_date: str):
+    """DB 에서 일별 현물/선물 손익 맵을 조회합니다."""
+    pnl_rows = await _read_pnl_cached(start_date, end_date, "day")
 
-        stock_pnl_map = {}
-        for item in spot_output_data:
-            trad_dt = item.get("trad_dt", "")
-            rlzt_pfls = item.get("rlzt_pfls", "0")
-            stock_pnl_map[str(trad_dt)] = float(rlzt_pfls) if rlzt_pfls else 0.0
-
-        future_pnl_map = {}
-        if future_output_data:
-            for item in future_output_data:
-                date = item.get("date")
-                futr_trad_pfls_amt = item.get("futr_trad_pfls_amt", 0)
-                future_pnl_map[str(date)] = (
-                    float(futr_trad_pfls_amt) if futr_trad_pfls_amt else 0.0
-                )
+    stock_pnl_map = {}
+    future_pnl_map = {}
+    for bucket, stock_pnl, future_pnl in pnl_rows:
+        stock_pnl_map[str(bucket)] = stock_pnl
+        future_pnl_map[str(bucket)] = future_pnl
+    return stock_pnl_map, future_pnl_map
 
-        # 환경변수 가져오기
-        app_key = os.getenv("NEXT_PUBLIC_KIS_SPOT_APP_KEY")
-        app_secret = os.getenv("NEXT_PUBLIC_KIS_SPOT_APP_SECRET")
-        cano = os.getenv("NEXT_PUBLIC_KIS_SPOT_CANO")
-        acnt_prdt_cd = os.getenv("NEXT_PUBLIC_KIS_ACNT_PRDT_CD")
-        aws_secret_id = os.getenv("AWS_SECRET_ID_SPOT")
-
-        spot_client = KisSpotClient(
-            app_key=app_key,
-            app_secret=app_secret,
-            cano=cano,
-            acnt_prdt_cd=acnt_prdt_cd,
-            aws_secret_id=aws_secret_id,
-        )
 
-        today_str = today.strftime("%Y-%m-%d")
+async def _cached_live(key: tuple, fetch):
+    """KIS 에서 가져온 오늘 손익을 짧은 TTL 로 캐시합니다. 실패한 결과는 캐시하지 않습니다."""
+    cached = live_pnl_cache.get(key)
+    if cached is not MISSING:
+        return cached
+    value = await fetch()
+    live_pnl_cache.set(key, value)
+    return value
 
-        today_spot_response = spot_client.get_spot_balance_daily_profit(
-            today.strftime("%Y%m%d"),
-            today.strftime("%Y%m%d"),
-        )
-        output1 = today_spot_response.get("output1", [])
-        if output1:
-            today_spot_pnl = output1[0]["rlzt_pfls"]
-            stock_pnl_map[today_str] = float(today_spot_pnl)
 
-        future_client = KisClient()
-        future_response = await future_client.get_futureoption_balance()
+async def _fetch_today_future_pnl():
+    """
+    KIS API 에서 선물 자격증명이 있는 전체 계좌의 오늘 선물 매매손익을 조회해 합산합니다.
+    이력이 전체 계좌 합산 행이므로 오늘 값도 같은 기준으로 맞춥니다.
+    한 계좌라도 실패하면 일부만 더한 값을 내지 않도록 예외를 전파합니다.
+    """
+    results = await gather_accounts("future", _fetch_account_future_pnl)
+    return sum(results.values())
 
-        output2 = future_response.get("output2", {})
-        today_future_pnl = output2.get("futr_trad_pfls_amt", 0)
-        future_pnl_map[today_str] = float(today_future_pnl)
 
-    except Exception as e:
-        print(f"KIS API 호출 실패: {e}")
-        stock_pnl_map = {}
-        future_pnl_map = {}
+async def _fetch_account_future_pnl(account) -> float:
+    future_response = await get_kis_client(**account.future).get_futureoption_balance()
+    output2 = future_response.get("output2", {})
+    return float(output2.get("futr_trad_pfls_amt", 0))
+
 
-    print("stock_pnl_map", stock_pnl_map)
-    print("future_pnl_map", future_pnl_map)
+async def generate_daily_pnl(n):
+    """
+    최근 n 영업일의 일별 손익을 반환합니다. 모든 값은 전체 계좌 합산 기준이며,
+    오늘 선물 손익은 선물 자격증명이 있는 모든 계좌의 KIS 실시간 값을 합산한 것입니다.
+    """
+    res = []
+    today = datetime.now()
+
+    portfolio_start_date = _nth_weekday_back(today, n).strftime("%Y-%m-%d")
+    portfolio_end_date = today.strftime("%Y-%m-%d")
+
+    # DB 이력(현물은 적재 파이프라인이 채움)과 오늘 선물(KIS)을 동시에 조회
+    # 소스별로 실패를 격리하여 KIS 호출이 실패해도 이력 데이터는 그대로 제공
+    history, today_future_pnl = await asyncio.gather(
+        _fetch_source(
+            "DB 손익 이력",
+            _read_daily_pnl_maps(portfolio_start_date, portfolio_end_date),
+            PNL_DB_TIMEOUT,
+        ),
+        _fetch_source(
+            "KIS 선물 당일손익(전체 계좌)",
+            _cached_live(("future", today.date()), _fetch_today_future_pnl),
+            PNL_KIS_TIMEOUT,
+        ),
+    )
+
+    stock_pnl_map, future_pnl_map = history if history is not None else ({}, {})
+
+    today_str = today.strftime("%Y-%m-%d")
+    if today_future_pnl is not None:
+        future_pnl_map[today_str] = today_future_pnl
+
+    logger.debug(
+        "pnl.daily_maps",
+        stock_days=len(stock_pnl_map),
+        future_days=len(future_pnl_map),
+        stock_pnl_map=stock_pnl_map,
+        future_pnl_map=future_pnl_map,
+    )
     count = 0
 
     while count < n:
@@ -118,67 +220,62 @@ async def generate_daily_pnl(n):
     return res
 
 
-async def generate_monthly_pnl():
+def _previous_period_start(period_start: date, granularity: str) -> date:
+    """주어진 구간 시작일의 직전 구간 시작일을 계산합니다."""
+    if granularity == "week":
+        return period_start - timedelta(days=7)
+    if granularity == "month":
+        return (period_start - timedelta(days=1)).replace(day=1)
+    return period_start.replace(year=period_start.year - 1)
+
+
+def _period_start(day: date, granularity: str) -> date:
+    """날짜가 속한 구간의 시작일을 계산합니다. (week 는 월요일 시작)"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+# 구간 단위별 응답 date 표기 형식
+PERIOD_LABEL_FORMATS = {"week": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+
+
+async def generate_period_pnl(granularity: str, n: int):
+    """
+    최근 n 개 구간(주/월/연)의 현물/선물 손익 합계를 최신 구간부터 반환합니다.
+    현재 구간은 구간 시작일부터 오늘까지를 합산합니다.
+    """
     res = []
-    today = datetime.now()
+    today = datetime.now().date()
 
-    # 12개월 동안의 데이터 생성
-    for i in range(10):
-        # 현재 월에서 i개월 전
-        if i == 0:
-            # 현재 월: 월 시작부터 오늘까지
-            month_start = today.replace(day=1)
-            month_end = today
-        else:
-            # 이전 월들: 전체 월
-            current_month = today.replace(day=1)
-            for _ in range(i):
-                current_month = (current_month - timedelta(days=1)).replace(day=1)
-            month_start = current_month
-            # 해당 월의 마지막 날 계산
-            if current_month.month == 12:
-                next_month = current_month.replace(year=current_month.year + 1, month=1)
-            else:
-                next_month = current_month.replace(month=current_month.month + 1)
-            month_end = next_month - timedelta(days=1)
-
-        # 해당 월의 모든 일별 데이터 가져오기
-        try:
-            start_date_str = month_start.strftime("%Y-%m-%d")
-            end_date_str = month_end.strftime("%Y-%m-%d")
-
-            # API/DB에서 데이터 가져오기
-            spot_output_data = await read_spot_balance(start_date_str, end_date_str)
-            future_output_data = await read_future_balance(start_date_str, end_date_str)
-
-            # 월별 합계 계산
-            monthly_stock_pnl = 0.0
-            monthly_future_pnl = 0.0
-
-            # 현물 PnL 합계
-            if spot_output_data:
-                for item in spot_output_data:
-                    rlzt_pfls = item.get("rlzt_pfls", "0")
-                    monthly_stock_pnl += float(rlzt_pfls) if rlzt_pfls else 0.0
-
-            # 선물 PnL 합계
-            if future_output_data:
-                for item in future_output_data:
-                    futr_trad_pfls_amt = item.get("futr_trad_pfls_amt", 0)
-                    monthly_future_pnl += (
-                        float(futr_trad_pfls_amt) if futr_trad_pfls_amt else 0.0
-                    )
-
-        except Exception as e:
-            print(f"월별 데이터 조회 실패 ({month_start.strftime('%Y-%m')}): {e}")
-            monthly_stock_pnl = 0.0
-            monthly_future_pnl = 0.0
+    period_starts = [_period_start(today, granularity)]
+    for _ in range(n - 1):
+        period_starts.append(_previous_period_start(period_starts[-1], granularity))
 
+    # 전체 기간을 한 번의 쿼리로 구간별 합산
+    try:
+        pnl_rows = await _read_pnl_cached(
+            period_starts[-1].strftime("%Y-%m-%d"),
+            today.strftime("%Y-%m-%d"),
+            granularity,
+        )
+        pnl_map = {
+            bucket: (stock_pnl, future_pnl)
+            for bucket, stock_pnl, future_pnl in pnl_rows
+        }
+    except Exception as e:
+        logger.warning("pnl.period_read_failed", granularity=granularity, error=e)
+        pnl_map = {}
+
+    for period_start in period_starts:
+        stock_pnl, future_pnl = pnl_map.get(period_start, (0.0, 0.0))
         item = {
-            "date": month_start.strftime("%Y-%m"),
-            "totalPnl": monthly_stock_pnl + monthly_future_pnl,
-            "stockPnl": monthly_stock_pnl,
-            "futurePnl": monthly_future_pnl,
+            "date": period_start.strftime(PERIOD_LABEL_FORMATS[granularity]),
+            "totalPnl": stock_pnl + future_pnl,
+            "stockPnl": stock_pnl,
+            "futurePnl": future_pnl,
             "tradeCount": 0,  # TODO: 거래 횟수 데이터 추가 필요
             "contangoCount": 0,  # TODO: 컨탱고 횟수 데이터 추가 필요
             "backCount": 0,  # TODO: 백워데이션 횟수 데이터 추가 필요
@@ -189,29 +286,368 @@ async def generate_monthly_pnl():
     return res
 
 
+async def generate_monthly_pnl():
+    return await generate_period_pnl("month", 10)
+
+
+def _cache_metrics():
+    """/metrics 조회 시점에 각 캐시의 적중/미스 수와 적중률, 커넥션 풀 크기를 모읍니다."""
+    caches = {
+        "kis_token": get_token_cache_stats(),
+        "kis_response": get_kis_cache_stats(),
+        "pnl_historical": historical_pnl_cache.stats(),
+        "pnl_live": live_pnl_cache.stats(),
+        "performance_metrics": performance_engine.stats(),
+    }
+    yield (
+        "cache_hits_total",
+        "counter",
+        "Cache hits by cache",
+        [({"cache": name}, s["hits"]) for name, s in caches.items()],
+    )
+    yield (
+        "cache_misses_total",
+        "counter",
+        "Cache misses by cache",
+        [({"cache": name}, s["misses"]) for name, s in caches.items()],
+    )
+    yield (
+        "cache_hit_ratio",
+        "gauge",
+        "Cache hit ratio since process start",
+        [({"cache": name}, s["hit_ratio"]) for name, s in caches.items()],
+    )
+
+    pool = get_pool_stats()
+    if "size" in pool:
+        yield (
+            "db_pool_connections",
+            "gauge",
+            "Pool connections by state",
+            [
+                ({"state": "idle"}, pool["idle"]),
+                ({"state": "in_use"}, pool["size"] - pool["idle"]),
+                ({"state": "max"}, pool["max_size"]),
+            ],
+        )
+
+
+def _logger_metrics():
+    stats = get_logger_stats()
+    yield ("log_records_written_total", "counter", "Log records written", [({}, stats["written"])])
+    yield (
+        "log_records_dropped_total",
+        "counter",
+        "Log records dropped because the queue was full",
+        [({}, stats["dropped"])],
+    )
+
+
+metrics.register_collector(_cache_metrics)
+metrics.register_collector(_logger_metrics)
+
+
 @router.get("/")
 async def root():
     return {"message": "Hello World"}
 
 
+@router.get("/health/live")
+async def get_liveness():
+    """프로세스가 요청을 처리할 수 있으면 200. (예열 여부와 무관)"""
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def get_readiness():
+    """예열이 끝나고 DB 풀이 열려 있을 때만 200, 그 전(또는 종료 중)에는 503."""
+    ready = warmup.ready and "size" in get_pool_stats()
+    return ORJSONResponse(
+        {
+            "status": "ready" if ready else "starting",
+            "warmup": warmup.stats(),
+            "pnl_invalidation": pnl_invalidation_listener.stats(),
+        },
+        status_code=200 if ready else 503,
+    )
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus 텍스트 형식 지표."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@router.get("/db/pool-stats")
+async def get_db_pool_stats():
+    return get_pool_stats()
+
+
+@router.get("/token-cache-stats")
+async def get_kis_token_cache_stats():
+    return get_token_cache_stats()
+
+
+@router.get("/kis-rate-limiter-stats")
+async def get_kis_rate_limiter_stats():
+    return get_rate_limiter_stats()
+
+
+@router.get("/kis-cache-stats")
+async def get_kis_cache_stats_endpoint():
+    return get_kis_cache_stats()
+
+
+@router.get("/pnl/cache-stats")
+async def get_pnl_cache_stats_endpoint():
+    return get_pnl_cache_stats()
+
+
+def _pnl_range_item(row) -> dict:
+    stock_pnl = float(row["stock_pnl"])
+    future_pnl = float(row["future_pnl"])
+    return {
+        "date": row["bucket"].isoformat(),
+        "totalPnl": stock_pnl + future_pnl,
+        "stockPnl": stock_pnl,
+        "futurePnl": future_pnl,
+        "cumulativePnl": float(row["cumulative_pnl"]),
+    }
+
+
+async def _stream_pnl_ndjson(rows):
+    async for row in rows:
+        yield orjson.dumps(_pnl_range_item(row)) + b"\n"
+
+
+@router.get("/pnl")
+async def get_pnl_range(
+    start_date: str,
+    end_date: str,
+    granularity: str = "day",
+    cursor: Optional[str] = None,
+    limit: int = PNL_PAGE_SIZE,
+    format: str = "json",
+    account_id: str = AGGREGATE_ACCOUNT_ID,
+):
+    """
+    임의 구간의 손익을 집계 단위별로 오래된 구간부터 조회합니다.
+
+    Args:
+        start_date: 시작 날짜 (YYYY-MM-DD 형식)
+        end_date: 종료 날짜 (YYYY-MM-DD 형식)
+        granularity: 집계 단위 (day, week, month, year)
+        cursor: 직전 응답의 next_cursor (다음 페이지 조회시)
+        limit: 페이지 크기 (최대 PNL_PAGE_MAX)
+        format: "json" 은 페이지 단위 응답, "ndjson" 은 구간 전체를 한 줄에 한 구간씩 스트리밍
+        account_id: 계좌 ID (기본값: 전체 계좌 합산 "*")
+    """
+    if account_id != AGGREGATE_ACCOUNT_ID:
+        get_account(account_id)
+    if format == "ndjson":
+        # 잘못된 인자는 스트리밍을 시작하기 전에 400 으로 응답
+        rows = stream_pnl_aggregate(start_date, end_date, granularity, account_id)
+        return StreamingResponse(
+            _stream_pnl_ndjson(rows),
+            media_type="application/x-ndjson",
+        )
+    if format != "json":
+        raise HTTPException(status_code=400, detail="Invalid format. Use json or ndjson")
+    if not 1 <= limit <= PNL_PAGE_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"limit must be between 1 and {PNL_PAGE_MAX}"
+        )
+
+    rows, next_cursor = await read_pnl_page(
+        start_date, end_date, granularity, cursor, limit, account_id
+    )
+    return {
+        "items": [_pnl_range_item(row) for row in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+def _sum_pnl_items(item_lists, base_cumulative: float) -> list:
+    """계좌별 구간 손익을 구간별로 합치고 기준 누적손익부터 누적손익을 이어 계산합니다."""
+    buckets = {}
+    for items in item_lists:
+        for item in items:
+            pnl = buckets.setdefault(item["date"], [0.0, 0.0])
+            pnl[0] += item["stockPnl"]
+            pnl[1] += item["futurePnl"]
+
+    cumulative = base_cumulative
+    result = []
+    for bucket in sorted(buckets):
+        stock_pnl, future_pnl = buckets[bucket]
+        cumulative += stock_pnl + future_pnl
+        result.append(
+            {
+                "date": bucket,
+                "totalPnl": stock_pnl + future_pnl,
+                "stockPnl": stock_pnl,
+                "futurePnl": future_pnl,
+                "cumulativePnl": cumulative,
+            }
+        )
+    return result
+
+
+@router.get("/pnl/accounts")
+async def get_pnl_by_account(
+    start_date: str,
+    end_date: str,
+    granularity: str = "day",
+    accounts: Optional[str] = None,
+):
+    """
+    여러 계좌의 구간 손익을 계좌별로 동시에 조회하고 합산 결과를 함께 반환합니다.
+
+    계좌별 조회는 PNL_ACCOUNT_CONCURRENCY 개까지 동시에 실행합니다. 전체 계좌를 조회하면
+    합산은 적재 시 미리 계산된 전체 합산 행(account_id = "*")을 읽고, 일부 계좌만 고르면
+    계좌별 결과를 합치고 누적손익은 구간 직전 누적손익부터 이어서 계산합니다.
+
+    Args:
+        start_date: 시작 날짜 (YYYY-MM-DD 형식)
+        end_date: 종료 날짜 (YYYY-MM-DD 형식)
+        granularity: 집계 단위 (day, week, month, year)
+        accounts: 콤마로 구분된 계좌 ID 목록 (없으면 전체 계좌)
+    """
+    account_ids = resolve_account_ids(accounts)
+    all_accounts = set(account_ids) == set(resolve_account_ids(None))
+    semaphore = asyncio.Semaphore(PNL_ACCOUNT_CONCURRENCY)
+
+    async def read(account_id: str):
+        async with semaphore:
+            return await read_pnl_aggregate(
+                start_date, end_date, granularity, account_id=account_id
+            )
+
+    results = await asyncio.gather(
+        *[read(account_id) for account_id in account_ids],
+        read(AGGREGATE_ACCOUNT_ID)
+        if all_accounts
+        else read_cumulative_pnl_before(start_date, account_ids),
+    )
+    per_account = {
+        account_id: [_pnl_range_item(row) for row in rows]
+        for account_id, rows in zip(account_ids, results)
+    }
+    if all_accounts:
+        aggregate = [_pnl_range_item(row) for row in results[-1]]
+    else:
+        aggregate = _sum_pnl_items(per_account.values(), results[-1])
+    return {"accounts": per_account, "aggregate": aggregate}
+
+
+@router.get("/pnl/intraday")
+async def get_intraday_pnl(
+    date: Optional[str] = None,
+    bucket_seconds: int = 300,
+    field: str = "futr_evlu_pfls_amt",
+    account_id: Optional[str] = None,
+):
+    """
+    장중 선물옵션 잔고 스냅샷을 구간별 OHLC(종가 = 구간 마지막 값)로 다운샘플링해 반환합니다.
+
+    Args:
+        date: 조회할 날짜 (YYYY-MM-DD 형식, 기본값: 오늘)
+        bucket_seconds: 구간 크기(초)
+        field: 잔고 컬럼 (예: futr_evlu_pfls_amt, evlu_pfls_amt_smtl, mgna_tota)
+        account_id: 계좌 ID (기본값: 시각별 전체 계좌 합계)
+    """
+    if account_id is not None:
+        get_account(account_id)
+    date = date or now_kst().strftime("%Y-%m-%d")
+    return await read_balance_snapshot_ohlc(date, bucket_seconds, field, account_id)
+
+
+@router.get("/pnl/intraday/recorder-stats")
+async def get_snapshot_recorder_stats():
+    return snapshot_recorder.stats()
+
+
+async def _live_pnl_events():
+    subscription = live_pnl.subscribe()
+    try:
+        while True:
+            try:
+                event, payload = await asyncio.wait_for(
+                    subscription.queue.get(), LIVE_PNL_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                # 프록시가 유휴 연결을 끊지 않도록 주석 줄 전송
+                yield b": ping\n\n"
+                continue
+            yield b"event: " + event.encode() + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+    finally:
+        live_pnl.unsubscribe(subscription)
+
+
+@router.get("/pnl/live")
+async def stream_live_pnl():
+    """
+    오늘 손익을 Server-Sent Events 로 스트리밍합니다.
+
+    연결 직후 snapshot 이벤트로 현재 값 전체를, 이후 delta 이벤트로 바뀐 필드만 보냅니다.
+    (date, totalPnl, updatedAt 은 항상 포함)
+    """
+    return StreamingResponse(
+        _live_pnl_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/pnl/live/stats")
+async def get_live_pnl_stats():
+    return live_pnl.stats()
+
+
 @router.get("/pnl/daily")
 async def get_daily_pnl():
     return await generate_daily_pnl(60)
 
 
+@router.get("/pnl/weekly")
+async def get_weekly_pnl():
+    return await generate_period_pnl("week", 12)
+
+
 @router.get("/pnl/monthly")
 async def get_monthly_pnl():
     return await generate_monthly_pnl()
 
 
+@router.get("/pnl/yearly")
+async def get_yearly_pnl():
+    return await generate_period_pnl("year", 5)
+
+
 @router.get("/performance_metrics")
-async def get_performance_metrics():
-    mock_analysis_metrics = [
-        {"label": "Total Return", "value": "20.00%"},
-        {"label": "CAGR(Annualized)", "value": "20.00%"},
-        {"label": "Max Drawdown", "value": "-10.00%"},
-        {"label": "Volatility", "value": "10.00%"},
-        {"label": "Sharpe Ratio", "value": "1.00"},
-    ]
+async def get_performance_metrics(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+):
+    """
+    저장된 일별 현물+선물 손익으로 성과 지표를 계산합니다.
+
+    Args:
+        start_date: 시작 날짜 (YYYY-MM-DD 형식, 없으면 처음부터)
+        end_date: 종료 날짜 (YYYY-MM-DD 형식, 없으면 마지막 적재일까지)
+    """
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Invalid date format. Use YYYY-MM-DD"
+        )
+
+    result = await performance_engine.get_metrics(start, end)
+    return format_metrics(result)
+
 
-    return mock_analysis_metrics
+@router.get("/performance_metrics/stats")
+async def get_performance_metrics_stats():
+    return performance_engine.stats()
@@ -1,41 +1,60 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from typing import Optional
 
-from app.services.kisClient import KisClient
-from app.services.kisSpotClient import KisSpotClient
+from app.database.tables import DEFAULT_ACCOUNT_ID
+from app.services.accounts import account_credentials, get_account
+from app.services.kisClient import get_kis_client
+from app.services.kisSpotClient import get_kis_spot_client
 from app.crud.daily_future_balance import (
     insert_daily_future_balance,
     read_daily_future_balance,
     delete_daily_future_balance,
 )
+from app.crud.daily_spot_balance import insert_daily_spot_balance
+from app.crud.backfill_jobs import read_backfill_job
+from app.crud.balance_export import stream_balance_export
+from app.crud.ingest_job_runs import read_job_runs
+from app.services.ingestScheduler import ingest_scheduler
+from app.services.backfillRunner import start_future_backfill
 
 router = APIRouter(prefix="/kis", tags=["kis"])
 
 
 @router.get("/spot/inquire-balance-daily-profit")
-def get_spot_inquire_balance_daily_profit_endpoint(
+async def get_spot_inquire_balance_daily_profit_endpoint(
     start_date: str,
     end_date: str,
+    ctx_area_fk100: str = "",  # 연속조회검색조건100
+    ctx_area_nk100: str = "",  # 연속조회키100
+    tr_cont: str = "",  # 연속조회 여부 (다음 페이지 조회시 "N")
     app_key: Optional[str] = None,
     app_secret: Optional[str] = None,
     domain: Optional[str] = None,
     cano: Optional[str] = None,
     acnt_prdt_cd: Optional[str] = None,
     aws_secret_id: Optional[str] = None,
+    account_id: str = DEFAULT_ACCOUNT_ID,
 ):
     """
     주문처리 후 영업일 기준 오늘 종료시점 종목별 손익 조회
     """
-    client = KisSpotClient(
-        app_key=app_key,
-        app_secret=app_secret,
-        domain=domain,
-        cano=cano,
-        acnt_prdt_cd=acnt_prdt_cd,
-        aws_secret_id=aws_secret_id,
+    client = get_kis_spot_client(
+        **account_credentials(
+            account_id,
+            "spot",
+            app_key=app_key,
+            app_secret=app_secret,
+            domain=domain,
+            cano=cano,
+            acnt_prdt_cd=acnt_prdt_cd,
+            aws_secret_id=aws_secret_id,
+        )
     )
 
-    return client.get_spot_balance_daily_profit(start_date, end_date)
+    return await client.get_spot_balance_daily_profit(
+        start_date, end_date, ctx_area_fk100, ctx_area_nk100, tr_cont
+    )
 
 
 @router.get("/futures/balance-settlement")
@@ -43,26 +62,32 @@ async def get_futures_balance_settlement_endpoint(
     inqr_dt: str,
     ctx_area_fk200: str = "",
     ctx_area_nk200: str = "",
+    tr_cont: str = "",
     app_key: Optional[str] = None,
     app_secret: Optional[str] = None,
     domain: Optional[str] = None,
     cano: Optional[str] = None,
     acnt_prdt_cd: Optional[str] = None,
     aws_secret_id: Optional[str] = None,
+    account_id: str = DEFAULT_ACCOUNT_ID,
 ):
     """
     선물옵션 잔고정산손익내역 조회
     """
-    client = KisClient(
-        app_key=app_key,
-        app_secret=app_secret,
-        domain=domain,
-        cano=cano,
-        acnt_prdt_cd=acnt_prdt_cd,
-        aws_secret_id=aws_secret_id,
+    client = get_kis_client(
+        **account_credentials(
+            account_id,
+            "future",
+            app_key=app_key,
+            app_secret=app_secret,
+            domain=domain,
+            cano=cano,
+            acnt_prdt_cd=acnt_prdt_cd,
+            aws_secret_id=aws_secret_id,
+        )
     )
     return await client.get_futures_balance_settlement(
-        inqr_dt, ctx_area_fk200, ctx_area_nk200
+        inqr_dt, ctx_area_fk200, ctx_area_nk200, tr_cont
     )
 
 
@@ -72,12 +97,14 @@ async def get_futureoption_balance_endpoint(
     excc_stat_cd: str = "2",  # 정산상태코드 (1: 정산, 2: 본정산)
     ctx_area_fk200: str = "",  # 연속조회검색조건200
     ctx_area_nk200: str = "",  # 연속조회키200
+    tr_cont: str = "",  # 연속조회 여부 (다음 페이지 조회시 "N")
     app_key: Optional[str] = None,
     app_secret: Optional[str] = None,
     domain: Optional[str] = None,
     cano: Optional[str] = None,
     acnt_prdt_cd: Optional[str] = None,
     aws_secret_id: Optional[str] = None,
+    account_id: str = DEFAULT_ACCOUNT_ID,
 ):
     """
     선물옵션 잔고현황 조회
@@ -87,17 +114,22 @@ async def get_futureoption_balance_endpoint(
     - excc_stat_cd: 정산상태코드 (1: 정산, 2: 본정산)
     - ctx_area_fk200: 연속조회검색조건200 (다음페이지 조회시 이전 응답값 사용)
     - ctx_area_nk200: 연속조회키200 (다음페이지 조회시 이전 응답값 사용)
+    - tr_cont: 연속조회 여부 (다음페이지 조회시 "N", 응답의 tr_cont 가 F/M 이면 다음 페이지 있음)
     """
-    client = KisClient(
-        app_key=app_key,
-        app_secret=app_secret,
-        domain=domain,
-        cano=cano,
-        acnt_prdt_cd=acnt_prdt_cd,
-        aws_secret_id=aws_secret_id,
+    client = get_kis_client(
+        **account_credentials(
+            account_id,
+            "future",
+            app_key=app_key,
+            app_secret=app_secret,
+            domain=domain,
+            cano=cano,
+            acnt_prdt_cd=acnt_prdt_cd,
+            aws_secret_id=aws_secret_id,
+        )
     )
     return await client.get_futureoption_balance(
-        mgna_dvsn, excc_stat_cd, ctx_area_fk200, ctx_area_nk200
+        mgna_dvsn, excc_stat_cd, ctx_area_fk200, ctx_area_nk200, tr_cont
     )
 
 
@@ -109,6 +141,7 @@ async def create_daily_future_balance(
     cano: Optional[str] = None,
     acnt_prdt_cd: Optional[str] = None,
     aws_secret_id: Optional[str] = None,
+    account_id: str = DEFAULT_ACCOUNT_ID,
 ):
     """
     특정 날짜의 선물옵션 잔고 데이터를 KIS API에서 가져와서 daily_future_balance_kis 테이블에 삽입합니다.
@@ -120,10 +153,141 @@ async def create_daily_future_balance(
         cano: 계좌번호
         acnt_prdt_cd: 계좌상품코드
         aws_secret_id: AWS 시크릿 ID
+        account_id: 계좌 ID (넘기지 않은 자격증명은 이 계좌의 자격증명 사용)
 
     Returns:
         삽입된 데이터
     """
     return await insert_daily_future_balance(
-        app_key, app_secret, domain, cano, acnt_prdt_cd, aws_secret_id
+        app_key, app_secret, domain, cano, acnt_prdt_cd, aws_secret_id, account_id
+    )
+
+
+@router.post("/daily-spot-balance")
+async def create_daily_spot_balance(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    app_key: Optional[str] = None,
+    app_secret: Optional[str] = None,
+    domain: Optional[str] = None,
+    cano: Optional[str] = None,
+    acnt_prdt_cd: Optional[str] = None,
+    aws_secret_id: Optional[str] = None,
+    account_id: str = DEFAULT_ACCOUNT_ID,
+):
+    """
+    기간별 현물 일별 손익을 KIS API에서 가져와서 daily_spot_balance_kis 테이블에 삽입합니다.
+
+    Args:
+        start_date: 시작 날짜 (YYYY-MM-DD 형식, 기본값: 오늘)
+        end_date: 종료 날짜 (YYYY-MM-DD 형식, 기본값: start_date)
+        account_id: 계좌 ID (넘기지 않은 자격증명은 이 계좌의 현물 자격증명 사용)
+
+    Returns:
+        적재 결과 (계좌, 기간, 적재된 행 수)
+    """
+    return await insert_daily_spot_balance(
+        start_date,
+        end_date,
+        app_key,
+        app_secret,
+        domain,
+        cano,
+        acnt_prdt_cd,
+        aws_secret_id,
+        account_id,
+    )
+
+
+@router.post("/daily-future-balance/backfill")
+async def backfill_daily_future_balance_endpoint(
+    start_date: str,
+    end_date: str,
+    app_key: Optional[str] = None,
+    app_secret: Optional[str] = None,
+    domain: Optional[str] = None,
+    cano: Optional[str] = None,
+    acnt_prdt_cd: Optional[str] = None,
+    aws_secret_id: Optional[str] = None,
+    account_id: str = DEFAULT_ACCOUNT_ID,
+):
+    """
+    기간 내 영업일별 선물옵션 잔고정산손익을 KIS API에서 가져와 daily_future_balance_kis 테이블을 채웁니다.
+    작업은 백그라운드로 실행되며, 같은 계좌/구간으로 다시 호출하면 중단된 지점부터 이어서 실행합니다.
+
+    Args:
+        start_date: 시작 날짜 (YYYY-MM-DD 형식)
+        end_date: 종료 날짜 (YYYY-MM-DD 형식)
+        account_id: 계좌 ID
+
+    Returns:
+        백필 작업 정보 (진행 상황은 GET /kis/backfill-jobs/{job_id})
+    """
+    return await start_future_backfill(
+        start_date,
+        end_date,
+        account_id,
+        app_key=app_key,
+        app_secret=app_secret,
+        domain=domain,
+        cano=cano,
+        acnt_prdt_cd=acnt_prdt_cd,
+        aws_secret_id=aws_secret_id,
+    )
+
+
+@router.get("/backfill-jobs/{job_id}")
+async def get_backfill_job_endpoint(job_id: int):
+    """
+    백필 작업의 진행 상황을 조회합니다.
+    """
+    return await read_backfill_job(job_id)
+
+
+@router.get("/ingest-jobs")
+async def get_ingest_jobs(job_name: Optional[str] = None, limit: int = 20):
+    """
+    내장 적재 스케줄러 상태와 최근 실행 기록(소요시간, 결과)을 조회합니다.
+
+    Args:
+        job_name: daily_future_balance 또는 daily_spot_balance (없으면 전체)
+        limit: 조회할 실행 기록 수
+    """
+    return {
+        "scheduler": ingest_scheduler.stats(),
+        "runs": await read_job_runs(job_name, min(max(limit, 1), 200)),
+    }
+
+
+_EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@router.get("/export/{table}")
+async def export_balance_table(
+    table: str,
+    start_date: str,
+    end_date: str,
+    format: str = "csv",
+    account_id: str = DEFAULT_ACCOUNT_ID,
+):
+    """
+    원본 잔고 테이블의 구간 데이터를 CSV 또는 Parquet 파일로 스트리밍합니다.
+
+    Args:
+        table: daily_future_balance_kis 또는 daily_spot_balance_kis
+        start_date: 시작 날짜 (YYYY-MM-DD 형식)
+        end_date: 종료 날짜 (YYYY-MM-DD 형식)
+        format: csv 또는 parquet
+        account_id: 계좌 ID
+    """
+    get_account(account_id)
+    chunks = stream_balance_export(table, start_date, end_date, format, account_id)
+    filename = f"{table}_{account_id}_{start_date}_{end_date}.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
@@ -0,0 +1,32 @@
+"""
+기존(단일 계좌) 잔고 테이블과 pnl_rollup 을 계좌별 스키마로 이전합니다.
+
+기존 행은 기본 계좌(KIS_DEFAULT_ACCOUNT_ID)로 옮기고, 날짜 단일 유니크 제약과 완전히 같은 중복 행을
+삭제한 뒤 (account_id, 날짜) 유니크 인덱스를 만듭니다. 기존 pnl_rollup 은 지우고 원천 테이블로부터
+다시 계산합니다. 앱 시작 시에는 이 작업을 하지 않으므로 배포 전에 한 번 실행합니다.
+
+사용법:
+    python -m app.commands.migrate_account_schema
+"""
+import asyncio
+
+from app.database.connection import init_db_pool, close_db_pool
+from app.database.schema import migrate_account_schema
+from app.crud.pnl_rollup import ensure_pnl_rollup
+
+
+async def main() -> None:
+    await init_db_pool()
+    try:
+        migrated = await migrate_account_schema()
+        if not migrated:
+            print("계좌별 스키마 이전: 이전할 테이블 없음")
+            return
+        await ensure_pnl_rollup()
+        print(f"계좌별 스키마 이전 완료: {', '.join(migrated)}")
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
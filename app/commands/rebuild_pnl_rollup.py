@@ -0,0 +1,26 @@
+"""
+pnl_rollup 테이블을 원천 테이블(daily_spot_balance_kis, daily_future_balance_kis)로부터
+일괄 재계산합니다.
+
+사용법:
+    python -m app.commands.rebuild_pnl_rollup
+"""
+import asyncio
+
+from app.database.connection import init_db_pool, close_db_pool
+from app.database.schema import ensure_schema
+from app.crud.pnl_rollup import rebuild_pnl_rollup
+
+
+async def main() -> None:
+    await init_db_pool()
+    try:
+        await ensure_schema()
+        count = await rebuild_pnl_rollup()
+        print(f"pnl_rollup 재계산 완료: 일별 {count}건")
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+from datetime import date
+from typing import Optional, Dict, Any
+
+import asyncpg
+from fastapi import HTTPException
+
+from app.database.connection import get_db_connection
+from app.database.tables import DEFAULT_ACCOUNT_ID
+
+# 백필 작업 점유용 advisory lock 의 첫 번째 키 (두 번째 키는 작업 ID).
+# 두 정수 키 공간은 SCHEMA_LOCK_KEY 같은 단일 bigint 키와 겹치지 않음
+BACKFILL_LOCK_CLASS = 7_301_200
+
+
+def _job_to_dict(row) -> Dict[str, Any]:
+    """backfill_jobs 레코드를 응답용 딕셔너리로 변환합니다."""
+    result = {}
+    for column in row.keys():
+        value = row[column]
+        if isinstance(value, date):
+            result[column] = value.isoformat()
+        else:
+            result[column] = value
+    total = row["total_days"]
+    result["progress"] = row["completed_days"] / total if total else 1.0
+    return result
+
+
+async def create_or_resume_backfill_job(
+    job_type: str,
+    start_date: date,
+    end_date: date,
+    total_days: int,
+    account_id: str = DEFAULT_ACCOUNT_ID,
+) -> Dict[str, Any]:
+    """
+    같은 종류/계좌/구간의 미완료 작업이 있으면 이어서 실행하도록 반환하고, 없으면 새로 만듭니다.
+
+    Args:
+        job_type: 작업 종류 (예: daily_future_balance)
+        start_date: 시작 날짜
+        end_date: 종료 날짜
+        total_days: 처리할 영업일 수
+        account_id: 계좌 ID
+
+    Returns:
+        작업 딕셔너리
+    """
+    async with get_db_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            UPDATE backfill_jobs
+            SET status = 'running', error = NULL, updated_at = now()
+            WHERE id = (
+                SELECT id FROM backfill_jobs
+                WHERE job_type = $1 AND start_date = $2 AND end_date = $3
+                  AND account_id = $4 AND status <> 'completed'
+                ORDER BY id DESC
+                LIMIT 1
+            )
+            RETURNING *
+            """,
+            job_type,
+            start_date,
+            end_date,
+            account_id,
+        )
+        if row is None:
+            row = await conn.fetchrow(
+                """
+                INSERT INTO backfill_jobs
+                    (job_type, start_date, end_date, total_days, account_id)
+                VALUES ($1, $2, $3, $4, $5)
+                RETURNING *
+                """,
+                job_type,
+                start_date,
+                end_date,
+                total_days,
+                account_id,
+            )
+        return _job_to_dict(row)
+
+
+async def read_backfill_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """백필 작업의 진행 상황을 조회합니다."""
+    async with get_db_connection() as conn:
+        row = await conn.fetchrow("SELECT * FROM backfill_jobs WHERE id = $1", job_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Backfill job {job_id} not found")
+    return _job_to_dict(row)
+
+
+async def claim_backfill_job(
+    conn: asyncpg.Connection, job_id: int, wait: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    작업을 이 연결(세션)이 점유하고, 아직 끝나지 않았으면 running 으로 바꿔 최신 상태를 반환합니다.
+
+    점유는 세션 단위 advisory lock 이라 여러 워커/레플리카 중 한 곳에서만 실행되며,
+    프로세스가 죽어 연결이 끊기면 자동으로 풀리므로 다른 프로세스가 이어서 실행할 수 있습니다.
+    점유한 뒤에는 반드시 release_backfill_job 으로 풀어야 합니다.
+
+    Args:
+        conn: 작업이 끝날 때까지 쥐고 있을 DB 연결
+        job_id: backfill_jobs 작업 ID
+        wait: True 면 다른 곳에서 실행 중일 때 끝날 때까지 기다림
+
+    Returns:
+        작업 딕셔너리. 다른 곳에서 실행 중이면(wait=False) None.
+        이미 완료된 작업이면 점유를 풀고 완료 상태를 반환
+    """
+    if wait:
+        await conn.execute(
+            "SELECT pg_advisory_lock($1, $2)", BACKFILL_LOCK_CLASS, job_id
+        )
+    elif not await conn.fetchval(
+        "SELECT pg_try_advisory_lock($1, $2)", BACKFILL_LOCK_CLASS, job_id
+    ):
+        return None
+
+    # 점유를 기다리는 사이 다른 프로세스가 진행했을 수 있으므로 다시 읽음
+    row = await conn.fetchrow(
+        """
+        UPDATE backfill_jobs
+        SET status = 'running', error = NULL, updated_at = now()
+        WHERE id = $1 AND status <> 'completed'
+        RETURNING *
+        """,
+        job_id,
+    )
+    if row is None:
+        await release_backfill_job(conn, job_id)
+        row = await conn.fetchrow("SELECT * FROM backfill_jobs WHERE id = $1", job_id)
+    return _job_to_dict(row)
+
+
+async def release_backfill_job(conn: asyncpg.Connection, job_id: int) -> None:
+    """claim_backfill_job 으로 점유한 작업을 풉니다."""
+    await conn.execute(
+        "SELECT pg_advisory_unlock($1, $2)", BACKFILL_LOCK_CLASS, job_id
+    )
+
+
+async def update_backfill_progress(
+    conn: asyncpg.Connection,
+    job_id: int,
+    last_completed_date: date,
+    completed_days: int,
+    written_rows: int,
+) -> None:
+    """
+    한 배치가 끝났음을 기록합니다. 배치 쓰기와 같은 트랜잭션에서 호출해야
+    중단 후 재개할 때 같은 날짜를 건너뛰거나 중복 집계하지 않습니다.
+    """
+    await conn.execute(
+        """
+        UPDATE backfill_jobs
+        SET last_completed_date = $2,
+            completed_days = completed_days + $3,
+            written_rows = written_rows + $4,
+            updated_at = now()
+        WHERE id = $1
+        """,
+        job_id,
+        last_completed_date,
+        completed_days,
+        written_rows,
+    )
+
+
+async def finish_backfill_job(
+    job_id: int, status: str, error: Optional[str] = None
+) -> None:
+    """백필 작업의 최종 상태(completed/failed)를 기록합니다."""
+    async with get_db_connection() as conn:
+        await conn.execute(
+            """
+            UPDATE backfill_jobs
+            SET status = $2, error = $3, updated_at = now()
+            WHERE id = $1
+            """,
+            job_id,
+            status,
+            error,
+        )
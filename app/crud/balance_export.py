@@ -0,0 +1,219 @@
+import io
+import os
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, Tuple
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+from app.database.connection import get_db_connection
+from app.database.tables import DEFAULT_ACCOUNT_ID
+
+load_dotenv()
+
+# 내보낼 수 있는 원본 잔고 테이블과 날짜 컬럼
+EXPORT_TABLES = {
+    "daily_future_balance_kis": "date",
+    "daily_spot_balance_kis": "trad_dt",
+}
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Parquet row group 하나에 담는 행 수 (서버 측 커서에서 한 번에 읽는 단위)
+EXPORT_PARQUET_BATCH = int(os.getenv("EXPORT_PARQUET_BATCH", "5000"))
+
+# COPY 출력 청크를 보관하는 대기열 크기. 클라이언트가 느리면 COPY 도 함께 멈춤
+EXPORT_QUEUE_SIZE = int(os.getenv("EXPORT_QUEUE_SIZE", "16"))
+
+_DONE = object()
+
+
+def _export_query(
+    table: str, start_date: str, end_date: str, account_id: str
+) -> Tuple[str, tuple]:
+    """테이블 이름을 검증하고 구간 조회 쿼리와 인자를 만듭니다."""
+    date_column = EXPORT_TABLES.get(table)
+    if date_column is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid table. Use one of {', '.join(EXPORT_TABLES)}",
+        )
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Invalid date format. Use YYYY-MM-DD"
+        )
+
+    query = f"""
+    SELECT * FROM {table}
+    WHERE account_id = $3 AND {date_column} BETWEEN $1 AND $2
+    ORDER BY {date_column}
+    """
+    return query, (start, end, account_id)
+
+
+def stream_balance_export(
+    table: str,
+    start_date: str,
+    end_date: str,
+    format: str = "csv",
+    account_id: str = DEFAULT_ACCOUNT_ID,
+) -> AsyncIterator[bytes]:
+    """
+    원본 잔고 테이블의 구간 데이터를 CSV 또는 Parquet 바이트 청크로 내보냅니다.
+
+    CSV 는 COPY ... TO STDOUT 출력을, Parquet 는 서버 측 커서로 읽은 배치를
+    row group 단위로 바로 흘려보내므로 수년 치 구간도 API 프로세스에 전부 쌓이지 않습니다.
+    인자 검증은 호출 즉시 수행되어 응답을 시작하기 전에 400 을 낼 수 있습니다.
+
+    Args:
+        table: daily_future_balance_kis 또는 daily_spot_balance_kis
+        start_date: 시작 날짜 (YYYY-MM-DD 형식)
+        end_date: 종료 날짜 (YYYY-MM-DD 형식)
+        format: csv 또는 parquet
+        account_id: 계좌 ID
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Use one of {', '.join(EXPORT_FORMATS)}",
+        )
+    query, args = _export_query(table, start_date, end_date, account_id)
+    if format == "csv":
+        return _stream_csv(query, args)
+    return _stream_parquet(query, args, _import_pyarrow())
+
+
+async def _stream_csv(query: str, args: tuple) -> AsyncIterator[bytes]:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=EXPORT_QUEUE_SIZE)
+
+    async def copy() -> None:
+        # 종료 신호는 정상 종료나 오류일 때만 보냄. 취소(소비자 중단)된 경우에 보내면
+        # 아무도 꺼내지 않는 꽉 찬 대기열에서 영원히 멈추므로 그대로 끝냄
+        try:
+            async with get_db_connection() as conn:
+                await conn.copy_from_query(
+                    query, *args, output=queue.put, format="csv", header=True
+                )
+        except Exception:
+            await queue.put(_DONE)
+            raise
+        await queue.put(_DONE)
+
+    task = asyncio.create_task(copy())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is _DONE:
+                break
+            yield bytes(chunk)
+        # COPY 중 발생한 오류를 전파
+        await task
+    finally:
+        # 클라이언트가 중간에 끊으면 COPY 도 중단하고, 커넥션이 풀로 돌아갈 때까지 기다림
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise HTTPException(
+            status_code=501, detail="Parquet export requires pyarrow to be installed"
+        )
+    return pyarrow
+
+
+# PostgreSQL 타입 이름 -> Arrow 타입 (NUMERIC 은 분석용으로 float64 로 내보냄)
+_ARROW_TYPES = {
+    "int2": "int16",
+    "int4": "int32",
+    "int8": "int64",
+    "float4": "float32",
+    "float8": "float64",
+    "numeric": "float64",
+    "bool": "bool_",
+    "date": "date32",
+    "text": "string",
+    "varchar": "string",
+    "bpchar": "string",
+}
+
+
+def _arrow_schema(pa, attributes):
+    fields = []
+    for attr in attributes:
+        type_name = attr.type.name
+        if type_name in ("timestamp", "timestamptz"):
+            arrow_type = pa.timestamp(
+                "us", tz="UTC" if type_name == "timestamptz" else None
+            )
+        else:
+            arrow_type = getattr(pa, _ARROW_TYPES.get(type_name, "string"))()
+        fields.append(pa.field(attr.name, arrow_type))
+    return pa.schema(fields)
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter 출력을 모아 두었다가 꺼내 가는 파일 객체. 위치는 누적 기준."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _stream_parquet(query: str, args: tuple, pa) -> AsyncIterator[bytes]:
+    async with get_db_connection() as conn:
+        statement = await conn.prepare(query)
+        schema = _arrow_schema(pa, statement.get_attributes())
+        converters = [
+            float if field.type == pa.float64() else None for field in schema
+        ]
+
+        sink = _ChunkSink()
+        writer = pa.parquet.ParquetWriter(sink, schema)
+        # 클라이언트가 끊거나 조회/변환이 실패해도 writer 는 항상 닫음
+        try:
+            # asyncpg 커서는 트랜잭션 안에서만 사용할 수 있음
+            async with conn.transaction(readonly=True):
+                cursor = await statement.cursor(*args)
+                while True:
+                    rows = await cursor.fetch(EXPORT_PARQUET_BATCH)
+                    if not rows:
+                        break
+                    columns = [
+                        pa.array(
+                            [
+                                row[i] if convert is None or row[i] is None else convert(row[i])
+                                for row in rows
+                            ],
+                            type=field.type,
+                        )
+                        for i, (field, convert) in enumerate(zip(schema, converters))
+                    ]
+                    writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+                    yield sink.drain()
+        finally:
+            writer.close()
+        # 정상 종료일 때만 footer 를 내보냄
+        yield sink.drain()
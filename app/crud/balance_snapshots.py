@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Sequence
+from fastapi import HTTPException
+
+from app.database.connection import get_db_connection
+from app.database.tables import FUTURE_SNAPSHOT_TABLE
+from app.utils.market_hours import KST
+
+# 다운샘플링 구간 크기(초) 허용 범위
+MIN_BUCKET_SECONDS = 10
+MAX_BUCKET_SECONDS = 86400
+
+# 시각별로 계좌 합계를 먼저 구한 뒤($4 가 NULL 이면 전체 계좌) 구간별 OHLC 로 다운샘플링
+_OHLC_QUERY = """
+WITH ticks AS (
+    SELECT captured_at, sum({field}) AS value
+    FROM future_balance_snapshots
+    WHERE captured_at >= $1 AND captured_at < $2
+      AND ($4::text IS NULL OR account_id = $4)
+    GROUP BY captured_at
+)
+SELECT date_bin(make_interval(secs => $3), captured_at, $1) AS bucket,
+       (array_agg(value ORDER BY captured_at))[1] AS open,
+       max(value) AS high,
+       min(value) AS low,
+       (array_agg(value ORDER BY captured_at DESC))[1] AS close,
+       count(*) AS samples
+FROM ticks
+GROUP BY bucket
+ORDER BY bucket
+"""
+
+
+async def insert_balance_snapshots(records: Sequence[tuple]) -> None:
+    """장중 잔고 스냅샷을 한 번에 upsert 합니다. (같은 계좌·시각은 마지막 값으로 덮어씀)"""
+    async with get_db_connection() as conn:
+        await conn.executemany(FUTURE_SNAPSHOT_TABLE.upsert_sql, records)
+
+
+async def read_balance_snapshot_ohlc(
+    date: str,
+    bucket_seconds: int = 300,
+    field: str = "futr_evlu_pfls_amt",
+    account_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    하루치 장중 스냅샷을 구간별 시가/고가/저가/종가(마지막 값)로 다운샘플링합니다.
+
+    Args:
+        date: 조회할 날짜 (YYYY-MM-DD 형식)
+        bucket_seconds: 구간 크기(초)
+        field: 집계할 잔고 컬럼 (예: futr_evlu_pfls_amt, mgna_tota)
+        account_id: 계좌 ID (None 이면 시각별 전체 계좌 합계)
+
+    Returns:
+        time, open, high, low, close, samples 를 가진 딕셔너리 목록 (시간 오름차순)
+    """
+    if field not in FUTURE_SNAPSHOT_TABLE.value_columns:
+        raise HTTPException(status_code=400, detail=f"Invalid field: {field}")
+    if not MIN_BUCKET_SECONDS <= bucket_seconds <= MAX_BUCKET_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"bucket_seconds must be between {MIN_BUCKET_SECONDS} and {MAX_BUCKET_SECONDS}",
+        )
+    try:
+        day = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=KST)
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Invalid date format. Use YYYY-MM-DD"
+        )
+
+    async with get_db_connection() as conn:
+        rows = await conn.fetch(
+            _OHLC_QUERY.format(field=field),
+            day,
+            day + timedelta(days=1),
+            float(bucket_seconds),
+            account_id,
+        )
+
+    return [
+        {
+            "time": row["bucket"].astimezone(KST).isoformat(),
+            "open": float(row["open"]),
+            "high": float(row["high"]),
+            "low": float(row["low"]),
+            "close": float(row["close"]),
+            "samples": row["samples"],
+        }
+        for row in rows
+    ]
@@ -1,14 +1,23 @@
-from datetime import datetime
-from decimal import Decimal
-from typing import Optional, Dict, Any
+import asyncio
+from datetime import date, datetime
+from typing import Optional, Dict, Any, List
 from fastapi import HTTPException
 
 from app.database.connection import get_db_connection
-from app.services.kisClient import KisClient
+from app.database.tables import FUTURE_BALANCE_TABLE, DEFAULT_ACCOUNT_ID
+from app.services.accounts import account_credentials
+from app.services.kisClient import get_kis_client
+from app.services.kisRateLimiter import kis_priority, PRIORITY_INGEST
+from app.crud.pnl_rollup import refresh_pnl_rollup
+from app.crud.backfill_jobs import update_backfill_progress
+from app.utils.pnl_cache import invalidate_pnl_dates
+from app.utils.logger import get_logger
 from datetime import timezone, timedelta
 
 KST = timezone(timedelta(hours=9))
 
+logger = get_logger(__name__)
+
 
 async def insert_daily_future_balance(
     app_key: Optional[str] = None,
@@ -16,7 +25,8 @@ async def insert_daily_future_balance(
     domain: Optional[str] = None,
     cano: Optional[str] = None,
     acnt_prdt_cd: Optional[str] = None,
-    aws_secret_id: Optional[str] = None
+    aws_secret_id: Optional[str] = None,
+    account_id: str = DEFAULT_ACCOUNT_ID,
 ) -> Dict[str, Any]:
     """
     특정 날짜의 선물옵션 잔고 데이터를 KIS API에서 가져와서 daily_future_balance_kis 테이블에 삽입합니다.
@@ -28,124 +38,80 @@ async def insert_daily_future_balance(
         cano: 계좌번호
         acnt_prdt_cd: 계좌상품코드
         aws_secret_id: AWS 시크릿 ID
+        account_id: 계좌 ID (넘기지 않은 자격증명은 이 계좌의 선물 자격증명 사용)
 
     Returns:
         삽입된 데이터 딕셔너리
     """
-    conn = await get_db_connection()
+    credentials = account_credentials(
+        account_id,
+        "future",
+        app_key=app_key,
+        app_secret=app_secret,
+        domain=domain,
+        cano=cano,
+        acnt_prdt_cd=acnt_prdt_cd,
+        aws_secret_id=aws_secret_id,
+    )
+
     try:
         date_obj = datetime.now(KST).date()
 
-        # KisClient 인스턴스 생성
-        client = KisClient(
-            app_key=app_key,
-            app_secret=app_secret,
-            domain=domain,
-            cano=cano,
-            acnt_prdt_cd=acnt_prdt_cd,
-            aws_secret_id=aws_secret_id
-        )
+        # KisClient 인스턴스 (자격증명별로 재사용)
+        client = get_kis_client(**credentials)
 
-        # KIS API에서 잔고 데이터 가져오기
-        balance_data = await client.get_futureoption_balance()
+        # KIS API에서 잔고 데이터 가져오기 (대시보드 조회보다 우선 처리)
+        with kis_priority(PRIORITY_INGEST):
+            balance_data = await client.get_futureoption_balance()
 
-        # 디버깅을 위한 로그
-        print("KIS API Response:", balance_data)
+        # 디버깅을 위한 로그 (LOG_LEVEL=debug 일 때만, 민감 필드는 가림)
+        logger.debug(
+            "future_balance.kis_response",
+            account_id=account_id,
+            output2=balance_data.get("output2"),
+        )
 
         # API 응답에서 output2 데이터 추출 (잔고 정보)
         output2 = balance_data.get("output2", {})
 
-        # 테이블 컬럼에 매핑되는 데이터 추출
-        # 모든 필드를 0으로 초기화하고, API 응답에서 있는 값만 업데이트
-        data = {
-            "date": date_obj,
-            "dnca_cash": Decimal(str(output2.get("dnca_cash", 0))),
-            "frcr_dncl_amt": Decimal(str(output2.get("frcr_dncl_amt", 0))),
-            "dnca_sbst": Decimal(str(output2.get("dnca_sbst", 0))),
-            "tot_dncl_amt": Decimal(str(output2.get("tot_dncl_amt", 0))),
-            "tot_ccld_amt": Decimal(str(output2.get("tot_ccld_amt", 0))),
-            "cash_mgna": Decimal(str(output2.get("cash_mgna", 0))),
-            "sbst_mgna": Decimal(str(output2.get("sbst_mgna", 0))),
-            "mgna_tota": Decimal(str(output2.get("mgna_tota", 0))),
-            "opt_dfpa": Decimal(str(output2.get("opt_dfpa", 0))),
-            "thdt_dfpa": Decimal(str(output2.get("thdt_dfpa", 0))),
-            "rnwl_dfpa": Decimal(str(output2.get("rnwl_dfpa", 0))),
-            "fee": Decimal(str(output2.get("fee", 0))),
-            "nxdy_dnca": Decimal(str(output2.get("nxdy_dnca", 0))),
-            "nxdy_dncl_amt": Decimal(str(output2.get("nxdy_dncl_amt", 0))),
-            "prsm_dpast": Decimal(str(output2.get("prsm_dpast", 0))),
-            "prsm_dpast_amt": Decimal(str(output2.get("prsm_dpast_amt", 0))),
-            "pprt_ord_psbl_cash": Decimal(str(output2.get("pprt_ord_psbl_cash", 0))),
-            "add_mgna_cash": Decimal(str(output2.get("add_mgna_cash", 0))),
-            "add_mgna_tota": Decimal(str(output2.get("add_mgna_tota", 0))),
-            "futr_trad_pfls_amt": Decimal(str(output2.get("futr_trad_pfls_amt", 0))),
-            "opt_trad_pfls_amt": Decimal(str(output2.get("opt_trad_pfls_amt", 0))),
-            "futr_evlu_pfls_amt": Decimal(str(output2.get("futr_evlu_pfls_amt", 0))),
-            "opt_evlu_pfls_amt": Decimal(str(output2.get("opt_evlu_pfls_amt", 0))),
-            "trad_pfls_amt_smtl": Decimal(str(output2.get("trad_pfls_amt_smtl", 0))),
-            "evlu_pfls_amt_smtl": Decimal(str(output2.get("evlu_pfls_amt_smtl", 0))),
-            "wdrw_psbl_tot_amt": Decimal(str(output2.get("wdrw_psbl_tot_amt", 0))),
-            "ord_psbl_cash": Decimal(str(output2.get("ord_psbl_cash", 0))),
-            "ord_psbl_sbst": Decimal(str(output2.get("ord_psbl_sbst", 0))),
-            "ord_psbl_tota": Decimal(str(output2.get("ord_psbl_tota", 0))),
-            "pchs_amt_smtl": Decimal(str(output2.get("pchs_amt_smtl", 0))),
-            "evlu_amt_smtl": Decimal(str(output2.get("evlu_amt_smtl", 0))),
-        }
-
-        # INSERT 쿼리 작성 (ON CONFLICT로 중복 처리)
-        columns = list(data.keys())
-        placeholders = [f"${i+1}" for i in range(len(columns))]
-
-        query = f"""
-        INSERT INTO daily_future_balance_kis ({', '.join(columns)})
-        VALUES ({', '.join(placeholders)})
-        ON CONFLICT (date) DO UPDATE SET
-        """
-
-        # UPDATE SET 절 생성 (date 제외)
-        update_clauses = []
-        for i, column in enumerate(columns[1:], 2):  # date 제외하고 시작
-            update_clauses.append(f"{column} = ${i}")
-
-        query += ", ".join(update_clauses)
-        query += f" RETURNING {', '.join(columns)}"
+        record = FUTURE_BALANCE_TABLE.record_from_kis(
+            output2, account_id=account_id, date=date_obj
+        )
 
         # 데이터베이스에 삽입
-        row = await conn.fetchrow(query, *data.values())
+        # 원천 행과 pnl_rollup 을 같은 트랜잭션에서 갱신
+        async with get_db_connection() as conn:
+            async with conn.transaction():
+                row = await conn.fetchrow(
+                    FUTURE_BALANCE_TABLE.upsert_returning_sql, *record
+                )
+                await refresh_pnl_rollup(conn, [date_obj])
 
-        # 결과를 딕셔너리로 변환
-        result = {}
-        for i, column in enumerate(columns):
-            value = row[column]
-            if isinstance(value, Decimal):
-                result[column] = float(value)
-            elif hasattr(value, "strftime"):  # datetime.date 객체인지 확인
-                result[column] = value.strftime("%Y-%m-%d")
-            else:
-                result[column] = value
+        # 해당 날짜를 포함하는 손익 캐시 무효화
+        invalidate_pnl_dates([date_obj])
 
-        return result
+        return FUTURE_BALANCE_TABLE.row_to_dict(row)
 
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to insert daily future balance data: {str(e)}",
         )
-    finally:
-        await conn.close()
 
 
-async def read_daily_future_balance(date: str) -> Optional[Dict[str, Any]]:
+async def read_daily_future_balance(
+    date: str, account_id: str = DEFAULT_ACCOUNT_ID
+) -> Optional[Dict[str, Any]]:
     """
     특정 날짜의 선물옵션 잔고 데이터를 조회합니다.
 
     Args:
         date: 조회할 날짜 (YYYY-MM-DD 형식)
+        account_id: 계좌 ID
 
     Returns:
         잔고 데이터 딕셔너리 또는 None
     """
-    conn = await get_db_connection()
     try:
         # 날짜 형식 검증
         try:
@@ -156,24 +122,15 @@ async def read_daily_future_balance(date: str) -> Optional[Dict[str, Any]]:
             )
 
         query = """
-        SELECT * FROM daily_future_balance_kis 
-        WHERE date = $1
+        SELECT * FROM daily_future_balance_kis
+        WHERE account_id = $1 AND date = $2
         """
 
-        row = await conn.fetchrow(query, date_obj)
+        async with get_db_connection() as conn:
+            row = await conn.fetchrow(query, account_id, date_obj)
 
         if row:
-            # 결과를 딕셔너리로 변환
-            result = {}
-            for column in row.keys():
-                value = row[column]
-                if isinstance(value, Decimal):
-                    result[column] = float(value)
-                elif hasattr(value, "strftime") and hasattr(value, "year"):  # datetime.date 객체인지 확인
-                    result[column] = value.strftime("%Y-%m-%d")
-                else:
-                    result[column] = value
-            return result
+            return FUTURE_BALANCE_TABLE.row_to_dict(row)
         return None
 
     except Exception as e:
@@ -181,21 +138,21 @@ async def read_daily_future_balance(date: str) -> Optional[Dict[str, Any]]:
             status_code=500,
             detail=f"Failed to read daily future balance data: {str(e)}",
         )
-    finally:
-        await conn.close()
 
 
-async def delete_daily_future_balance(date: str) -> Dict[str, str]:
+async def delete_daily_future_balance(
+    date: str, account_id: str = DEFAULT_ACCOUNT_ID
+) -> Dict[str, str]:
     """
     특정 날짜의 선물옵션 잔고 데이터를 삭제합니다.
 
     Args:
         date: 삭제할 날짜 (YYYY-MM-DD 형식)
+        account_id: 계좌 ID
 
     Returns:
         삭제 결과 메시지
     """
-    conn = await get_db_connection()
     try:
         # 날짜 형식 검증
         try:
@@ -205,8 +162,14 @@ async def delete_daily_future_balance(date: str) -> Dict[str, str]:
                 status_code=400, detail="Invalid date format. Use YYYY-MM-DD"
             )
 
-        query = "DELETE FROM daily_future_balance_kis WHERE date = $1"
-        result = await conn.execute(query, date_obj)
+        query = "DELETE FROM daily_future_balance_kis WHERE account_id = $1 AND date = $2"
+        async with get_db_connection() as conn:
+            async with conn.transaction():
+                result = await conn.execute(query, account_id, date_obj)
+                await refresh_pnl_rollup(conn, [date_obj])
+
+        if result != "DELETE 0":
+            invalidate_pnl_dates([date_obj])
 
         if result == "DELETE 1":
             return {
@@ -220,5 +183,86 @@ async def delete_daily_future_balance(date: str) -> Dict[str, str]:
             status_code=500,
             detail=f"Failed to delete daily future balance data: {str(e)}",
         )
-    finally:
-        await conn.close()
+
+
+async def backfill_daily_future_balance(
+    job_id: int,
+    days: List[date],
+    batch_size: int = 10,
+    concurrency: int = 4,
+    app_key: Optional[str] = None,
+    app_secret: Optional[str] = None,
+    domain: Optional[str] = None,
+    cano: Optional[str] = None,
+    acnt_prdt_cd: Optional[str] = None,
+    aws_secret_id: Optional[str] = None,
+    account_id: str = DEFAULT_ACCOUNT_ID,
+) -> None:
+    """
+    여러 날짜의 선물옵션 잔고정산손익을 KIS API(CTFO6117R)에서 가져와 daily_future_balance_kis 에 일괄 삽입합니다.
+
+    날짜를 batch_size 단위로 나누어, 배치마다 최대 concurrency 개를 동시에 조회한 뒤
+    executemany 로 한 번에 upsert 합니다. 원천 행, pnl_rollup, 작업 진행 상황은
+    같은 트랜잭션에서 기록되므로 중단되더라도 마지막으로 끝난 배치 다음부터 재개할 수 있습니다.
+
+    Args:
+        job_id: backfill_jobs 작업 ID
+        days: 처리할 날짜 목록 (오름차순)
+        batch_size: 한 번에 쓰는 날짜 수
+        concurrency: 동시에 진행할 KIS 조회 수
+        app_key: KIS API 앱 키
+        app_secret: KIS API 앱 시크릿
+        domain: KIS API 도메인
+        cano: 계좌번호
+        acnt_prdt_cd: 계좌상품코드
+        aws_secret_id: AWS 시크릿 ID
+        account_id: 계좌 ID (넘기지 않은 자격증명은 이 계좌의 선물 자격증명 사용)
+    """
+    client = get_kis_client(
+        **account_credentials(
+            account_id,
+            "future",
+            app_key=app_key,
+            app_secret=app_secret,
+            domain=domain,
+            cano=cano,
+            acnt_prdt_cd=acnt_prdt_cd,
+            aws_secret_id=aws_secret_id,
+        )
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_settlement(day: date):
+        async with semaphore:
+            # KIS 요청 한도 안에서 대시보드 조회보다 우선 처리
+            with kis_priority(PRIORITY_INGEST):
+                response = await client.get_futures_balance_settlement(
+                    day.strftime("%Y%m%d")
+                )
+        output2 = response.get("output2") or {}
+        if isinstance(output2, list):
+            output2 = output2[0] if output2 else {}
+        return day, output2
+
+    for i in range(0, len(days), batch_size):
+        batch = days[i : i + batch_size]
+        results = await asyncio.gather(*[fetch_settlement(day) for day in batch])
+
+        # 잔고 내역이 없는 날(휴장 등)은 건너뜀
+        written = [(day, output2) for day, output2 in results if output2]
+        records = [
+            FUTURE_BALANCE_TABLE.record_from_kis(output2, account_id=account_id, date=day)
+            for day, output2 in written
+        ]
+        written_days = [day for day, _ in written]
+
+        async with get_db_connection() as conn:
+            async with conn.transaction():
+                if records:
+                    await conn.executemany(FUTURE_BALANCE_TABLE.upsert_sql, records)
+                    await refresh_pnl_rollup(conn, written_days)
+                await update_backfill_progress(
+                    conn, job_id, batch[-1], len(batch), len(records)
+                )
+
+        invalidate_pnl_dates(written_days)
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any
+from fastapi import HTTPException
+
+from app.database.connection import get_db_connection
+from app.database.tables import SPOT_BALANCE_TABLE, DEFAULT_ACCOUNT_ID
+from app.services.accounts import account_credentials
+from app.services.kisSpotClient import get_kis_spot_client
+from app.services.kisRateLimiter import kis_priority, PRIORITY_INGEST
+from app.crud.pnl_rollup import refresh_pnl_rollup
+from app.utils.pnl_cache import invalidate_pnl_dates
+
+KST = timezone(timedelta(hours=9))
+
+
+async def insert_daily_spot_balance(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    app_key: Optional[str] = None,
+    app_secret: Optional[str] = None,
+    domain: Optional[str] = None,
+    cano: Optional[str] = None,
+    acnt_prdt_cd: Optional[str] = None,
+    aws_secret_id: Optional[str] = None,
+    account_id: str = DEFAULT_ACCOUNT_ID,
+) -> Dict[str, Any]:
+    """
+    기간별 현물 일별 손익을 KIS API(TTTC8708R)에서 가져와서 daily_spot_balance_kis 테이블에 일괄 삽입합니다.
+
+    기간 전체를 연속조회로 한 번에 가져온 뒤 executemany 로 upsert 하고,
+    같은 트랜잭션에서 pnl_rollup 을 갱신합니다.
+
+    Args:
+        start_date: 시작 날짜 (YYYY-MM-DD 형식, 기본값: 오늘)
+        end_date: 종료 날짜 (YYYY-MM-DD 형식, 기본값: start_date)
+        app_key: KIS API 앱 키
+        app_secret: KIS API 앱 시크릿
+        domain: KIS API 도메인
+        cano: 계좌번호
+        acnt_prdt_cd: 계좌상품코드
+        aws_secret_id: AWS 시크릿 ID
+        account_id: 계좌 ID (넘기지 않은 자격증명은 이 계좌의 현물 자격증명 사용)
+
+    Returns:
+        적재 결과 딕셔너리
+    """
+    try:
+        start = (
+            datetime.strptime(start_date, "%Y-%m-%d").date()
+            if start_date
+            else datetime.now(KST).date()
+        )
+        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else start
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Invalid date format. Use YYYY-MM-DD"
+        )
+
+    # 인자로 받지 않은 자격증명은 계좌의 현물 자격증명 사용
+    credentials = account_credentials(
+        account_id,
+        "spot",
+        app_key=app_key,
+        app_secret=app_secret,
+        domain=domain,
+        cano=cano,
+        acnt_prdt_cd=acnt_prdt_cd,
+        aws_secret_id=aws_secret_id,
+    )
+
+    try:
+        client = get_kis_spot_client(**credentials)
+
+        # 기간 전체를 연속조회로 가져오기 (대시보드 조회보다 우선 처리)
+        records = []
+        with kis_priority(PRIORITY_INGEST):
+            async for row in client.iter_spot_balance_daily_profit(
+                start.strftime("%Y%m%d"), end.strftime("%Y%m%d")
+            ):
+                if row.get("trad_dt"):
+                    records.append(
+                        SPOT_BALANCE_TABLE.record_from_kis(row, account_id=account_id)
+                    )
+
+        written_days = [record[1] for record in records]
+
+        # 원천 행과 pnl_rollup 을 같은 트랜잭션에서 갱신
+        async with get_db_connection() as conn:
+            async with conn.transaction():
+                if records:
+                    await conn.executemany(SPOT_BALANCE_TABLE.upsert_sql, records)
+                    await refresh_pnl_rollup(conn, written_days)
+
+        invalidate_pnl_dates(written_days)
+
+        return {
+            "account_id": account_id,
+            "start_date": start.strftime("%Y-%m-%d"),
+            "end_date": end.strftime("%Y-%m-%d"),
+            "written_rows": len(records),
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to insert daily spot balance data: {str(e)}",
+        )
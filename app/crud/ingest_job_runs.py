@@ -0,0 +1,91 @@
+from datetime import date
+from typing import Optional, Dict, Any, List
+
+import asyncpg
+
+from app.database.connection import get_db_connection
+
+
+def _run_to_dict(row) -> Dict[str, Any]:
+    """ingest_job_runs 레코드를 응답용 딕셔너리로 변환합니다."""
+    result = dict(row)
+    for column in ("start_date", "end_date", "started_at", "finished_at"):
+        if result[column] is not None:
+            result[column] = result[column].isoformat()
+    return result
+
+
+async def read_last_successful_date(
+    conn: asyncpg.Connection, job_name: str
+) -> Optional[date]:
+    """작업이 마지막으로 성공한 구간의 끝 날짜를 반환합니다. 없으면 None."""
+    return await conn.fetchval(
+        """
+        SELECT max(end_date) FROM ingest_job_runs
+        WHERE job_name = $1 AND status = 'success'
+        """,
+        job_name,
+    )
+
+
+async def start_job_run(
+    conn: asyncpg.Connection,
+    job_name: str,
+    start_date: date,
+    end_date: date,
+    instance: str,
+) -> int:
+    """실행 기록을 만들고 ID 를 반환합니다."""
+    return await conn.fetchval(
+        """
+        INSERT INTO ingest_job_runs (job_name, start_date, end_date, instance)
+        VALUES ($1, $2, $3, $4)
+        RETURNING id
+        """,
+        job_name,
+        start_date,
+        end_date,
+        instance,
+    )
+
+
+async def finish_job_run(
+    conn: asyncpg.Connection,
+    run_id: int,
+    status: str,
+    duration_ms: float,
+    written_rows: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    """실행 결과(success/failed)와 소요시간을 기록합니다."""
+    await conn.execute(
+        """
+        UPDATE ingest_job_runs
+        SET status = $2, duration_ms = $3, written_rows = $4, error = $5,
+            finished_at = now()
+        WHERE id = $1
+        """,
+        run_id,
+        status,
+        duration_ms,
+        written_rows,
+        error,
+    )
+
+
+async def read_job_runs(
+    job_name: Optional[str] = None, limit: int = 50
+) -> List[Dict[str, Any]]:
+    """최근 실행 기록을 최신순으로 조회합니다."""
+    async with get_db_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT * FROM ingest_job_runs
+            WHERE $1::text IS NULL OR job_name = $1
+            ORDER BY id DESC
+            LIMIT $2
+            """,
+            job_name,
+            limit,
+        )
+    return [_run_to_dict(row) for row in rows]
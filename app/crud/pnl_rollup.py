@@ -0,0 +1,193 @@
+from datetime import date
+from typing import Iterable
+
+import asyncpg
+
+from app.database.connection import get_db_connection
+from app.database.tables import AGGREGATE_ACCOUNT_ID
+from app.services.pnlInvalidation import notify_pnl_changed
+
+# 여러 계좌의 적재가 같은 날짜의 합산 행을 동시에 다시 계산하지 않도록 잡는 advisory lock 키
+PNL_ROLLUP_LOCK_KEY = 7_301_002
+
+# 아래 INSERT 는 모두 ON CONFLICT DO UPDATE 로 써서, 잠금 밖에서 호출되더라도
+# 다른 트랜잭션이 먼저 넣은 같은 키의 행 때문에 unique violation 이 나지 않게 한다
+
+# 원천 테이블(현물/선물)을 (계좌, 날짜) 기준으로 합친 일별 손익으로 계좌별 일별 행을 채운다
+_UPSERT_DAY_ROWS = """
+    INSERT INTO pnl_rollup
+        (account_id, period_type, period_start, stock_pnl, future_pnl, total_pnl)
+    SELECT COALESCE(s.account_id, f.account_id), 'day', COALESCE(s.d, f.d),
+           COALESCE(s.stock_pnl, 0),
+           COALESCE(f.future_pnl, 0),
+           COALESCE(s.stock_pnl, 0) + COALESCE(f.future_pnl, 0)
+    FROM (
+        SELECT account_id, trad_dt AS d, SUM(rlzt_pfls) AS stock_pnl
+        FROM daily_spot_balance_kis
+        {spot_filter}
+        GROUP BY account_id, trad_dt
+    ) s
+    FULL OUTER JOIN (
+        SELECT account_id, date AS d, futr_trad_pfls_amt AS future_pnl
+        FROM daily_future_balance_kis
+        {future_filter}
+    ) f ON s.account_id = f.account_id AND s.d = f.d
+    ON CONFLICT (account_id, period_type, period_start) DO UPDATE
+    SET stock_pnl = EXCLUDED.stock_pnl,
+        future_pnl = EXCLUDED.future_pnl,
+        total_pnl = EXCLUDED.total_pnl,
+        updated_at = now()
+"""
+
+# 계좌별 일별 행을 날짜별로 합쳐 전체 계좌 합산 행(account_id = '*')을 채운다
+_UPSERT_AGGREGATE_DAY_ROWS = f"""
+    INSERT INTO pnl_rollup
+        (account_id, period_type, period_start, stock_pnl, future_pnl, total_pnl)
+    SELECT '{AGGREGATE_ACCOUNT_ID}', 'day', period_start,
+           SUM(stock_pnl), SUM(future_pnl), SUM(total_pnl)
+    FROM pnl_rollup
+    WHERE period_type = 'day' AND account_id <> '{AGGREGATE_ACCOUNT_ID}' {{day_filter}}
+    GROUP BY period_start
+    ON CONFLICT (account_id, period_type, period_start) DO UPDATE
+    SET stock_pnl = EXCLUDED.stock_pnl,
+        future_pnl = EXCLUDED.future_pnl,
+        total_pnl = EXCLUDED.total_pnl,
+        updated_at = now()
+"""
+
+# 일별 행으로부터 계좌별(합산 포함) 월별 행을 채운다
+_UPSERT_MONTH_ROWS = """
+    INSERT INTO pnl_rollup
+        (account_id, period_type, period_start, stock_pnl, future_pnl, total_pnl)
+    SELECT account_id, 'month', date_trunc('month', period_start::timestamp)::date,
+           SUM(stock_pnl), SUM(future_pnl), SUM(total_pnl)
+    FROM pnl_rollup
+    WHERE period_type = 'day' {month_filter}
+    GROUP BY 1, 3
+    ON CONFLICT (account_id, period_type, period_start) DO UPDATE
+    SET stock_pnl = EXCLUDED.stock_pnl,
+        future_pnl = EXCLUDED.future_pnl,
+        total_pnl = EXCLUDED.total_pnl,
+        updated_at = now()
+"""
+
+# 특정 날짜/월($1)만 다시 계산하는 증분 쿼리
+_UPSERT_DAY_ROWS_FOR_DATES = _UPSERT_DAY_ROWS.format(
+    spot_filter="WHERE trad_dt = ANY($1::date[])",
+    future_filter="WHERE date = ANY($1::date[])",
+)
+_UPSERT_AGGREGATE_DAY_ROWS_FOR_DATES = _UPSERT_AGGREGATE_DAY_ROWS.format(
+    day_filter="AND period_start = ANY($1::date[])",
+)
+_UPSERT_MONTH_ROWS_FOR_MONTHS = _UPSERT_MONTH_ROWS.format(
+    month_filter="AND date_trunc('month', period_start::timestamp)::date = ANY($1::date[])",
+)
+
+# 전체를 다시 계산하는 일괄 쿼리
+_UPSERT_ALL_DAY_ROWS = _UPSERT_DAY_ROWS.format(spot_filter="", future_filter="")
+_UPSERT_ALL_AGGREGATE_DAY_ROWS = _UPSERT_AGGREGATE_DAY_ROWS.format(day_filter="")
+_UPSERT_ALL_MONTH_ROWS = _UPSERT_MONTH_ROWS.format(month_filter="")
+
+# $2 이후 행들의 누적손익을 계좌별로 직전 행의 누적손익부터 이어서 다시 계산
+_UPDATE_CUMULATIVE = """
+    WITH running AS (
+        SELECT account_id, period_start,
+               SUM(total_pnl) OVER (
+                   PARTITION BY account_id ORDER BY period_start
+               ) AS running_pnl
+        FROM pnl_rollup
+        WHERE period_type = $1 AND period_start >= $2
+    ), base AS (
+        SELECT a.account_id, COALESCE(prev.cumulative_pnl, 0) AS cumulative_pnl
+        FROM (SELECT DISTINCT account_id FROM running) a
+        LEFT JOIN LATERAL (
+            SELECT cumulative_pnl FROM pnl_rollup p
+            WHERE p.account_id = a.account_id
+              AND p.period_type = $1 AND p.period_start < $2
+            ORDER BY p.period_start DESC
+            LIMIT 1
+        ) prev ON true
+    )
+    UPDATE pnl_rollup r
+    SET cumulative_pnl = base.cumulative_pnl + running.running_pnl,
+        updated_at = now()
+    FROM running JOIN base ON base.account_id = running.account_id
+    WHERE r.account_id = running.account_id
+      AND r.period_type = $1
+      AND r.period_start = running.period_start
+"""
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+async def refresh_pnl_rollup(conn: asyncpg.Connection, dates: Iterable[date]) -> None:
+    """
+    원천 테이블에 쓰인 날짜들의 pnl_rollup 행(일별/월별/누적)을 갱신합니다.
+    해당 날짜의 모든 계좌 행과 전체 합산 행을 함께 다시 계산합니다.
+    적재 경로에서 원천 테이블 쓰기와 같은 트랜잭션 안에서 호출해야 합니다.
+
+    Args:
+        conn: 트랜잭션이 열린 DB 연결
+        dates: 원천 테이블에서 추가/수정/삭제된 날짜 목록
+    """
+    days = sorted(set(dates))
+    if not days:
+        return
+    months = sorted({_month_start(d) for d in days})
+
+    # 트랜잭션이 끝날 때까지 갱신을 직렬화 (먼저 커밋된 다른 계좌의 원천 행까지 반영해 다시 계산)
+    await conn.execute("SELECT pg_advisory_xact_lock($1)", PNL_ROLLUP_LOCK_KEY)
+
+    # 일별 행: 해당 날짜를 지우고 원천 테이블에서 다시 계산 (원천 삭제도 반영)
+    await conn.execute(
+        "DELETE FROM pnl_rollup WHERE period_type = 'day' AND period_start = ANY($1::date[])",
+        days,
+    )
+    await conn.execute(_UPSERT_DAY_ROWS_FOR_DATES, days)
+    await conn.execute(_UPSERT_AGGREGATE_DAY_ROWS_FOR_DATES, days)
+
+    # 월별 행: 해당 월을 지우고 일별 행으로부터 다시 계산
+    await conn.execute(
+        "DELETE FROM pnl_rollup WHERE period_type = 'month' AND period_start = ANY($1::date[])",
+        months,
+    )
+    await conn.execute(_UPSERT_MONTH_ROWS_FOR_MONTHS, months)
+
+    await conn.execute(_UPDATE_CUMULATIVE, "day", days[0])
+    await conn.execute(_UPDATE_CUMULATIVE, "month", months[0])
+
+    # 커밋되면 다른 워커/레플리카의 손익 캐시도 해당 날짜를 무효화
+    await notify_pnl_changed(conn, days)
+
+
+async def rebuild_pnl_rollup() -> int:
+    """
+    원천 테이블 전체로부터 pnl_rollup 을 일괄 재계산합니다. (복구용)
+
+    Returns:
+        int: 재계산된 일별 행 수
+    """
+    async with get_db_connection() as conn:
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", PNL_ROLLUP_LOCK_KEY)
+            await conn.execute("DELETE FROM pnl_rollup")
+            await conn.execute(_UPSERT_ALL_DAY_ROWS)
+            await conn.execute(_UPSERT_ALL_AGGREGATE_DAY_ROWS)
+            await conn.execute(_UPSERT_ALL_MONTH_ROWS)
+            await conn.execute(_UPDATE_CUMULATIVE, "day", date.min)
+            await conn.execute(_UPDATE_CUMULATIVE, "month", date.min)
+            await notify_pnl_changed(conn)
+            return await conn.fetchval(
+                "SELECT count(*) FROM pnl_rollup WHERE period_type = 'day' AND account_id = $1",
+                AGGREGATE_ACCOUNT_ID,
+            )
+
+
+async def ensure_pnl_rollup() -> None:
+    """pnl_rollup 이 비어 있으면 원천 테이블로부터 채웁니다. (최초 배포용)"""
+    async with get_db_connection() as conn:
+        empty = not await conn.fetchval("SELECT EXISTS (SELECT 1 FROM pnl_rollup)")
+    if empty:
+        await rebuild_pnl_rollup()
@@ -1,67 +1,234 @@
-from datetime import datetime
+import os
+from datetime import date, datetime, timezone, timedelta
 from decimal import Decimal
-from typing import Optional, Dict, Any
+from typing import Optional, AsyncIterator, List, Tuple
+from asyncpg import Record
 from fastapi import HTTPException
+from dotenv import load_dotenv
 
 from app.database.connection import get_db_connection
+from app.database.tables import AGGREGATE_ACCOUNT_ID
 
+load_dotenv()
 
-async def read_future_balance(
+KST = timezone(timedelta(hours=9))
+
+# date_trunc 에 전달할 수 있는 집계 단위
+PNL_GRANULARITIES = ("day", "week", "month", "year")
+
+# 스트리밍 조회 시 서버 측 커서에서 한 번에 가져오는 행 수
+PNL_STREAM_PREFETCH = int(os.getenv("PNL_STREAM_PREFETCH", "500"))
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Invalid date format. Use YYYY-MM-DD"
+        )
+
+
+def _next_bucket_start(bucket: date, granularity: str) -> date:
+    """구간 시작일 다음 구간의 시작일을 계산합니다."""
+    if granularity == "day":
+        return bucket + timedelta(days=1)
+    if granularity == "week":
+        return bucket + timedelta(days=7)
+    if granularity == "month":
+        return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return bucket.replace(year=bucket.year + 1, month=1, day=1)
+
+
+def _pnl_aggregate_query(
+    start: date,
+    end: date,
+    granularity: str,
+    limit: Optional[int] = None,
+    account_id: str = AGGREGATE_ACCOUNT_ID,
+) -> Tuple[str, tuple]:
+    """
+    pnl_rollup 구간 집계 쿼리와 인자를 만듭니다.
+    account_id 가 '*' 이면 전체 계좌 합산 행을 읽습니다.
+
+    day 와 (월 단위로 맞아떨어지는 구간의) month 는 미리 계산된 행을 그대로 읽고,
+    그 외에는 일별 행을 date_trunc(granularity) 단위로 GROUP BY 합니다.
+    """
+    if granularity not in PNL_GRANULARITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid granularity. Use one of {', '.join(PNL_GRANULARITIES)}",
+        )
+
+    # 월별 행은 월 전체를 담고 있으므로 구간이 월 경계에 맞을 때만 사용
+    whole_months = start.day == 1 and (
+        (end + timedelta(days=1)).day == 1 or end >= datetime.now(KST).date()
+    )
+
+    if granularity == "day" or (granularity == "month" and whole_months):
+        query = """
+        SELECT period_start AS bucket, stock_pnl, future_pnl, cumulative_pnl
+        FROM pnl_rollup
+        WHERE account_id = $4 AND period_type = $1 AND period_start BETWEEN $2 AND $3
+        ORDER BY period_start
+        """
+        args = (granularity, start, end, account_id)
+    else:
+        query = """
+        SELECT date_trunc($3::text, period_start::timestamp)::date AS bucket,
+               SUM(stock_pnl) AS stock_pnl,
+               SUM(future_pnl) AS future_pnl,
+               (array_agg(cumulative_pnl ORDER BY period_start DESC))[1] AS cumulative_pnl
+        FROM pnl_rollup
+        WHERE account_id = $4 AND period_type = 'day' AND period_start BETWEEN $1 AND $2
+        GROUP BY bucket
+        ORDER BY bucket
+        """
+        args = (start, end, granularity, account_id)
+
+    if limit is not None:
+        query += f"LIMIT ${len(args) + 1}\n"
+        args += (limit,)
+    return query, args
+
+
+async def prepare_pnl_statements(conn) -> int:
+    """
+    구간 손익 조회 쿼리들을 빈 구간으로 한 번씩 실행해 커넥션의 statement 캐시에 올립니다.
+    (서버 시작 시 예열용: 첫 요청이 파싱/타입 조회 비용을 치르지 않도록)
+
+    Returns:
+        int: 준비한 쿼리 수
+    """
+    # 같은 쿼리 문자열이 나오도록 실제 조회와 같은 경로로 만들고, 결과가 없는 과거 구간을 인자로 씀
+    statements = {}
+    month_start, month_end = date(2000, 1, 1), date(2000, 1, 31)
+    for granularity in PNL_GRANULARITIES:
+        for end in (month_start, month_end):
+            for limit in (None, 1):
+                query, args = _pnl_aggregate_query(month_start, end, granularity, limit)
+                statements.setdefault(query, args)
+    for query, args in statements.items():
+        await conn.fetch(query, *args)
+    return len(statements)
+
+
+async def read_pnl_aggregate(
     start_date: str,
     end_date: str,
-) -> Optional[Dict[str, Any]]:
+    granularity: str = "day",
+    account_id: str = AGGREGATE_ACCOUNT_ID,
+):
     """
-    특정 날짜의 포트폴리오 데이터를 조회합니다.
+    현물/선물 손익을 기간 단위로 합산하여 한 번의 쿼리로 조회합니다.
+
+    적재 시 갱신되는 pnl_rollup 테이블을 (account_id, period_type, period_start) 인덱스 범위로 읽습니다.
 
     Args:
         start_date: 조회할 시작 날짜 (YYYY-MM-DD 형식)
         end_date: 조회할 종료 날짜 (YYYY-MM-DD 형식)
+        granularity: 집계 단위 (day, week, month, year)
+        account_id: 계좌 ID (기본값: 전체 계좌 합산 '*')
 
     Returns:
-        포트폴리오 데이터 딕셔너리 또는 None
+        bucket(구간 시작일), stock_pnl, future_pnl, cumulative_pnl(구간 말 누적손익)
+        컬럼을 가진 레코드 목록 (bucket 오름차순)
     """
-    conn = await get_db_connection()
-    try:
-        # 테이블 이름 결정
-        table_name = f"daily_future_balance_kis"
+    query, args = _pnl_aggregate_query(
+        _parse_date(start_date), _parse_date(end_date), granularity, account_id=account_id
+    )
+    async with get_db_connection() as conn:
+        return await conn.fetch(query, *args)
 
-        query = f"""
-        SELECT date, futr_trad_pfls_amt
-        FROM {table_name} 
-        WHERE date BETWEEN $1 AND $2
-        """
-        rows = await conn.fetch(
-            query,
-            datetime.strptime(start_date, "%Y-%m-%d").date(),
-            datetime.strptime(end_date, "%Y-%m-%d").date(),
+
+async def read_cumulative_pnl_before(start_date: str, account_ids: List[str]) -> float:
+    """
+    여러 계좌의 start_date 직전 누적손익 합계를 조회합니다.
+
+    계좌 일부만 합산할 때 구간 첫 누적손익의 기준값으로 사용합니다.
+    """
+    query = """
+    SELECT COALESCE(SUM(cumulative_pnl), 0)
+    FROM (
+        SELECT DISTINCT ON (account_id) cumulative_pnl
+        FROM pnl_rollup
+        WHERE account_id = ANY($1::text[]) AND period_type = 'day' AND period_start < $2
+        ORDER BY account_id, period_start DESC
+    ) last_rows
+    """
+    async with get_db_connection() as conn:
+        return float(
+            await conn.fetchval(query, account_ids, _parse_date(start_date))
         )
-        return rows
-    finally:
-        await conn.close()
 
 
-async def read_spot_balance(
+async def read_pnl_page(
     start_date: str,
     end_date: str,
-) -> Optional[Dict[str, Any]]:
+    granularity: str = "day",
+    cursor: Optional[str] = None,
+    limit: int = 500,
+    account_id: str = AGGREGATE_ACCOUNT_ID,
+):
     """
-    특정 날짜의 포트폴리오 데이터를 조회합니다.
+    구간 집계 손익을 bucket 기준 keyset 페이지네이션으로 조회합니다.
+
+    OFFSET 대신 직전 페이지의 마지막 bucket(cursor) 다음 구간부터 인덱스 범위로 읽으므로
+    페이지가 뒤로 가도 조회 비용이 일정합니다.
+
+    Args:
+        start_date: 조회할 시작 날짜 (YYYY-MM-DD 형식)
+        end_date: 조회할 종료 날짜 (YYYY-MM-DD 형식)
+        granularity: 집계 단위 (day, week, month, year)
+        cursor: 직전 페이지의 next_cursor (없으면 처음부터)
+        limit: 페이지 크기
+        account_id: 계좌 ID (기본값: 전체 계좌 합산 '*')
+
+    Returns:
+        (레코드 목록, 다음 페이지 cursor 또는 None)
     """
-    conn = await get_db_connection()
-    try:
-        # 테이블 이름 결정
-        table_name = f"daily_spot_balance_kis"
+    start = _parse_date(start_date)
+    end = _parse_date(end_date)
+    if cursor:
+        start = max(start, _next_bucket_start(_parse_date(cursor), granularity))
+    if start > end:
+        return [], None
 
-        query = f"""
-        SELECT trad_dt, rlzt_pfls
-        FROM {table_name}
-        WHERE trad_dt BETWEEN $1 AND $2
-        """
-        rows = await conn.fetch(
-            query,
-            datetime.strptime(start_date, "%Y-%m-%d").date(),
-            datetime.strptime(end_date, "%Y-%m-%d").date(),
-        )
-        return rows
-    finally:
-        await conn.close()
+    # 한 행 더 읽어 다음 페이지가 있는지 확인
+    query, args = _pnl_aggregate_query(
+        start, end, granularity, limit + 1, account_id=account_id
+    )
+    async with get_db_connection() as conn:
+        rows = await conn.fetch(query, *args)
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]["bucket"].isoformat()
+    return rows, None
+
+
+def stream_pnl_aggregate(
+    start_date: str,
+    end_date: str,
+    granularity: str = "day",
+    account_id: str = AGGREGATE_ACCOUNT_ID,
+) -> AsyncIterator[Record]:
+    """
+    구간 집계 손익을 서버 측 커서로 조금씩 읽어 하나씩 내보냅니다.
+
+    전체 결과를 메모리에 올리지 않으므로 수년 치 구간도 메모리 사용량이 일정하고
+    첫 행을 바로 보낼 수 있습니다. 스트리밍이 끝날 때까지 커넥션을 점유합니다.
+    인자 검증은 호출 즉시 수행되어 응답을 시작하기 전에 400 을 낼 수 있습니다.
+    """
+    query, args = _pnl_aggregate_query(
+        _parse_date(start_date), _parse_date(end_date), granularity, account_id=account_id
+    )
+    return _iter_query(query, args)
+
+
+async def _iter_query(query: str, args: tuple) -> AsyncIterator[Record]:
+    async with get_db_connection() as conn:
+        # asyncpg 커서는 트랜잭션 안에서만 사용할 수 있음
+        async with conn.transaction(readonly=True):
+            async for row in conn.cursor(query, *args, prefetch=PNL_STREAM_PREFETCH):
+                yield row
@@ -1,21 +1,199 @@
 import os
+import re
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional, AsyncIterator
+
 import asyncpg
 from fastapi import HTTPException
 from dotenv import load_dotenv
 
+from app.utils.metrics import Counter, Histogram
+from app.utils.tracing import span, record_span
+
 load_dotenv()
 
+# 애플리케이션 전역 커넥션 풀 (lifespan 에서 생성/종료)
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+# 풀 획득(acquire) 관련 지표
+_pool_stats = {
+    "acquire_count": 0,
+    "acquire_timeouts": 0,
+    "acquire_wait_seconds_total": 0.0,
+    "acquire_wait_seconds_max": 0.0,
+}
+
+pool_acquire_wait = Histogram(
+    "db_pool_acquire_wait_seconds", "Time spent waiting for a pooled connection"
+)
+pool_acquire_timeouts = Counter(
+    "db_pool_acquire_timeouts_total", "Pool acquire attempts that timed out"
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Query latency by statement kind and main table",
+    ("query", "status"),
+)
+
+# 쿼리 문자열 -> 지표 레이블. 레이블 종류가 무한히 늘지 않도록 개수를 제한
+_QUERY_LABEL_LIMIT = 512
+_query_labels: dict = {}
+_STATEMENT_TABLE = re.compile(
+    r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|FROM)\s+([A-Za-z_][\w.]*)", re.I
+)
+_SELECT_FUNCTION = re.compile(r"^\s*SELECT\s+([A-Za-z_]\w*)\s*\(", re.I)
+_FIRST_WORD = re.compile(r"\s*(\w+)")
+_WRITE_VERB = re.compile(r"\b(INSERT|UPDATE|DELETE)\b", re.I)
+
+
+def _query_label(query: str) -> str:
+    """
+    쿼리 문자열을 "select pnl_rollup", "insert daily_future_balance_kis" 처럼
+    문장 종류와 주 대상 테이블로 요약합니다. 같은 문자열은 한 번만 분석합니다.
+    """
+    label = _query_labels.get(query)
+    if label is not None:
+        return label
+
+    first = _FIRST_WORD.match(query)
+    verb = first.group(1).lower() if first else ""
+    if verb == "with":
+        # CTE 뒤의 본문이 쓰기 문장이면 그 종류를 따름
+        write = _WRITE_VERB.search(query)
+        verb = write.group(1).lower() if write else "select"
+    if verb in ("insert", "update", "delete", "select"):
+        statement = query if verb == "select" else query[query.lower().find(verb):]
+        target = _STATEMENT_TABLE.search(statement) or _SELECT_FUNCTION.search(statement)
+        label = f"{verb} {target.group(1)}" if target else verb
+    else:
+        label = verb or "unknown"
+
+    if len(_query_labels) >= _QUERY_LABEL_LIMIT:
+        return "other"
+    _query_labels[query] = label
+    return label
+
+
+def _record_query(record) -> None:
+    # asyncpg 쿼리 로거 콜백 (execute/fetch*/executemany 완료 시 쿼리를 실행한 작업의 컨텍스트로 호출)
+    label = _query_label(record.query)
+    db_query_duration.observe(
+        record.elapsed, label, "error" if record.exception is not None else "ok"
+    )
+    record_span("db.query", record.elapsed, query=label)
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """풀이 새 커넥션을 만들 때마다 쿼리 지연 기록용 로거를 붙입니다."""
+    conn.add_query_logger(_record_query)
+
+
+def _pool_settings() -> dict:
+    """환경변수에서 커넥션 풀 설정을 읽어옵니다."""
+    return {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        # 커넥션별 prepared statement 캐시 크기 (0 이면 비활성화, pgbouncer 사용 시)
+        "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")),
+        # 커넥션 재활용: N 개 쿼리 실행 후 / N 초 유휴 후 커넥션 교체
+        "max_queries": int(os.getenv("DB_POOL_MAX_QUERIES", "50000")),
+        "max_inactive_connection_lifetime": float(
+            os.getenv("DB_POOL_MAX_INACTIVE_LIFETIME", "300")
+        ),
+    }
+
+
+def _acquire_timeout() -> float:
+    return float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "5"))
 
-async def get_db_connection():
-    """PostgreSQL 데이터베이스 연결을 반환합니다."""
-    database_url = os.getenv("DATABASE_URL")
-    if not database_url:
-        raise HTTPException(status_code=500, detail="DATABASE_URL not configured")
 
+async def init_db_pool() -> asyncpg.Pool:
+    """
+    PostgreSQL 커넥션 풀을 생성합니다. 이미 생성되어 있으면 기존 풀을 반환합니다.
+
+    Returns:
+        asyncpg.Pool: 커넥션 풀
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    async with _pool_lock:
+        if _pool is not None:
+            return _pool
+
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            raise HTTPException(status_code=500, detail="DATABASE_URL not configured")
+
+        try:
+            _pool = await asyncpg.create_pool(
+                database_url, init=_init_connection, **_pool_settings()
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Database connection failed: {str(e)}"
+            )
+        return _pool
+
+
+async def close_db_pool() -> None:
+    """커넥션 풀을 종료합니다."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+def get_pool_stats() -> dict:
+    """커넥션 풀 상태와 acquire 지표를 반환합니다."""
+    stats = dict(_pool_stats)
+    if _pool is not None:
+        stats.update(
+            {
+                "size": _pool.get_size(),
+                "idle": _pool.get_idle_size(),
+                "min_size": _pool.get_min_size(),
+                "max_size": _pool.get_max_size(),
+            }
+        )
+    return stats
+
+
+@asynccontextmanager
+async def get_db_connection() -> AsyncIterator[asyncpg.Connection]:
+    """
+    커넥션 풀에서 PostgreSQL 연결을 빌려옵니다.
+
+    사용법:
+        async with get_db_connection() as conn:
+            await conn.fetch(...)
+    """
+    pool = _pool or await init_db_pool()
+
+    started = time.perf_counter()
     try:
-        conn = await asyncpg.connect(database_url)
-        return conn
-    except Exception as e:
+        with span("db.acquire"):
+            conn = await pool.acquire(timeout=_acquire_timeout())
+    except asyncio.TimeoutError:
+        _pool_stats["acquire_timeouts"] += 1
+        pool_acquire_timeouts.inc()
         raise HTTPException(
-            status_code=500, detail=f"Database connection failed: {str(e)}"
+            status_code=503, detail="Database connection pool exhausted"
+        )
+    finally:
+        waited = time.perf_counter() - started
+        pool_acquire_wait.observe(waited)
+        _pool_stats["acquire_wait_seconds_total"] += waited
+        _pool_stats["acquire_wait_seconds_max"] = max(
+            _pool_stats["acquire_wait_seconds_max"], waited
         )
+
+    _pool_stats["acquire_count"] += 1
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
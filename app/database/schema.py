@@ -0,0 +1,278 @@
+from typing import List
+
+from app.database.connection import get_db_connection
+from app.database.tables import (
+    TableSpec,
+    FUTURE_BALANCE_TABLE,
+    SPOT_BALANCE_TABLE,
+    FUTURE_SNAPSHOT_TABLE,
+    DEFAULT_ACCOUNT_ID,
+)
+
+# 여러 인스턴스가 동시에 DDL 을 실행하지 않도록 잡는 advisory lock 키
+SCHEMA_LOCK_KEY = 7_301_001
+
+
+ACCOUNT_BALANCE_TABLES = (FUTURE_BALANCE_TABLE, SPOT_BALANCE_TABLE, FUTURE_SNAPSHOT_TABLE)
+
+MIGRATE_COMMAND = "python -m app.commands.migrate_account_schema"
+
+
+def _account_key_index(spec: TableSpec) -> str:
+    return f"{spec.name}_account_id_{spec.key[1]}_key"
+
+
+def _account_balance_table_statements(spec: TableSpec) -> List[str]:
+    """
+    계좌별 원천 잔고 테이블 DDL. (새 테이블과 새 값 컬럼만 추가하며 기존 행은 건드리지 않음)
+    """
+    table = spec.name
+    date_column = spec.key[1]
+    date_type = next(c.sql_type for c in spec.columns if c.name == date_column)
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            account_id TEXT NOT NULL DEFAULT '{DEFAULT_ACCOUNT_ID}',
+            {date_column} {date_type} NOT NULL
+        )
+        """,
+        *[
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} NUMERIC"
+            for column in spec.value_columns
+        ],
+        f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS {_account_key_index(spec)}
+        ON {table} (account_id, {date_column})
+        """,
+    ]
+
+
+def _account_migration_statements(spec: TableSpec) -> List[str]:
+    """
+    기존(단일 계좌) 원천 잔고 테이블을 계좌별 테이블로 바꾸는 DDL.
+
+    account_id 컬럼을 추가해 기존 행을 기본 계좌로 옮기고, 날짜(시각) 단일 유니크 제약을 지운 뒤
+    완전히 같은 중복 행은 하나만 남깁니다. 값이 서로 다른 중복은 어느 쪽이 맞는지 알 수 없으므로
+    명확한 메시지와 함께 실패합니다. 유니크 인덱스는 이어서 실행하는 ensure_schema 가 만듭니다.
+    """
+    table = spec.name
+    date_column = spec.key[1]
+    return [
+        f"""
+        ALTER TABLE {table}
+        ADD COLUMN IF NOT EXISTS account_id TEXT NOT NULL DEFAULT '{DEFAULT_ACCOUNT_ID}'
+        """,
+        f"""
+        DO $$
+        DECLARE
+            target regclass := '{table}'::regclass;
+            key_attnum smallint;
+            r record;
+        BEGIN
+            SELECT attnum INTO key_attnum
+            FROM pg_attribute WHERE attrelid = target AND attname = '{date_column}';
+
+            FOR r IN
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = target AND contype IN ('p', 'u')
+                  AND conkey = ARRAY[key_attnum]
+            LOOP
+                EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', target, r.conname);
+            END LOOP;
+
+            FOR r IN
+                SELECT indexrelid::regclass AS index_name FROM pg_index
+                WHERE indrelid = target AND indisunique
+                  AND indnatts = 1 AND indkey[0] = key_attnum
+            LOOP
+                EXECUTE format('DROP INDEX %s', r.index_name);
+            END LOOP;
+        END $$
+        """,
+        f"""
+        DO $$
+        DECLARE
+            conflicts bigint;
+            sample text;
+        BEGIN
+            IF to_regclass('{_account_key_index(spec)}') IS NOT NULL THEN
+                RETURN;
+            END IF;
+
+            DELETE FROM {table} a
+            USING {table} b
+            WHERE a.account_id = b.account_id
+              AND a.{date_column} = b.{date_column}
+              AND a.ctid > b.ctid
+              AND a IS NOT DISTINCT FROM b;
+
+            SELECT count(*), string_agg(account_id || ' ' || {date_column}, ', ')
+            INTO conflicts, sample
+            FROM (
+                SELECT account_id, {date_column} FROM {table}
+                GROUP BY account_id, {date_column}
+                HAVING count(*) > 1
+                ORDER BY account_id, {date_column}
+                LIMIT 20
+            ) d;
+
+            IF conflicts > 0 THEN
+                RAISE EXCEPTION
+                    '{table} 에 값이 다른 (account_id, {date_column}) 중복 행이 있어 유니크 인덱스를 만들 수 없습니다: %', sample
+                    USING HINT = '남길 행만 두고 나머지를 삭제한 뒤 다시 실행하세요.';
+            END IF;
+        END $$
+        """,
+    ]
+
+
+# 계좌별 스키마 이전 DDL (파괴적: 제약 삭제, 중복 행 삭제, 기존 pnl_rollup 삭제). migrate_account_schema 로만 실행
+MIGRATION_STATEMENTS = [
+    *[
+        statement
+        for spec in ACCOUNT_BALANCE_TABLES
+        for statement in _account_migration_statements(spec)
+    ],
+    # account_id 이전의 pnl_rollup 은 원천 테이블에서 다시 계산하도록 제거 (ensure_pnl_rollup 이 재생성)
+    """
+    DO $$
+    BEGIN
+        IF to_regclass('pnl_rollup') IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM pg_attribute
+            WHERE attrelid = to_regclass('pnl_rollup') AND attname = 'account_id'
+        ) THEN
+            DROP TABLE pnl_rollup;
+        END IF;
+    END $$
+    """,
+]
+
+
+# 애플리케이션이 직접 관리하는 테이블 DDL (멱등)
+SCHEMA_STATEMENTS = [
+    *_account_balance_table_statements(FUTURE_BALANCE_TABLE),
+    *_account_balance_table_statements(SPOT_BALANCE_TABLE),
+    # 계좌별 행과 전체 합산 행(account_id = '*')
+    """
+    CREATE TABLE IF NOT EXISTS pnl_rollup (
+        account_id TEXT NOT NULL,
+        period_type TEXT NOT NULL CHECK (period_type IN ('day', 'month')),
+        period_start DATE NOT NULL,
+        stock_pnl NUMERIC NOT NULL DEFAULT 0,
+        future_pnl NUMERIC NOT NULL DEFAULT 0,
+        total_pnl NUMERIC NOT NULL DEFAULT 0,
+        cumulative_pnl NUMERIC NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (account_id, period_type, period_start)
+    )
+    """,
+    # 적재 시 날짜별로 모든 계좌 행을 지우고 다시 계산할 때 사용
+    """
+    CREATE INDEX IF NOT EXISTS pnl_rollup_period_idx
+    ON pnl_rollup (period_type, period_start)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS backfill_jobs (
+        id BIGSERIAL PRIMARY KEY,
+        job_type TEXT NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        status TEXT NOT NULL DEFAULT 'running',
+        total_days INTEGER NOT NULL DEFAULT 0,
+        completed_days INTEGER NOT NULL DEFAULT 0,
+        written_rows INTEGER NOT NULL DEFAULT 0,
+        last_completed_date DATE,
+        error TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """,
+    f"""
+    ALTER TABLE backfill_jobs
+    ADD COLUMN IF NOT EXISTS account_id TEXT NOT NULL DEFAULT '{DEFAULT_ACCOUNT_ID}'
+    """,
+    # 장중 스냅샷도 계좌별 행
+    *_account_balance_table_statements(FUTURE_SNAPSHOT_TABLE),
+    # 내장 적재 스케줄러 실행 기록 (성공한 마지막 날짜가 다음 실행/캐치업의 기준)
+    """
+    CREATE TABLE IF NOT EXISTS ingest_job_runs (
+        id BIGSERIAL PRIMARY KEY,
+        job_name TEXT NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        status TEXT NOT NULL DEFAULT 'running',
+        instance TEXT,
+        written_rows INTEGER,
+        duration_ms DOUBLE PRECISION,
+        error TEXT,
+        started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        finished_at TIMESTAMPTZ
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ingest_job_runs_job_name_end_date_idx
+    ON ingest_job_runs (job_name, end_date)
+    """,
+]
+
+
+async def _pending_migrations(conn) -> List[str]:
+    """계좌별 스키마로 이전되지 않은 기존 테이블 목록."""
+    pending = []
+    for spec in ACCOUNT_BALANCE_TABLES:
+        exists, migrated = await conn.fetchrow(
+            "SELECT to_regclass($1) IS NOT NULL, to_regclass($2) IS NOT NULL",
+            spec.name,
+            _account_key_index(spec),
+        )
+        if exists and not migrated:
+            pending.append(spec.name)
+    if await conn.fetchval(
+        """
+        SELECT to_regclass('pnl_rollup') IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM pg_attribute
+            WHERE attrelid = to_regclass('pnl_rollup') AND attname = 'account_id'
+        )
+        """
+    ):
+        pending.append("pnl_rollup")
+    return pending
+
+
+async def ensure_schema() -> None:
+    """
+    애플리케이션이 관리하는 테이블이 없으면 생성합니다.
+
+    기존 행을 바꾸는 이전 작업은 하지 않습니다. 계좌별 스키마로 이전되지 않은 테이블이 있으면
+    이전 명령(MIGRATE_COMMAND)을 안내하며 실패합니다.
+    """
+    async with get_db_connection() as conn:
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", SCHEMA_LOCK_KEY)
+            pending = await _pending_migrations(conn)
+            if pending:
+                raise RuntimeError(
+                    f"계좌별 스키마 이전이 필요합니다({', '.join(pending)}). "
+                    f"`{MIGRATE_COMMAND}` 를 실행한 뒤 다시 시작하세요."
+                )
+            for statement in SCHEMA_STATEMENTS:
+                await conn.execute(statement)
+
+
+async def migrate_account_schema() -> List[str]:
+    """
+    기존(단일 계좌) 테이블을 계좌별 스키마로 이전하고 누락된 테이블을 만듭니다.
+
+    Returns:
+        List[str]: 이전한 테이블 목록 (이미 이전되었으면 빈 목록)
+    """
+    async with get_db_connection() as conn:
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", SCHEMA_LOCK_KEY)
+            pending = await _pending_migrations(conn)
+            if pending:
+                for statement in MIGRATION_STATEMENTS:
+                    await conn.execute(statement)
+            for statement in SCHEMA_STATEMENTS:
+                await conn.execute(statement)
+    return pending
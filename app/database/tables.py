@@ -0,0 +1,226 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 기존 단일 계좌(NEXT_PUBLIC_KIS_* 환경변수)의 계좌 ID. account_id 가 없던 기존 행은 이 ID 로 이전
+DEFAULT_ACCOUNT_ID = os.getenv("KIS_DEFAULT_ACCOUNT_ID", "default")
+
+# pnl_rollup 에서 전체 계좌 합산 행에 쓰는 예약 ID (계좌 ID 로는 쓸 수 없음)
+AGGREGATE_ACCOUNT_ID = "*"
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    KIS 적재 테이블의 컬럼 정의.
+
+    Args:
+        name: 테이블 컬럼 이름
+        sql_type: 컬럼 타입 (NUMERIC, DATE, TIMESTAMPTZ 또는 TEXT)
+        source: KIS 응답 필드 이름 (없으면 name 과 같음)
+    """
+
+    name: str
+    sql_type: str = "NUMERIC"
+    source: Optional[str] = None
+
+
+def _parse_numeric(value) -> Decimal:
+    """KIS 숫자 문자열을 Decimal 로 변환합니다. 값이 없거나 잘못되면 0."""
+    try:
+        return Decimal(str(value)) if value not in (None, "") else Decimal(0)
+    except InvalidOperation:
+        return Decimal(0)
+
+
+def _parse_kis_date(value) -> Optional[date]:
+    """KIS 날짜(YYYYMMDD) 문자열을 date 로 변환합니다."""
+    if isinstance(value, date) or value is None:
+        return value
+    return datetime.strptime(value, "%Y%m%d").date()
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """적재 시점에 만든 aware datetime 을 그대로 사용합니다."""
+    return value
+
+
+def _passthrough(value):
+    return value
+
+
+def _serialize_numeric(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _serialize_date(value) -> Optional[str]:
+    return None if value is None else value.isoformat()
+
+
+def _serialize_any(value) -> Any:
+    """정의에 없는 컬럼은 값 타입에 따라 변환합니다."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+# 컬럼 타입별 (KIS 응답 -> DB 값, DB 값 -> JSON 값) 변환 함수
+_CONVERTERS: Dict[str, Tuple[Callable, Callable]] = {
+    "NUMERIC": (_parse_numeric, _serialize_numeric),
+    "DATE": (_parse_kis_date, _serialize_date),
+    "TIMESTAMPTZ": (_parse_timestamp, _serialize_date),
+    "TEXT": (_passthrough, _passthrough),
+}
+
+
+class TableSpec:
+    """
+    KIS 적재 테이블 하나의 선언적 정의.
+
+    생성 시점(모듈 import, 즉 애플리케이션 시작 시) 에 컬럼별 변환 함수 목록과
+    upsert SQL 을 한 번만 만들어 두고, 적재/조회 경로에서는 셀마다 타입을 검사하지 않고
+    미리 정해진 함수만 호출합니다. SQL 문자열이 항상 같으므로 asyncpg 의 커넥션별
+    prepared statement 캐시도 그대로 재사용됩니다.
+
+    Args:
+        name: 테이블 이름
+        columns: 컬럼 정의 목록
+        key: upsert 충돌 기준 컬럼들 (없으면 첫 번째 컬럼)
+    """
+
+    def __init__(
+        self, name: str, columns: List[Column], key: Optional[Tuple[str, ...]] = None
+    ):
+        self.name = name
+        self.columns = columns
+        self.key = key or (columns[0].name,)
+        self.column_names = [column.name for column in columns]
+        self.value_columns = [
+            name for name in self.column_names if name not in self.key
+        ]
+
+        self._parsers = [
+            (column.name, column.source or column.name, _CONVERTERS[column.sql_type][0])
+            for column in columns
+        ]
+        self._serializers = {
+            column.name: _CONVERTERS[column.sql_type][1] for column in columns
+        }
+
+        self.upsert_sql = self._build_upsert_sql(returning=False)
+        self.upsert_returning_sql = self._build_upsert_sql(returning=True)
+
+    def _build_upsert_sql(self, returning: bool) -> str:
+        """INSERT ... ON CONFLICT (key) DO UPDATE 쿼리를 작성합니다."""
+        placeholders = ", ".join(f"${i + 1}" for i in range(len(self.column_names)))
+        updates = ", ".join(
+            f"{column} = EXCLUDED.{column}" for column in self.value_columns
+        )
+        query = f"""
+        INSERT INTO {self.name} ({', '.join(self.column_names)})
+        VALUES ({placeholders})
+        ON CONFLICT ({', '.join(self.key)}) DO UPDATE SET {updates}
+        """
+        if returning:
+            query += f"RETURNING {', '.join(self.column_names)}\n"
+        return query
+
+    def record_from_kis(self, source: dict, **values: Any) -> Tuple[Any, ...]:
+        """
+        KIS 응답 행을 upsert 인자 순서의 값 튜플로 변환합니다.
+
+        Args:
+            source: KIS 응답 행 (output1 행 또는 output2)
+            **values: 응답 대신 직접 지정할 컬럼 값 (예: account_id=계좌, date=조회일)
+        """
+        return tuple(
+            values[name] if name in values else parse(source.get(field))
+            for name, field, parse in self._parsers
+        )
+
+    def row_to_dict(self, row) -> Dict[str, Any]:
+        """DB 레코드를 JSON 으로 보낼 수 있는 딕셔너리로 변환합니다."""
+        serializers = self._serializers
+        return {
+            column: serializers.get(column, _serialize_any)(value)
+            for column, value in row.items()
+        }
+
+
+# 선물옵션 잔고 (CTFO6118R/CTFO6117R output2)
+FUTURE_BALANCE_TABLE = TableSpec(
+    "daily_future_balance_kis",
+    [
+        Column("account_id", "TEXT"),
+        Column("date", "DATE"),
+        Column("dnca_cash"),
+        Column("frcr_dncl_amt"),
+        Column("dnca_sbst"),
+        Column("tot_dncl_amt"),
+        Column("tot_ccld_amt"),
+        Column("cash_mgna"),
+        Column("sbst_mgna"),
+        Column("mgna_tota"),
+        Column("opt_dfpa"),
+        Column("thdt_dfpa"),
+        Column("rnwl_dfpa"),
+        Column("fee"),
+        Column("nxdy_dnca"),
+        Column("nxdy_dncl_amt"),
+        Column("prsm_dpast"),
+        Column("prsm_dpast_amt"),
+        Column("pprt_ord_psbl_cash"),
+        Column("add_mgna_cash"),
+        Column("add_mgna_tota"),
+        Column("futr_trad_pfls_amt"),
+        Column("opt_trad_pfls_amt"),
+        Column("futr_evlu_pfls_amt"),
+        Column("opt_evlu_pfls_amt"),
+        Column("trad_pfls_amt_smtl"),
+        Column("evlu_pfls_amt_smtl"),
+        Column("wdrw_psbl_tot_amt"),
+        Column("ord_psbl_cash"),
+        Column("ord_psbl_sbst"),
+        Column("ord_psbl_tota"),
+        Column("pchs_amt_smtl"),
+        Column("evlu_amt_smtl"),
+    ],
+    key=("account_id", "date"),
+)
+
+# 기간별손익일별합산조회 (TTTC8708R output1)
+SPOT_BALANCE_TABLE = TableSpec(
+    "daily_spot_balance_kis",
+    [
+        Column("account_id", "TEXT"),  # 계좌 ID
+        Column("trad_dt", "DATE"),  # 매매일자
+        Column("buy_amt"),  # 매수금액
+        Column("sll_amt"),  # 매도금액
+        Column("rlzt_pfls"),  # 실현손익
+        Column("fee"),  # 수수료
+        Column("loan_int"),  # 대출이자
+        Column("tl_tax"),  # 제세금
+        Column("pfls_rt"),  # 손익률
+        Column("sll_qty1"),  # 매도수량1
+        Column("buy_qty1"),  # 매수수량1
+    ],
+    key=("account_id", "trad_dt"),
+)
+
+# 장중 선물옵션 잔고 스냅샷 (CTFO6118R output2, 계좌별로 수집 주기 단위로 정렬된 시각별 한 행)
+FUTURE_SNAPSHOT_TABLE = TableSpec(
+    "future_balance_snapshots",
+    [
+        Column("account_id", "TEXT"),
+        Column("captured_at", "TIMESTAMPTZ"),
+        *[c for c in FUTURE_BALANCE_TABLE.columns if c.sql_type == "NUMERIC"],
+    ],
+    key=("account_id", "captured_at"),
+)
@@ -1,9 +1,56 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api import kis, general
+from app.database.connection import init_db_pool, close_db_pool
+from app.database.schema import ensure_schema
+from app.crud.pnl_rollup import ensure_pnl_rollup
+from app.services.kisTransport import close_kis_transport
+from app.services.ingestScheduler import ingest_scheduler, INGEST_SCHEDULER_ENABLED
+from app.services.snapshotRecorder import snapshot_recorder, SNAPSHOT_ENABLED
+from app.services.livePnl import live_pnl
+from app.services.warmup import warmup
+from app.services.pnlInvalidation import pnl_invalidation_listener, PNL_INVALIDATION_LISTEN
+from app.utils.metrics import MetricsMiddleware
+from app.utils.tracing import TracingMiddleware
+from app.utils.logger import close_logger
+
 
-app = FastAPI(title="Realized PnL API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 애플리케이션 시작 시 DB 커넥션 풀 생성, 스키마 준비, 적재 스케줄러/스냅샷 수집 시작
+    # 예열(DB 커넥션/쿼리, 토큰, KIS 연결)은 요청을 받기 시작한 뒤 백그라운드로 진행하고 끝나면 ready
+    # 종료 시 스케줄러, 스냅샷 버퍼, 실시간 손익 poller, KIS 트랜스포트, DB 풀 정리 후 남은 로그 기록
+    await init_db_pool()
+    await ensure_schema()
+    await ensure_pnl_rollup()
+    if PNL_INVALIDATION_LISTEN:
+        pnl_invalidation_listener.start()
+    warmup.start()
+    if INGEST_SCHEDULER_ENABLED:
+        ingest_scheduler.start()
+    if SNAPSHOT_ENABLED:
+        snapshot_recorder.start()
+    yield
+    await warmup.stop()
+    await pnl_invalidation_listener.stop()
+    await ingest_scheduler.stop()
+    await snapshot_recorder.stop()
+    await live_pnl.stop()
+    await close_kis_transport()
+    await close_db_pool()
+    close_logger()
+
+
+# 응답 JSON 인코딩은 표준 json 대신 orjson 사용
+app = FastAPI(
+    title="Realized PnL API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # CORS 미들웨어 설정
 app.add_middleware(
@@ -13,6 +60,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 라우트별 요청 지연/상태 코드 지표 (/metrics)
+app.add_middleware(MetricsMiddleware)
+
+# 요청별 DB/KIS/시크릿 조회 구간을 Server-Timing 헤더로 반환
+app.add_middleware(TracingMiddleware)
+
 # 라우터 등록
 app.include_router(general.router)
 app.include_router(kis.router)
@@ -0,0 +1,129 @@
+import os
+import re
+import json
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+from app.database.tables import DEFAULT_ACCOUNT_ID
+from app.services.kisSpotClient import get_spot_credentials_from_env
+
+load_dotenv()
+
+_ACCOUNT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# 전체 계좌 실시간 조회(오늘 손익, 장중 스냅샷)에서 동시에 KIS 를 조회하는 계좌 수
+KIS_ACCOUNT_CONCURRENCY = int(os.getenv("KIS_ACCOUNT_CONCURRENCY", "4"))
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class KisAccount:
+    """
+    KIS 계좌 하나의 자격증명.
+
+    Args:
+        account_id: 계좌 ID (테이블의 account_id)
+        future: 선물옵션 계좌 자격증명 (KisClient 인자, 없으면 선물 적재 안 함)
+        spot: 현물 계좌 자격증명 (KisSpotClient 인자, 없으면 현물 적재 안 함)
+    """
+
+    account_id: str
+    future: Optional[Dict[str, str]] = field(default=None, hash=False)
+    spot: Optional[Dict[str, str]] = field(default=None, hash=False)
+
+
+def _validate_account_id(account_id: str) -> str:
+    if not _ACCOUNT_ID_PATTERN.match(account_id):
+        raise ValueError(f"Invalid account id: {account_id!r}")
+    return account_id
+
+
+def _load_accounts() -> Dict[str, KisAccount]:
+    """
+    KIS_ACCOUNTS 환경변수(JSON)에서 계좌 목록을 읽어옵니다.
+
+    형식: {"<account_id>": {"future": {자격증명}, "spot": {자격증명}}, ...}
+    자격증명 키는 app_key, app_secret, domain, cano, acnt_prdt_cd, aws_secret_id 입니다.
+    기본 계좌는 항상 포함되며, 지정하지 않으면 기존 환경변수 자격증명을 사용합니다.
+    """
+    accounts = {
+        # 선물은 KisClient 가 환경변수로 채우므로 빈 자격증명
+        DEFAULT_ACCOUNT_ID: KisAccount(
+            DEFAULT_ACCOUNT_ID, future={}, spot=get_spot_credentials_from_env()
+        )
+    }
+    for account_id, config in json.loads(os.getenv("KIS_ACCOUNTS") or "{}").items():
+        accounts[_validate_account_id(account_id)] = KisAccount(
+            account_id, future=config.get("future"), spot=config.get("spot")
+        )
+    return accounts
+
+
+_validate_account_id(DEFAULT_ACCOUNT_ID)
+ACCOUNTS = _load_accounts()
+
+
+def get_accounts() -> List[KisAccount]:
+    """등록된 전체 계좌 목록을 반환합니다."""
+    return list(ACCOUNTS.values())
+
+
+def get_account(account_id: Optional[str] = None) -> KisAccount:
+    """계좌 ID 로 계좌를 찾습니다. 없으면 기본 계좌."""
+    account = ACCOUNTS.get(account_id or DEFAULT_ACCOUNT_ID)
+    if account is None:
+        raise HTTPException(status_code=404, detail=f"Unknown account: {account_id}")
+    return account
+
+
+def resolve_account_ids(accounts: Optional[str]) -> List[str]:
+    """콤마로 구분된 계좌 ID 목록을 검증합니다. 없으면 전체 계좌."""
+    if not accounts:
+        return list(ACCOUNTS)
+    account_ids = [get_account(account_id.strip()).account_id for account_id in accounts.split(",")]
+    return list(dict.fromkeys(account_ids))
+
+
+def account_credentials(account_id: str, product: str, **overrides) -> Dict[str, str]:
+    """
+    계좌의 KIS 자격증명에 요청에서 직접 넘긴 값을 덮어써서 반환합니다.
+
+    Args:
+        account_id: 계좌 ID
+        product: "future" 또는 "spot"
+        **overrides: 요청 인자로 받은 자격증명 (값이 없는 키는 무시)
+    """
+    credentials = dict(getattr(get_account(account_id), product) or {})
+    credentials.update({k: v for k, v in overrides.items() if v})
+    return credentials
+
+
+async def gather_accounts(
+    product: str, fetch: Callable[["KisAccount"], Awaitable[T]]
+) -> Dict[str, T]:
+    """
+    해당 상품 자격증명이 있는 모든 계좌에 대해 fetch 를 KIS_ACCOUNT_CONCURRENCY 개까지 동시에 실행합니다.
+    합산 값이 일부 계좌만 반영하지 않도록 한 계좌라도 실패하면 예외를 전파합니다.
+
+    Args:
+        product: "future" 또는 "spot"
+        fetch: 계좌를 받아 조회하는 코루틴 함수
+
+    Returns:
+        계좌 ID -> fetch 결과
+    """
+    semaphore = asyncio.Semaphore(KIS_ACCOUNT_CONCURRENCY)
+    accounts = [
+        account for account in ACCOUNTS.values() if getattr(account, product) is not None
+    ]
+
+    async def run(account: KisAccount) -> T:
+        async with semaphore:
+            return await fetch(account)
+
+    results = await asyncio.gather(*[run(account) for account in accounts])
+    return {account.account_id: result for account, result in zip(accounts, results)}
@@ -0,0 +1,172 @@
+import os
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Any, Set
+
+import asyncpg
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+from app.crud.backfill_jobs import (
+    claim_backfill_job,
+    create_or_resume_backfill_job,
+    finish_backfill_job,
+    read_backfill_job,
+    release_backfill_job,
+)
+from app.crud.daily_future_balance import backfill_daily_future_balance
+from app.database.tables import DEFAULT_ACCOUNT_ID
+from app.services.accounts import get_account
+from app.utils.market_hours import is_trading_day
+from app.utils.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "10"))
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "4"))
+
+# 이 프로세스에서 실행 중인 백필 태스크 (가비지 컬렉션 방지용 참조).
+# 중복 실행 방지는 DB 점유(claim_backfill_job)로 하므로 워커/레플리카가 여러 개여도 안전
+_tasks: Set[asyncio.Task] = set()
+
+
+def _parse_range(start_date: str, end_date: str):
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Invalid date format. Use YYYY-MM-DD"
+        )
+    if start > end:
+        raise HTTPException(status_code=400, detail="start_date must be <= end_date")
+    return start, end
+
+
+def _trading_days(start: date, end: date, after: Optional[date] = None):
+    """start~end 사이의 영업일 중 after 이후의 날짜 목록을 반환합니다."""
+    days = []
+    day = start
+    while day <= end:
+        if is_trading_day(day) and (after is None or day > after):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+async def _run_future_backfill(job: Dict[str, Any], credentials: dict) -> None:
+    start = date.fromisoformat(job["start_date"])
+    end = date.fromisoformat(job["end_date"])
+    resume_after = job["last_completed_date"]
+    days = _trading_days(
+        start, end, date.fromisoformat(resume_after) if resume_after else None
+    )
+    try:
+        await backfill_daily_future_balance(
+            job["id"],
+            days,
+            batch_size=BACKFILL_BATCH_SIZE,
+            concurrency=BACKFILL_CONCURRENCY,
+            account_id=job["account_id"],
+            **credentials,
+        )
+        await finish_backfill_job(job["id"], "completed")
+    except Exception as e:
+        logger.error("backfill.failed", job_id=job["id"], error=e)
+        await finish_backfill_job(job["id"], "failed", str(e))
+
+
+async def _run_claimed(
+    job_id: int, credentials: dict, wait: bool
+) -> Optional[Dict[str, Any]]:
+    """
+    작업을 DB 에서 점유한 뒤 실행합니다. 점유한 연결은 작업이 끝날 때까지 쥐고 있으므로
+    배치 쓰기가 쓰는 커넥션 풀을 잠식하지 않도록 풀 밖의 전용 연결을 씁니다.
+
+    Returns:
+        점유한 시점의 작업 딕셔너리. 다른 곳에서 실행 중이면(wait=False) None
+    """
+    conn = await asyncpg.connect(os.getenv("DATABASE_URL"))
+    try:
+        job = await claim_backfill_job(conn, job_id, wait=wait)
+        if job is None:
+            logger.info("backfill.already_running", job_id=job_id)
+            return None
+        if job["status"] == "completed":
+            return job
+        try:
+            await _run_future_backfill(job, credentials)
+        finally:
+            await release_backfill_job(conn, job_id)
+        return job
+    finally:
+        await conn.close()
+
+
+def _spawn(job_id: int, credentials: dict, wait: bool) -> asyncio.Task:
+    task = asyncio.create_task(_run_claimed(job_id, credentials, wait))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def _create_job(start: date, end: date, account_id: str) -> Dict[str, Any]:
+    # 알 수 없는 계좌면 작업을 만들기 전에 404
+    get_account(account_id)
+    return await create_or_resume_backfill_job(
+        "daily_future_balance",
+        start,
+        end,
+        len(_trading_days(start, end)),
+        account_id=account_id,
+    )
+
+
+async def start_future_backfill(
+    start_date: str,
+    end_date: str,
+    account_id: str = DEFAULT_ACCOUNT_ID,
+    **credentials,
+) -> Dict[str, Any]:
+    """
+    daily_future_balance_kis 백필 작업을 백그라운드로 시작합니다.
+    같은 구간의 미완료 작업이 있으면 마지막으로 끝난 배치 다음부터 이어서 실행합니다.
+    다른 워커/레플리카에서 이미 실행 중이면 새로 실행하지 않고 작업 정보만 반환합니다.
+
+    Args:
+        start_date: 시작 날짜 (YYYY-MM-DD 형식)
+        end_date: 종료 날짜 (YYYY-MM-DD 형식)
+        account_id: 계좌 ID
+        **credentials: KIS 자격증명 (app_key, app_secret, domain, cano, acnt_prdt_cd, aws_secret_id)
+
+    Returns:
+        작업 딕셔너리 (진행 상황은 read_backfill_job 으로 조회)
+    """
+    start, end = _parse_range(start_date, end_date)
+    job = await _create_job(start, end, account_id)
+    _spawn(job["id"], credentials, wait=False)
+    return job
+
+
+async def run_future_backfill(
+    start: date, end: date, account_id: str = DEFAULT_ACCOUNT_ID, **credentials
+) -> Dict[str, Any]:
+    """
+    백필 작업을 시작(또는 재개)하고 끝날 때까지 기다립니다.
+    다른 워커/레플리카에서 실행 중이면 그 실행이 끝나길 기다린 뒤, 완료되지 않았으면 이어서 실행합니다.
+
+    Returns:
+        완료된 작업 딕셔너리
+
+    Raises:
+        RuntimeError: 작업이 실패한 경우
+    """
+    job = await _create_job(start, end, account_id)
+    await asyncio.shield(_spawn(job["id"], credentials, wait=True))
+
+    job = await read_backfill_job(job["id"])
+    if job["status"] != "completed":
+        raise RuntimeError(f"backfill job {job['id']} {job['status']}: {job['error']}")
+    return job
@@ -0,0 +1,315 @@
+import os
+import time
+import random
+import socket
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as clock_time, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+from dotenv import load_dotenv
+
+from app.database.connection import get_db_connection
+from app.crud.daily_future_balance import insert_daily_future_balance
+from app.crud.daily_spot_balance import insert_daily_spot_balance
+from app.crud.ingest_job_runs import (
+    read_last_successful_date,
+    start_job_run,
+    finish_job_run,
+)
+from app.services.accounts import get_accounts
+from app.services.backfillRunner import run_future_backfill
+from app.utils.market_hours import KST, is_trading_day, next_trading_day, now_kst
+from app.utils.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+INGEST_SCHEDULER_ENABLED = os.getenv("INGEST_SCHEDULER_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# 예정 시각 뒤에 더하는 무작위 지연(초). 여러 레플리카가 동시에 깨어나지 않도록 분산
+INGEST_JITTER_SECONDS = float(os.getenv("INGEST_JITTER_SECONDS", "60"))
+
+# 실패하거나 다른 레플리카가 실행 중일 때 다시 확인하기까지의 시간(초)
+INGEST_RETRY_SECONDS = float(os.getenv("INGEST_RETRY_SECONDS", "300"))
+
+# 중단 후 재시작 시 밀린 영업일을 최대 며칠 전까지 따라잡을지
+INGEST_CATCHUP_DAYS = int(os.getenv("INGEST_CATCHUP_DAYS", "7"))
+
+# 한 작업 안에서 동시에 적재하는 계좌 수
+INGEST_ACCOUNT_CONCURRENCY = int(os.getenv("INGEST_ACCOUNT_CONCURRENCY", "4"))
+
+# 작업별 리더 선출용 advisory lock 키 (SCHEMA_LOCK_KEY 와 겹치지 않게)
+INGEST_LOCK_KEY_BASE = 7_301_100
+
+# 실행 기록에 남기는 인스턴스 식별자
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class IngestJob:
+    """
+    영업일마다 한 번 실행하는 적재 작업.
+
+    Args:
+        name: 작업 이름 (실행 기록의 job_name)
+        run_at: 실행 시각 (KST)
+        run: (시작일, 종료일) 구간을 적재하고 쓴 행 수를 반환하는 코루틴 함수
+        lock_key: 리더 선출용 advisory lock 키
+    """
+
+    name: str
+    run_at: clock_time
+    run: Callable[[date, date], Awaitable[int]]
+    lock_key: int
+    stats: Dict = field(default_factory=dict)
+
+
+async def _for_each_account(
+    product: str, ingest: Callable[[str], Awaitable[int]]
+) -> int:
+    """
+    해당 상품 자격증명이 있는 계좌마다 적재를 실행하고 쓴 행 수의 합을 반환합니다.
+
+    계좌들은 INGEST_ACCOUNT_CONCURRENCY 개까지 동시에 진행하며 (KIS 요청 한도는
+    앱 키별 rate limiter 가 지킴), 한 계좌가 실패해도 나머지 계좌는 끝까지 적재한 뒤
+    실패한 계좌를 모아 예외로 알립니다.
+    """
+    semaphore = asyncio.Semaphore(INGEST_ACCOUNT_CONCURRENCY)
+    account_ids = [
+        account.account_id
+        for account in get_accounts()
+        if getattr(account, product) is not None
+    ]
+
+    async def run(account_id: str) -> int:
+        async with semaphore:
+            return await ingest(account_id)
+
+    results = await asyncio.gather(
+        *[run(account_id) for account_id in account_ids], return_exceptions=True
+    )
+    failures = {
+        account_id: str(result)
+        for account_id, result in zip(account_ids, results)
+        if isinstance(result, Exception)
+    }
+    if failures:
+        raise RuntimeError(f"account ingest failed: {failures}")
+    return sum(results)
+
+
+async def _run_future_ingest(start: date, end: date) -> int:
+    """
+    선물 잔고 적재. 오늘은 잔고현황(CTFO6118R)으로, 밀린 과거 영업일은
+    잔고정산손익(CTFO6117R) 백필로 채웁니다.
+    """
+    today = now_kst().date()
+
+    async def ingest(account_id: str) -> int:
+        written = 0
+        if start < today:
+            job = await run_future_backfill(
+                start, min(end, today - timedelta(days=1)), account_id
+            )
+            written += job["written_rows"]
+        if end >= today:
+            await insert_daily_future_balance(account_id=account_id)
+            written += 1
+        return written
+
+    return await _for_each_account("future", ingest)
+
+
+async def _run_spot_ingest(start: date, end: date) -> int:
+    """현물 일별 손익 적재. 밀린 구간도 연속조회 한 번으로 가져옵니다."""
+
+    async def ingest(account_id: str) -> int:
+        result = await insert_daily_spot_balance(
+            start.isoformat(), end.isoformat(), account_id=account_id
+        )
+        return result["written_rows"]
+
+    return await _for_each_account("spot", ingest)
+
+
+class IngestScheduler:
+    """
+    애플리케이션 lifespan 에서 시작하는 KRX 영업일 기준 적재 스케줄러.
+
+    - 작업마다 영업일의 정해진 시각(+지터)에 깨어나, 실행 기록에서 마지막 성공일 이후
+      밀린 영업일 구간을 계산해 한 번에 적재합니다. (중단 후 재시작 시 캐치업)
+    - 실행 전에 pg_try_advisory_lock 으로 작업별 리더를 정하므로 N 개 레플리카 중
+      하나만 실행하고, 락을 잡은 뒤 실행 기록을 다시 확인해 중복 실행을 막습니다.
+    - 실행마다 소요시간과 결과를 ingest_job_runs 테이블과 메모리 지표에 남깁니다.
+    """
+
+    def __init__(self, jobs: List[IngestJob]):
+        self.jobs = jobs
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        for job in self.jobs:
+            job.stats.update(
+                {"runs": 0, "failures": 0, "last_status": None, "next_run_at": None}
+            )
+            self._tasks.append(asyncio.create_task(self._loop(job)))
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _due_at(self, job: IngestJob, day: date) -> datetime:
+        return datetime.combine(day, job.run_at, tzinfo=KST)
+
+    def _latest_due_day(self, job: IngestJob, now: datetime) -> date:
+        """예정 시각이 이미 지난 가장 최근 영업일."""
+        day = now.date()
+        if is_trading_day(day) and now >= self._due_at(job, day):
+            return day
+        day -= timedelta(days=1)
+        while not is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def _next_due_at(self, job: IngestJob, now: datetime) -> datetime:
+        day = now.date()
+        if is_trading_day(day) and now < self._due_at(job, day):
+            return self._due_at(job, day)
+        return self._due_at(job, next_trading_day(day))
+
+    async def _pending_range(self, conn, job: IngestJob) -> Optional[Tuple[date, date]]:
+        """마지막 성공일 다음 영업일부터 최근 예정일까지의 밀린 구간. 없으면 None."""
+        latest = self._latest_due_day(job, now_kst())
+        last_success = await read_last_successful_date(conn, job.name)
+        if last_success is None:
+            # 첫 실행은 최근 예정일만 (과거 전체는 백필 API 로)
+            return latest, latest
+
+        start = max(
+            next_trading_day(last_success),
+            latest - timedelta(days=INGEST_CATCHUP_DAYS),
+        )
+        if not is_trading_day(start):
+            start = next_trading_day(start)
+        if start > latest:
+            return None
+        return start, latest
+
+    async def _run_as_leader(self, job: IngestJob) -> Optional[bool]:
+        """
+        리더로 선출되면 밀린 구간을 적재합니다.
+
+        Returns:
+            True: 성공했거나 할 일이 없음, False: 실패, None: 다른 레플리카가 실행 중
+        """
+        # 락은 작업이 끝날 때까지 쥐고 있어야 하므로 풀이 아닌 전용 연결에서 잡음.
+        # (작업 자체가 계좌별/배치별로 풀 커넥션을 쓰므로 풀을 고갈시키지 않도록)
+        # 연결을 닫으면 세션 락도 함께 풀림
+        lock_conn = await asyncpg.connect(os.getenv("DATABASE_URL"))
+        try:
+            if not await lock_conn.fetchval(
+                "SELECT pg_try_advisory_lock($1)", job.lock_key
+            ):
+                return None
+
+            # 락을 기다리는 사이 다른 레플리카가 끝냈을 수 있으므로 다시 확인
+            async with get_db_connection() as conn:
+                pending = await self._pending_range(conn, job)
+                if pending is None:
+                    return True
+                start, end = pending
+                run_id = await start_job_run(conn, job.name, start, end, INSTANCE_ID)
+
+            started = time.perf_counter()
+            try:
+                written = await job.run(start, end)
+                status, error = "success", None
+            except Exception as e:
+                written, status, error = None, "failed", str(e)
+            duration_ms = (time.perf_counter() - started) * 1000
+            async with get_db_connection() as conn:
+                await finish_job_run(conn, run_id, status, duration_ms, written, error)
+
+            job.stats["runs"] += 1
+            job.stats["last_status"] = status
+            job.stats["last_range"] = [start.isoformat(), end.isoformat()]
+            job.stats["last_duration_ms"] = duration_ms
+            job.stats["last_finished_at"] = now_kst().isoformat()
+            if error:
+                job.stats["failures"] += 1
+                job.stats["last_error"] = error
+                logger.warning(
+                    "ingest.job_failed",
+                    job=job.name,
+                    start=start.isoformat(),
+                    end=end.isoformat(),
+                    error=error,
+                )
+            return error is None
+        finally:
+            await lock_conn.close()
+
+    async def _loop(self, job: IngestJob) -> None:
+        while True:
+            try:
+                async with get_db_connection() as conn:
+                    pending = await self._pending_range(conn, job)
+                ok = True if pending is None else await self._run_as_leader(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("ingest.loop_failed", job=job.name, error=e)
+                ok = False
+
+            if ok:
+                delay = (self._next_due_at(job, now_kst()) - now_kst()).total_seconds()
+                delay += random.uniform(0, INGEST_JITTER_SECONDS)
+            else:
+                # 실패 또는 다른 레플리카가 실행 중이면 잠시 뒤 다시 확인
+                delay = INGEST_RETRY_SECONDS * random.uniform(0.8, 1.2)
+
+            job.stats["next_run_at"] = (now_kst() + timedelta(seconds=delay)).isoformat()
+            await asyncio.sleep(max(delay, 0))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": bool(self._tasks),
+            "instance": INSTANCE_ID,
+            "jobs": {
+                job.name: {"run_at": job.run_at.strftime("%H:%M"), **job.stats}
+                for job in self.jobs
+            },
+        }
+
+
+def _parse_run_at(value: str) -> clock_time:
+    return datetime.strptime(value, "%H:%M").time()
+
+
+ingest_scheduler = IngestScheduler(
+    [
+        IngestJob(
+            name="daily_spot_balance",
+            run_at=_parse_run_at(os.getenv("INGEST_SPOT_TIME", "16:00")),
+            run=_run_spot_ingest,
+            lock_key=INGEST_LOCK_KEY_BASE + 1,
+        ),
+        IngestJob(
+            name="daily_future_balance",
+            run_at=_parse_run_at(os.getenv("INGEST_FUTURE_TIME", "17:10")),
+            run=_run_future_ingest,
+            lock_key=INGEST_LOCK_KEY_BASE + 2,
+        ),
+    ]
+)
@@ -1,14 +1,22 @@
 import os
 import json
-import requests
 from fastapi import HTTPException
 from dotenv import load_dotenv
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from app.utils.aws_secrets import get_aws_secret
+from app.utils.token_cache import get_access_token
+from app.services.kisTransport import request_kis, get_registered_client
+from app.services.kisPagination import iter_pages, iter_rows
+from app.utils.tracing import span
 
 load_dotenv()
 
+# 연속조회 요청 파라미터 -> 응답 본문 키
+_CONTINUATION_KEYS_200 = {
+    "CTX_AREA_FK200": "ctx_area_fk200",
+    "CTX_AREA_NK200": "ctx_area_nk200",
+}
+
 
 class KisClient:
     """
@@ -40,7 +48,7 @@ class KisClient:
                 status_code=500, detail="KIS API credentials not configured"
             )
 
-    def _get_base_headers(self, tr_id: str) -> dict:
+    async def _get_base_headers(self, tr_id: str) -> dict:
         """
         KIS API 요청에 사용할 기본 헤더를 생성합니다.
 
@@ -50,7 +58,8 @@ class KisClient:
         Returns:
             dict: 헤더 딕셔너리
         """
-        access_token = get_aws_secret(self.aws_secret_id)
+        with span("kis.headers", tr_id=tr_id):
+            access_token = await get_access_token(self.aws_secret_id)
 
         return {
             "content-type": "application/json; charset=utf-8",
@@ -61,7 +70,9 @@ class KisClient:
             "custtype": "P",
         }
 
-    def _make_api_request(self, endpoint: str, headers: dict, params: dict) -> dict:
+    async def _make_api_request(
+        self, endpoint: str, headers: dict, params: dict, tr_cont: str = ""
+    ) -> dict:
         """
         KIS API 요청을 수행합니다.
 
@@ -69,41 +80,20 @@ class KisClient:
             endpoint (str): API 엔드포인트
             headers (dict): 요청 헤더
             params (dict): 쿼리 파라미터
+            tr_cont (str): 연속조회 여부 ("": 최초 조회, "N": 다음 페이지 조회)
 
         Returns:
             dict: API 응답 결과
         """
-        try:
-            response = requests.get(
-                f"{self.domain}{endpoint}",
-                headers=headers,
-                params=params,
-            )
-            response.raise_for_status()
-
-            result = response.json()
-
-            if result.get("rt_cd") != "0":
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"KIS API Error: {result.get('msg1', 'Unknown error')}",
-                )
-
-            print(result)
-            return result
-
-        except requests.exceptions.RequestException as e:
-            raise HTTPException(
-                status_code=500, detail=f"HTTP error occurred: {str(e)}"
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+        with span("kis.request", tr_id=headers.get("tr_id", "")):
+            return await request_kis(self.domain, endpoint, headers, params, tr_cont)
 
     async def get_futures_balance_settlement(
         self,
         inqr_dt: str,
         ctx_area_fk200: str = "",
         ctx_area_nk200: str = "",
+        tr_cont: str = "",
     ) -> dict:
         """
         선물옵션 잔고정산손익내역 조회
@@ -112,11 +102,12 @@ class KisClient:
             inqr_dt (str): 조회일자
             ctx_area_fk200 (str): 연속조회검색조건200
             ctx_area_nk200 (str): 연속조회키200
+            tr_cont (str): 연속조회 여부 (다음 페이지 조회시 "N")
 
         Returns:
             dict: 잔고정산손익내역 데이터
         """
-        headers = self._get_base_headers("CTFO6117R")
+        headers = await self._get_base_headers("CTFO6117R")
 
         params = {
             "CANO": self.cano,
@@ -129,7 +120,7 @@ class KisClient:
         endpoint = (
             "/uapi/domestic-futureoption/v1/trading/inquire-balance-settlement-pl"
         )
-        return self._make_api_request(endpoint, headers, params)
+        return await self._make_api_request(endpoint, headers, params, tr_cont)
 
     async def get_futureoption_balance(
         self,
@@ -137,6 +128,7 @@ class KisClient:
         excc_stat_cd: str = "2",  # 정산상태코드 (1: 정산, 2: 본정산)
         ctx_area_fk200: str = "",  # 연속조회검색조건200
         ctx_area_nk200: str = "",  # 연속조회키200
+        tr_cont: str = "",  # 연속조회 여부 (다음 페이지 조회시 "N")
     ) -> dict:
         """
         선물옵션 잔고현황 조회
@@ -146,6 +138,7 @@ class KisClient:
             excc_stat_cd (str): 정산상태코드 (1: 정산, 2: 본정산)
             ctx_area_fk200 (str): 연속조회검색조건200 (다음페이지 조회시 이전 응답값 사용)
             ctx_area_nk200 (str): 연속조회키200 (다음페이지 조회시 이전 응답값 사용)
+            tr_cont (str): 연속조회 여부 (다음 페이지 조회시 "N")
 
         Returns:
             dict: 잔고현황 데이터
@@ -156,7 +149,7 @@ class KisClient:
                 detail="Missing required environment variables",
             )
 
-        headers = self._get_base_headers("CTFO6118R")
+        headers = await self._get_base_headers("CTFO6118R")
 
         params = {
             "CANO": self.cano,
@@ -168,4 +161,64 @@ class KisClient:
         }
 
         endpoint = "/uapi/domestic-futureoption/v1/trading/inquire-balance"
-        return self._make_api_request(endpoint, headers, params)
+        return await self._make_api_request(endpoint, headers, params, tr_cont)
+
+    def iter_futures_balance_settlement(
+        self, inqr_dt: str, max_pages: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """
+        선물옵션 잔고정산손익내역(output1)을 연속조회 키를 따라가며 행 단위로 순회합니다.
+
+        Args:
+            inqr_dt (str): 조회일자
+            max_pages (int): 최대 페이지 수
+
+        Yields:
+            dict: 종목별 잔고정산손익 행
+        """
+        pages = iter_pages(
+            lambda cursor, tr_cont: self.get_futures_balance_settlement(
+                inqr_dt,
+                cursor.get("CTX_AREA_FK200", ""),
+                cursor.get("CTX_AREA_NK200", ""),
+                tr_cont,
+            ),
+            _CONTINUATION_KEYS_200,
+            max_pages,
+        )
+        return iter_rows(pages, "output1")
+
+    def iter_futureoption_balance(
+        self,
+        mgna_dvsn: str = "01",
+        excc_stat_cd: str = "2",
+        max_pages: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        선물옵션 잔고현황(output1)을 연속조회 키를 따라가며 행 단위로 순회합니다.
+
+        Args:
+            mgna_dvsn (str): 증거금 구분 (01: 개시, 02: 유지)
+            excc_stat_cd (str): 정산상태코드 (1: 정산, 2: 본정산)
+            max_pages (int): 최대 페이지 수
+
+        Yields:
+            dict: 종목별 잔고 행
+        """
+        pages = iter_pages(
+            lambda cursor, tr_cont: self.get_futureoption_balance(
+                mgna_dvsn,
+                excc_stat_cd,
+                cursor.get("CTX_AREA_FK200", ""),
+                cursor.get("CTX_AREA_NK200", ""),
+                tr_cont,
+            ),
+            _CONTINUATION_KEYS_200,
+            max_pages,
+        )
+        return iter_rows(pages, "output1")
+
+
+def get_kis_client(**credentials) -> KisClient:
+    """자격증명 조합별로 재사용되는 KisClient 인스턴스를 반환합니다."""
+    return get_registered_client(KisClient, **credentials)
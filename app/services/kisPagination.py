@@ -0,0 +1,96 @@
+import os
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+# 다음 페이지가 있음을 나타내는 응답 헤더 tr_cont 값
+_HAS_NEXT = ("F", "M")
+
+DEFAULT_MAX_PAGES = int(os.getenv("KIS_MAX_PAGES", "50"))
+
+# 페이지 조회 함수: (연속조회 파라미터, tr_cont) -> 응답
+FetchPage = Callable[[Dict[str, str], str], Awaitable[dict]]
+
+
+async def iter_pages(
+    fetch_page: FetchPage,
+    continuation_keys: Dict[str, str],
+    max_pages: Optional[int] = None,
+) -> AsyncIterator[dict]:
+    """
+    KIS 연속조회 응답을 페이지 단위로 순회합니다.
+    호출자가 현재 페이지를 처리하는 동안 다음 페이지를 미리 요청합니다.
+
+    Args:
+        fetch_page: 연속조회 파라미터와 tr_cont 를 받아 한 페이지를 조회하는 함수
+        continuation_keys: 요청 파라미터 이름 -> 응답 본문 키 매핑
+                           (예: {"CTX_AREA_NK200": "ctx_area_nk200"})
+        max_pages: 최대 페이지 수
+
+    Yields:
+        dict: 페이지 응답
+
+    Raises:
+        HTTPException: 다음 페이지가 남았는데 max_pages 에 도달한 경우 (502).
+                       잘린 결과를 끝까지 받은 것처럼 저장하지 않도록 중단
+    """
+    max_pages = max_pages or DEFAULT_MAX_PAGES
+    pages = 0
+    pending = asyncio.create_task(fetch_page({}, ""))
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            pages += 1
+
+            if page.get("tr_cont") in _HAS_NEXT:
+                if pages < max_pages:
+                    cursor = {
+                        param: page.get(body_key, "")
+                        for param, body_key in continuation_keys.items()
+                    }
+                    pending = asyncio.create_task(fetch_page(cursor, "N"))
+                else:
+                    logger.warning("kis.max_pages_reached", max_pages=max_pages)
+                    raise HTTPException(
+                        status_code=502,
+                        detail=f"KIS API Error: more than {max_pages} pages (raise KIS_MAX_PAGES or narrow the range)",
+                    )
+
+            yield page
+    finally:
+        # 소비자가 중간에 멈추면 미리 요청한 페이지는 취소
+        if pending is not None:
+            pending.cancel()
+
+
+async def iter_rows(
+    pages: AsyncIterator[dict], rows_key: str = "output1"
+) -> AsyncIterator[dict]:
+    """
+    페이지 응답에서 행(rows_key 목록)을 하나씩 꺼내 순회합니다.
+
+    Args:
+        pages: iter_pages 가 반환한 페이지 이터레이터
+        rows_key: 행 목록이 담긴 응답 키
+
+    Yields:
+        dict: 행 데이터
+    """
+    try:
+        async for page in pages:
+            rows = page.get(rows_key) or []
+            if isinstance(rows, dict):
+                rows = [rows]
+            for row in rows:
+                yield row
+    finally:
+        # 소비자가 중간에 멈추면 페이지 이터레이터도 닫아 미리 요청한 페이지를 취소
+        await pages.aclose()
@@ -0,0 +1,159 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 우선순위 레인 (숫자가 작을수록 먼저 처리)
+PRIORITY_INGEST = 0  # 적재(쓰기) 작업
+PRIORITY_DASHBOARD = 1  # 대시보드 조회
+
+_LANE_NAMES = {PRIORITY_INGEST: "ingest", PRIORITY_DASHBOARD: "dashboard"}
+
+# 현재 작업의 우선순위. 적재 경로에서 kis_priority(PRIORITY_INGEST) 로 지정
+_current_priority: ContextVar[int] = ContextVar(
+    "kis_priority", default=PRIORITY_DASHBOARD
+)
+
+
+@contextmanager
+def kis_priority(priority: int) -> Iterator[None]:
+    """블록 안에서 발생하는 KIS 요청의 우선순위를 지정합니다."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucketScheduler:
+    """
+    앱 키 하나에 대한 토큰 버킷 기반 요청 스케줄러.
+
+    초당 rate 개의 토큰이 최대 burst 개까지 채워지며, 요청마다 토큰 하나를 소비합니다.
+    토큰이 없으면 실패하지 않고 대기열에 들어가고, 토큰이 생기면 우선순위
+    (적재 > 대시보드), 도착 순서대로 처리됩니다.
+
+    Args:
+        rate: 초당 허용 요청 수
+        burst: 버킷 최대 크기
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatcher: asyncio.Task = None
+        self.acquired = 0
+        self.queued = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.lane_acquired = {lane: 0 for lane in _LANE_NAMES}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def _record(self, priority: int, waited: float) -> None:
+        self.acquired += 1
+        self.lane_acquired[priority] = self.lane_acquired.get(priority, 0) + 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    async def acquire(self, priority: int = None) -> None:
+        """토큰 하나를 얻을 때까지 대기합니다."""
+        if priority is None:
+            priority = _current_priority.get()
+
+        self._refill()
+        if not self._queue and self._tokens >= 1:
+            self._tokens -= 1
+            self._record(priority, 0.0)
+            return
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), future))
+        self.queued += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        await future
+        self._record(priority, time.monotonic() - started)
+
+    async def _dispatch(self) -> None:
+        """대기열에 요청이 남아 있는 동안 토큰이 생기는 대로 깨웁니다."""
+        while self._queue:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+
+            _, _, future = heapq.heappop(self._queue)
+            # 대기 중 취소된 요청은 토큰을 소비하지 않음
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 3),
+            "queue_depth": len(self._queue),
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+            "acquired_by_lane": {
+                _LANE_NAMES.get(lane, str(lane)): count
+                for lane, count in self.lane_acquired.items()
+            },
+        }
+
+
+# 같은 앱 키로 KIS 를 호출하는 프로세스 수. 버킷은 프로세스마다 따로 있으므로
+# 앱 키의 한도를 이 수로 나눠 각 프로세스에 배분 (기본값: uvicorn 워커 수)
+KIS_RATE_LIMIT_PROCESSES = max(
+    int(os.getenv("KIS_RATE_LIMIT_PROCESSES") or os.getenv("WEB_CONCURRENCY") or "1"), 1
+)
+
+# 앱 키별 스케줄러 (같은 앱 키를 쓰는 모든 KisClient/KisSpotClient 가 공유)
+_schedulers: Dict[str, TokenBucketScheduler] = {}
+
+
+def get_rate_limiter(app_key: str) -> TokenBucketScheduler:
+    """앱 키에 해당하는 공유 스케줄러를 반환합니다. 없으면 생성합니다."""
+    scheduler = _schedulers.get(app_key)
+    if scheduler is None:
+        scheduler = TokenBucketScheduler(
+            rate=float(os.getenv("KIS_RATE_LIMIT_PER_SEC", "15"))
+            / KIS_RATE_LIMIT_PROCESSES,
+            burst=max(
+                int(os.getenv("KIS_RATE_LIMIT_BURST", "5")) // KIS_RATE_LIMIT_PROCESSES,
+                1,
+            ),
+        )
+        _schedulers[app_key] = scheduler
+    return scheduler
+
+
+def get_rate_limiter_stats() -> dict:
+    """앱 키별 스케줄러 대기열/대기시간 지표를 반환합니다. (앱 키는 앞 4자리만 노출)"""
+    return {
+        f"{app_key[:4]}***": scheduler.stats()
+        for app_key, scheduler in _schedulers.items()
+    }
@@ -1,13 +1,21 @@
 import os
-import requests
 from fastapi import HTTPException
 from dotenv import load_dotenv
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from app.utils.aws_secrets import get_aws_secret
+from app.utils.token_cache import get_access_token
+from app.services.kisTransport import request_kis, get_registered_client
+from app.services.kisPagination import iter_pages, iter_rows
+from app.utils.tracing import span
 
 load_dotenv()
 
+# 연속조회 요청 파라미터 -> 응답 본문 키
+_CONTINUATION_KEYS_100 = {
+    "CTX_AREA_FK100": "ctx_area_fk100",
+    "CTX_AREA_NK100": "ctx_area_nk100",
+}
+
 
 class KisSpotClient:
     """
@@ -39,7 +47,7 @@ class KisSpotClient:
                 status_code=500, detail="KIS API credentials not configured"
             )
 
-    def _get_base_headers(self, tr_id: str) -> dict:
+    async def _get_base_headers(self, tr_id: str) -> dict:
         """
         KIS API 요청에 사용할 기본 헤더를 생성합니다.
 
@@ -49,8 +57,8 @@ class KisSpotClient:
         Returns:
             dict: 헤더 딕셔너리
         """
-        access_token = get_aws_secret(self.aws_secret_id)
-
+        with span("kis.headers", tr_id=tr_id):
+            access_token = await get_access_token(self.aws_secret_id)
 
         return {
             "content-type": "application/json; charset=utf-8",
@@ -61,7 +69,9 @@ class KisSpotClient:
             "custtype": "P",
         }
 
-    def _make_api_request(self, endpoint: str, headers: dict, params: dict) -> dict:
+    async def _make_api_request(
+        self, endpoint: str, headers: dict, params: dict, tr_cont: str = ""
+    ) -> dict:
         """
         KIS API 요청을 수행합니다.
 
@@ -69,56 +79,90 @@ class KisSpotClient:
             endpoint (str): API 엔드포인트
             headers (dict): 요청 헤더
             params (dict): 쿼리 파라미터
+            tr_cont (str): 연속조회 여부 ("": 최초 조회, "N": 다음 페이지 조회)
 
         Returns:
             dict: API 응답 결과
         """
-        try:
-            response = requests.get(
-                f"{self.domain}{endpoint}",
-                headers=headers,
-                params=params,
-            )
-            response.raise_for_status()
-
-            result = response.json()
-
-            if result.get("rt_cd") != "0":
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"KIS API Error: {result.get('msg1', 'Unknown error')}",
-                )
-
-            print(result)
-            return result
-
-        except requests.exceptions.RequestException as e:
-            raise HTTPException(
-                status_code=500, detail=f"HTTP error occurred: {str(e)}"
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+        with span("kis.request", tr_id=headers.get("tr_id", "")):
+            return await request_kis(self.domain, endpoint, headers, params, tr_cont)
 
     
-    def get_spot_balance_daily_profit(self, start_date: str, end_date: str) -> dict:
+    async def get_spot_balance_daily_profit(
+        self,
+        start_date: str,
+        end_date: str,
+        ctx_area_fk100: str = "",
+        ctx_area_nk100: str = "",
+        tr_cont: str = "",
+    ) -> dict:
         """
         기간별손익일별합산조회
+
+        Args:
+            start_date (str): 조회시작일자 (YYYYMMDD)
+            end_date (str): 조회종료일자 (YYYYMMDD)
+            ctx_area_fk100 (str): 연속조회검색조건100 (다음페이지 조회시 이전 응답값 사용)
+            ctx_area_nk100 (str): 연속조회키100 (다음페이지 조회시 이전 응답값 사용)
+            tr_cont (str): 연속조회 여부 (다음 페이지 조회시 "N")
         """
         endpoint = "/uapi/domestic-stock/v1/trading/inquire-period-profit"
         
-        headers = self._get_base_headers("TTTC8708R")
+        headers = await self._get_base_headers("TTTC8708R")
         params = {
             "ACNT_PRDT_CD": self.acnt_prdt_cd,  # 계좌상품코드
             "CANO": self.cano,  # 종합계좌번호
             "INQR_STRT_DT": start_date,  # 조회시작일자
             "INQR_END_DT": end_date,  # 조회종료일자
             "PDNO": "",  # 상품번호 (공란입력 시 전체)
-            "CTX_AREA_NK100": "",  # 연속조회키100       
+            "CTX_AREA_NK100": ctx_area_nk100,  # 연속조회키100
             "SORT_DVSN": "00",  # 정렬구분 (00: 최근 순)
             "INQR_DVSN": "00",  # 조회구분
             "CBLC_DVSN": "00",  # 잔고구분 (00: 전체)
-            "CTX_AREA_FK100": "",  # 연속조회검색조건100
+            "CTX_AREA_FK100": ctx_area_fk100,  # 연속조회검색조건100
         }
         
-        return self._make_api_request(endpoint, headers, params)
+        return await self._make_api_request(endpoint, headers, params, tr_cont)
+
+    def iter_spot_balance_daily_profit(
+        self, start_date: str, end_date: str, max_pages: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """
+        기간별손익일별합산(output1)을 연속조회 키를 따라가며 일자 행 단위로 순회합니다.
+
+        Args:
+            start_date (str): 조회시작일자 (YYYYMMDD)
+            end_date (str): 조회종료일자 (YYYYMMDD)
+            max_pages (int): 최대 페이지 수
 
+        Yields:
+            dict: 일자별 손익 행
+        """
+        pages = iter_pages(
+            lambda cursor, tr_cont: self.get_spot_balance_daily_profit(
+                start_date,
+                end_date,
+                cursor.get("CTX_AREA_FK100", ""),
+                cursor.get("CTX_AREA_NK100", ""),
+                tr_cont,
+            ),
+            _CONTINUATION_KEYS_100,
+            max_pages,
+        )
+        return iter_rows(pages, "output1")
+
+
+def get_kis_spot_client(**credentials) -> KisSpotClient:
+    """자격증명 조합별로 재사용되는 KisSpotClient 인스턴스를 반환합니다."""
+    return get_registered_client(KisSpotClient, **credentials)
+
+
+def get_spot_credentials_from_env() -> dict:
+    """현물 계좌용 KIS 자격증명을 환경변수에서 읽어옵니다."""
+    return {
+        "app_key": os.getenv("NEXT_PUBLIC_KIS_SPOT_APP_KEY"),
+        "app_secret": os.getenv("NEXT_PUBLIC_KIS_SPOT_APP_SECRET"),
+        "cano": os.getenv("NEXT_PUBLIC_KIS_SPOT_CANO"),
+        "acnt_prdt_cd": os.getenv("NEXT_PUBLIC_KIS_ACNT_PRDT_CD"),
+        "aws_secret_id": os.getenv("AWS_SECRET_ID_SPOT"),
+    }
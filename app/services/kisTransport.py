@@ -0,0 +1,311 @@
+import os
+import time
+import asyncio
+from typing import Optional, Tuple
+
+import httpx
+import orjson
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+from app.services.kisRateLimiter import get_rate_limiter
+from app.utils.cache import LRUCache, MISSING
+from app.utils.market_hours import market_ttl
+from app.utils.metrics import Counter, Histogram
+from app.utils.tracing import span
+from app.utils.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+# KIS 초당 거래건수 초과 응답 코드와 재시도 횟수
+RATE_LIMIT_MSG_CD = "EGW00201"
+KIS_RATE_LIMIT_RETRIES = int(os.getenv("KIS_RATE_LIMIT_RETRIES", "2"))
+
+# 모든 KIS 클라이언트가 공유하는 HTTP 트랜스포트 (keep-alive 커넥션 풀)
+_transport: Optional[httpx.AsyncClient] = None
+
+# 자격증명 조합별 클라이언트 인스턴스 레지스트리
+_client_registry: dict = {}
+
+# 장 상태별 KIS 응답 캐시 TTL(초). 0 이면 캐시하지 않음
+KIS_CACHE_TTL_MARKET = float(os.getenv("KIS_CACHE_TTL_MARKET", "5"))
+KIS_CACHE_TTL_OFF_MARKET = float(os.getenv("KIS_CACHE_TTL_OFF_MARKET", "60"))
+KIS_CACHE_TTL_SETTLED = float(os.getenv("KIS_CACHE_TTL_SETTLED", "1800"))
+
+# (도메인, 엔드포인트, tr_id, 앱 키, 파라미터, tr_cont) -> 직렬화된 응답 (orjson)
+_response_cache = LRUCache(maxsize=int(os.getenv("KIS_CACHE_SIZE", "256")))
+
+# 진행 중인 동일 요청 (요청 병합용)
+_inflight: dict = {}
+_coalesce_stats = {"coalesced": 0}
+
+# tr_id 별 upstream 호출 지연(재시도 포함 각 시도)과 결과 코드
+kis_request_duration = Histogram(
+    "kis_request_duration_seconds", "KIS upstream HTTP latency per attempt", ("tr_id",)
+)
+kis_requests_total = Counter(
+    "kis_requests_total",
+    "KIS upstream attempts by result (ok, KIS msg_cd, http_<status>, timeout, error)",
+    ("tr_id", "result"),
+)
+
+
+def _transport_settings() -> dict:
+    """환경변수에서 KIS HTTP 트랜스포트 설정을 읽어옵니다."""
+    connect_timeout = float(os.getenv("KIS_CONNECT_TIMEOUT", "3"))
+    read_timeout = float(os.getenv("KIS_READ_TIMEOUT", "10"))
+    return {
+        "timeout": httpx.Timeout(
+            read_timeout, connect=connect_timeout, pool=connect_timeout
+        ),
+        "limits": httpx.Limits(
+            max_connections=int(os.getenv("KIS_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("KIS_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("KIS_KEEPALIVE_EXPIRY", "60")),
+        ),
+    }
+
+
+def get_kis_transport() -> httpx.AsyncClient:
+    """공유 KIS HTTP 트랜스포트를 반환합니다. 없으면 생성합니다."""
+    global _transport
+    if _transport is None or _transport.is_closed:
+        _transport = httpx.AsyncClient(**_transport_settings())
+    return _transport
+
+
+async def close_kis_transport() -> None:
+    """공유 KIS HTTP 트랜스포트를 종료합니다."""
+    global _transport
+    if _transport is not None:
+        transport, _transport = _transport, None
+        await transport.aclose()
+    _client_registry.clear()
+    _response_cache.clear()
+
+
+async def request_kis(
+    domain: str, endpoint: str, headers: dict, params: dict, tr_cont: str = ""
+) -> dict:
+    """
+    KIS API GET 요청을 캐시와 요청 병합(coalescing)을 거쳐 수행합니다.
+
+    (tr_id, 계좌, 파라미터)가 같은 요청은 캐시된 응답을 돌려주고, 이미 진행 중인
+    동일 요청이 있으면 새로 호출하지 않고 그 결과를 함께 기다립니다.
+    캐시 TTL 은 장 상태(정규장/장 마감 후/본정산 후)에 따라 달라집니다.
+
+    Args:
+        domain (str): KIS API 도메인
+        endpoint (str): API 엔드포인트
+        headers (dict): 요청 헤더
+        params (dict): 쿼리 파라미터
+        tr_cont (str): 연속조회 여부 ("": 최초 조회, "N": 다음 페이지 조회)
+
+    Returns:
+        dict: API 응답 결과
+    """
+    key = (
+        domain,
+        endpoint,
+        headers.get("tr_id", ""),
+        headers.get("appkey", ""),
+        tuple(sorted(params.items())),
+        tr_cont,
+    )
+
+    # 캐시에는 직렬화된 본문을 두고 호출자마다 새로 디코딩해, 호출자가 행을 고쳐도
+    # 캐시나 다른 호출자의 응답이 바뀌지 않게 함
+    cached = _response_cache.get(key)
+    if cached is not MISSING:
+        return orjson.loads(cached)
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _request_kis_serialized(domain, endpoint, headers, params, tr_cont)
+        )
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _on_request_done(key, t))
+    else:
+        _coalesce_stats["coalesced"] += 1
+
+    # 먼저 요청한 쪽이 취소되어도 함께 기다리는 요청을 위해 호출은 계속 진행
+    result = await asyncio.shield(task)
+    return orjson.loads(result)
+
+
+async def _request_kis_serialized(
+    domain: str, endpoint: str, headers: dict, params: dict, tr_cont: str
+) -> bytes:
+    """upstream 응답을 캐시와 병합된 호출자들이 공유할 수 있도록 직렬화해 반환합니다."""
+    return orjson.dumps(
+        await _request_kis_upstream(domain, endpoint, headers, params, tr_cont)
+    )
+
+
+def _on_request_done(key: tuple, task: asyncio.Task) -> None:
+    _inflight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    ttl = market_ttl(KIS_CACHE_TTL_MARKET, KIS_CACHE_TTL_OFF_MARKET, KIS_CACHE_TTL_SETTLED)
+    if ttl > 0:
+        _response_cache.set(key, task.result(), ttl=ttl)
+
+
+def get_kis_cache_stats() -> dict:
+    """KIS 응답 캐시와 요청 병합 지표를 반환합니다."""
+    stats = _response_cache.stats()
+    stats.update(_coalesce_stats)
+    stats["inflight"] = len(_inflight)
+    return stats
+
+
+async def _request_kis_upstream(
+    domain: str, endpoint: str, headers: dict, params: dict, tr_cont: str = ""
+) -> dict:
+    """
+    공유 트랜스포트로 KIS API GET 요청을 수행합니다.
+
+    Args:
+        domain (str): KIS API 도메인
+        endpoint (str): API 엔드포인트
+        headers (dict): 요청 헤더
+        params (dict): 쿼리 파라미터
+        tr_cont (str): 연속조회 여부 ("": 최초 조회, "N": 다음 페이지 조회)
+
+    Returns:
+        dict: API 응답 결과. 응답 헤더의 연속조회 여부를 "tr_cont" 키로 함께 담는다
+              ("F"/"M": 다음 페이지 있음, "D"/"E": 마지막 페이지)
+    """
+    if tr_cont:
+        headers = {**headers, "tr_cont": tr_cont}
+
+    # 같은 앱 키를 쓰는 모든 클라이언트가 하나의 요청 한도를 나눠 씀
+    limiter = get_rate_limiter(headers.get("appkey", ""))
+    tr_id = headers.get("tr_id", "")
+
+    try:
+        for attempt in range(KIS_RATE_LIMIT_RETRIES + 1):
+            await limiter.acquire()
+            response, result = await _timed_get(
+                tr_id, f"{domain}{endpoint}", headers, params
+            )
+            # 초당 거래건수 초과는 잠시 뒤 다시 대기열을 거쳐 재시도
+            if (
+                attempt < KIS_RATE_LIMIT_RETRIES
+                and result is not None
+                and result.get("msg_cd") == RATE_LIMIT_MSG_CD
+            ):
+                await asyncio.sleep(0.5 * (attempt + 1))
+                continue
+            break
+
+        response.raise_for_status()
+
+        if result is None:
+            logger.warning("kis.invalid_response", tr_id=tr_id, body=response.text)
+            raise HTTPException(
+                status_code=502, detail="KIS API Error: invalid response body"
+            )
+
+        if result.get("rt_cd") != "0":
+            logger.warning(
+                "kis.error",
+                tr_id=tr_id,
+                msg_cd=result.get("msg_cd"),
+                msg1=result.get("msg1"),
+            )
+            raise HTTPException(
+                status_code=400,
+                detail=f"KIS API Error: {result.get('msg1', 'Unknown error')}",
+            )
+
+        result["tr_cont"] = response.headers.get("tr_cont", "")
+
+        logger.debug(
+            "kis.response",
+            tr_id=tr_id,
+            tr_cont=result["tr_cont"],
+            msg_cd=result.get("msg_cd"),
+            body=result,
+        )
+        return result
+
+    except HTTPException:
+        raise
+    except httpx.TimeoutException as e:
+        raise HTTPException(status_code=504, detail=f"KIS API timeout: {str(e)}")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"HTTP error occurred: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+async def _timed_get(
+    tr_id: str, url: str, headers: dict, params: dict
+) -> Tuple[httpx.Response, Optional[dict]]:
+    """
+    upstream GET 한 번을 수행하고 tr_id 별 지연과 결과 코드를 기록합니다.
+
+    Returns:
+        (응답, 본문 JSON). 본문이 JSON 객체가 아니면 None. 본문은 여기서 한 번만 파싱함
+    """
+    started = time.perf_counter()
+    try:
+        with span("kis.http", tr_id=tr_id):
+            response = await get_kis_transport().get(url, headers=headers, params=params)
+    except httpx.TimeoutException:
+        kis_requests_total.inc(tr_id, "timeout")
+        raise
+    except httpx.HTTPError:
+        kis_requests_total.inc(tr_id, "error")
+        raise
+    finally:
+        kis_request_duration.observe(time.perf_counter() - started, tr_id)
+
+    body = _parse_body(response)
+    kis_requests_total.inc(tr_id, _result_code(response, body))
+    return response, body
+
+
+def _parse_body(response: httpx.Response) -> Optional[dict]:
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def _result_code(response: httpx.Response, body: Optional[dict]) -> str:
+    if response.is_error:
+        return f"http_{response.status_code}"
+    if body is None:
+        return "invalid_json"
+    if body.get("rt_cd") == "0":
+        return "ok"
+    return body.get("msg_cd") or f"rt_cd_{body.get('rt_cd')}"
+
+
+def get_registered_client(client_cls, **credentials):
+    """
+    자격증명 조합별로 클라이언트 인스턴스를 재사용합니다.
+
+    Args:
+        client_cls: KisClient 또는 KisSpotClient
+        **credentials: app_key, app_secret, domain, cano, acnt_prdt_cd, aws_secret_id
+
+    Returns:
+        client_cls 인스턴스
+    """
+    key = (client_cls, tuple(sorted(credentials.items())))
+    client = _client_registry.get(key)
+    if client is None:
+        client = client_cls(**credentials)
+        # 임의의 자격증명으로 레지스트리가 무한히 커지지 않도록 오래된 항목부터 제거
+        max_size = int(os.getenv("KIS_CLIENT_REGISTRY_SIZE", "32"))
+        while len(_client_registry) >= max_size:
+            _client_registry.pop(next(iter(_client_registry)))
+        _client_registry[key] = client
+    return client
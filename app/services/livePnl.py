@@ -0,0 +1,195 @@
+import os
+import time
+import asyncio
+from typing import Any, Dict, Optional, Set
+from dotenv import load_dotenv
+
+from app.services.kisClient import get_kis_client
+from app.services.kisSpotClient import get_kis_spot_client
+from app.services.accounts import gather_accounts
+from app.utils.market_hours import is_trading_hours, now_kst
+from app.utils.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+# 장중/장외 KIS 조회 주기(초). 구독자가 몇 명이든 이 주기로 한 번만 조회
+LIVE_PNL_INTERVAL = float(os.getenv("LIVE_PNL_INTERVAL", "5"))
+LIVE_PNL_OFF_MARKET_INTERVAL = float(os.getenv("LIVE_PNL_OFF_MARKET_INTERVAL", "60"))
+
+# 구독자별 대기 이벤트 수. 넘치면 밀린 변경분을 버리고 전체 스냅샷 하나로 대체
+LIVE_PNL_QUEUE_SIZE = int(os.getenv("LIVE_PNL_QUEUE_SIZE", "8"))
+
+# 마지막 구독자가 나간 뒤 조회를 멈추기까지의 시간(초)
+LIVE_PNL_IDLE_SECONDS = float(os.getenv("LIVE_PNL_IDLE_SECONDS", "30"))
+
+
+async def _fetch_future_pnl() -> Dict[str, float]:
+    """선물 자격증명이 있는 전체 계좌의 오늘 선물 손익 합계 (/pnl/daily 와 같은 기준)."""
+
+    async def fetch(account) -> Dict[str, float]:
+        response = await get_kis_client(**account.future).get_futureoption_balance()
+        output2 = response.get("output2") or {}
+        return {
+            "futurePnl": float(output2.get("futr_trad_pfls_amt") or 0),
+            "futureEvalPnl": float(output2.get("futr_evlu_pfls_amt") or 0),
+        }
+
+    results = await gather_accounts("future", fetch)
+    return {
+        "futurePnl": sum(result["futurePnl"] for result in results.values()),
+        "futureEvalPnl": sum(result["futureEvalPnl"] for result in results.values()),
+    }
+
+
+async def _fetch_stock_pnl() -> Dict[str, float]:
+    """현물 자격증명이 있는 전체 계좌의 오늘 실현손익 합계."""
+    today = now_kst().strftime("%Y%m%d")
+
+    async def fetch(account) -> float:
+        client = get_kis_spot_client(**account.spot)
+        response = await client.get_spot_balance_daily_profit(today, today)
+        return sum(
+            float(row.get("rlzt_pfls") or 0)
+            for row in response.get("output1") or []
+            if row.get("trad_dt") == today
+        )
+
+    results = await gather_accounts("spot", fetch)
+    return {"stockPnl": sum(results.values())}
+
+
+class Subscription:
+    """구독자 하나의 이벤트 대기열."""
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=LIVE_PNL_QUEUE_SIZE)
+        self.resyncs = 0
+
+
+class LivePnlBroadcaster:
+    """
+    오늘 손익을 하나의 백그라운드 poller 로 조회해 모든 구독자에게 변경분을 보냅니다.
+
+    - 첫 구독자가 들어오면 poller 를 시작하고, 마지막 구독자가 나간 뒤
+      LIVE_PNL_IDLE_SECONDS 가 지나면 멈춥니다. KIS 호출량은 구독자 수와 무관합니다.
+    - 구독 직후 전체 스냅샷을, 이후에는 바뀐 필드만 보냅니다.
+    - 느린 구독자의 대기열이 가득 차면 밀린 변경분을 버리고 최신 전체 스냅샷 하나로 바꿔
+      poller 가 막히지 않게 합니다.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._state: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._idle_since: Optional[float] = None
+        self.polls = 0
+        self.poll_errors = 0
+        self.events = 0
+        self.resyncs = 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription()
+        if self._state:
+            subscription.queue.put_nowait(("snapshot", dict(self._state)))
+        self._subscribers.add(subscription)
+        self._idle_since = None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+        if not self._subscribers:
+            self._idle_since = time.monotonic()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _publish(self, event: str, payload: Dict[str, Any]) -> None:
+        for subscription in self._subscribers:
+            try:
+                subscription.queue.put_nowait((event, payload))
+            except asyncio.QueueFull:
+                # 느린 구독자: 밀린 변경분 대신 최신 전체 스냅샷 하나만 남김
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(("snapshot", dict(self._state)))
+                subscription.resyncs += 1
+                self.resyncs += 1
+        self.events += 1
+
+    async def poll_once(self) -> None:
+        """KIS 에서 오늘 손익을 조회하고 바뀐 값이 있으면 구독자에게 보냅니다."""
+        results = await asyncio.gather(
+            _fetch_future_pnl(), _fetch_stock_pnl(), return_exceptions=True
+        )
+        self.polls += 1
+
+        # 소스별로 실패를 격리하여 성공한 값만 반영
+        update: Dict[str, Any] = {}
+        for result in results:
+            if isinstance(result, Exception):
+                self.poll_errors += 1
+                logger.warning("live_pnl.fetch_failed", error=result)
+            else:
+                update.update(result)
+
+        today = now_kst().strftime("%Y-%m-%d")
+        if self._state.get("date") != today:
+            # 날짜가 바뀌면 전날 값을 이어가지 않음
+            self._state = {"date": today}
+            update.setdefault("futurePnl", 0.0)
+            update.setdefault("stockPnl", 0.0)
+
+        delta = {k: v for k, v in update.items() if self._state.get(k) != v}
+        if not delta:
+            return
+        self._state.update(delta)
+        self._state["totalPnl"] = self._state.get("stockPnl", 0.0) + self._state.get(
+            "futurePnl", 0.0
+        )
+        self._state["updatedAt"] = now_kst().isoformat()
+        delta.update(
+            date=today,
+            totalPnl=self._state["totalPnl"],
+            updatedAt=self._state["updatedAt"],
+        )
+        self._publish("delta", delta)
+
+    async def _poll_loop(self) -> None:
+        while True:
+            if (
+                self._idle_since is not None
+                and time.monotonic() - self._idle_since >= LIVE_PNL_IDLE_SECONDS
+            ):
+                self._task = None
+                return
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.poll_errors += 1
+                logger.error("live_pnl.poll_failed", error=e)
+            await asyncio.sleep(
+                LIVE_PNL_INTERVAL if is_trading_hours() else LIVE_PNL_OFF_MARKET_INTERVAL
+            )
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "subscribers": len(self._subscribers),
+            "polls": self.polls,
+            "poll_errors": self.poll_errors,
+            "events": self.events,
+            "resyncs": self.resyncs,
+            "state": self._state,
+        }
+
+
+live_pnl = LivePnlBroadcaster()
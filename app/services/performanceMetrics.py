@@ -0,0 +1,324 @@
+import os
+import math
+import time
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional, Dict, Any
+
+import numpy as np
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+from app.database.connection import get_db_connection
+from app.utils.cache import LRUCache, MISSING
+from app.utils.pnl_cache import historical_pnl_cache
+
+load_dotenv()
+
+TRADING_DAYS_PER_YEAR = 252
+
+# 적재 상태를 다시 확인하기 전까지 재사용하는 시간(초).
+# 이 프로세스의 적재 경로가 쓰면 그 즉시 다시 확인한다
+FINGERPRINT_TTL = float(os.getenv("PERF_FINGERPRINT_TTL", "30"))
+
+# 성과 지표는 전체 계좌 합산 행(account_id = '*')으로 계산
+_FINGERPRINT_QUERY = """
+SELECT max(period_start) AS last_date,
+       max(updated_at) AS updated_at,
+       count(*) AS count,
+       COALESCE(sum(total_pnl), 0) AS total_pnl
+FROM pnl_rollup
+WHERE account_id = '*' AND period_type = 'day'
+"""
+
+
+@dataclass
+class RunningPerformance:
+    """
+    누적 성과 지표의 증분 계산 상태.
+
+    새 날짜가 추가될 때 전체를 다시 읽지 않고 일간 수익률의 평균/분산(Welford),
+    평가금액의 고점과 최대낙폭만 갱신합니다.
+    평가금액이 한 번이라도 0 이하가 되면 수익률을 정의할 수 없으므로 depleted 로 표시합니다.
+    """
+
+    equity_start: float
+    first_date: date
+    last_date: date
+    n: int
+    mean: float
+    m2: float
+    equity: float
+    peak: float
+    max_drawdown: float
+    total_pnl: float
+    depleted: bool = False
+
+    @classmethod
+    def from_series(
+        cls, days: list, pnl: np.ndarray, equity_start: float
+    ) -> "RunningPerformance":
+        """일별 손익 시계열 전체로부터 벡터 연산으로 상태를 만듭니다."""
+        equity = equity_start + np.cumsum(pnl)
+        curve = np.concatenate(([equity_start], equity))
+        depleted = bool((curve <= 0).any())
+        # depleted 이면 지표를 내지 않으므로 0 나눗셈 경고만 막음
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = pnl / curve[:-1]
+            peaks = np.maximum.accumulate(curve)
+            drawdowns = curve / peaks - 1
+        mean = float(returns.mean()) if len(returns) else 0.0
+        return cls(
+            equity_start=equity_start,
+            first_date=days[0],
+            last_date=days[-1],
+            n=len(returns),
+            mean=mean,
+            m2=float(((returns - mean) ** 2).sum()),
+            equity=float(curve[-1]),
+            peak=float(peaks[-1]),
+            max_drawdown=float(drawdowns.min()),
+            total_pnl=float(pnl.sum()),
+            depleted=depleted,
+        )
+
+    def append(self, day: date, pnl: float) -> None:
+        """하루치 손익을 추가합니다."""
+        self.n += 1
+        self.total_pnl += pnl
+        self.last_date = day
+        if self.depleted or self.equity <= 0 or self.equity + pnl <= 0:
+            self.equity += pnl
+            self.depleted = True
+            return
+
+        r = pnl / self.equity
+        delta = r - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (r - self.mean)
+
+        self.equity += pnl
+        self.peak = max(self.peak, self.equity)
+        self.max_drawdown = min(self.max_drawdown, self.equity / self.peak - 1)
+
+    def metrics(self, risk_free_rate: float) -> Dict[str, float]:
+        """Total Return, CAGR, Max Drawdown, Volatility, Sharpe Ratio 를 계산합니다."""
+        ratio = self.equity / self.equity_start
+        years = ((self.last_date - self.first_date).days + 1) / 365.25
+        std = math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+        daily_rf = risk_free_rate / TRADING_DAYS_PER_YEAR
+        return {
+            "total_return": ratio - 1,
+            "cagr": ratio ** (1 / years) - 1 if ratio > 0 and years > 0 else 0.0,
+            "max_drawdown": self.max_drawdown,
+            "volatility": std * math.sqrt(TRADING_DAYS_PER_YEAR),
+            "sharpe": (
+                (self.mean - daily_rf) / std * math.sqrt(TRADING_DAYS_PER_YEAR)
+                if std > 0
+                else 0.0
+            ),
+        }
+
+
+class PerformanceEngine:
+    """
+    pnl_rollup 의 전체 계좌 합산 일별 현물+선물 손익으로 성과 지표를 계산합니다.
+
+    결과는 (구간, 마지막 적재 상태) 별로 캐시되고, 전체 기간(since inception)은
+    새 날짜가 추가될 때 증분 경로로 갱신됩니다.
+
+    Args:
+        initial_capital: 기준 투자원금. 평가금액 = 원금 + 누적손익
+        risk_free_rate: 연 무위험 수익률 (Sharpe Ratio 계산용)
+    """
+
+    def __init__(self, initial_capital: Optional[float], risk_free_rate: float = 0.0):
+        self.initial_capital = initial_capital
+        self.risk_free_rate = risk_free_rate
+        self._results = LRUCache(maxsize=64)
+        self._running: Optional[RunningPerformance] = None
+        self._running_as_of: Optional[datetime] = None
+        # 전체 기간 상태는 요청들이 공유하므로 갱신과 지표 계산을 한 번에 하나씩
+        self._running_lock = asyncio.Lock()
+        self._fingerprint = None
+        self._fingerprint_at = 0.0
+        self._fingerprint_version = -1
+        self.incremental_updates = 0
+        self.full_loads = 0
+
+    async def _get_fingerprint(self, conn) -> tuple:
+        """마지막 적재 상태 (마지막 날짜, 마지막 갱신시각, 행 수, 손익 합계)를 반환합니다."""
+        fresh = (
+            self._fingerprint is not None
+            and self._fingerprint_version == historical_pnl_cache.version
+            and time.monotonic() - self._fingerprint_at < FINGERPRINT_TTL
+        )
+        if not fresh:
+            row = await conn.fetchrow(_FINGERPRINT_QUERY)
+            self._fingerprint = (
+                row["last_date"],
+                row["updated_at"],
+                row["count"],
+                float(row["total_pnl"]),
+            )
+            self._fingerprint_at = time.monotonic()
+            self._fingerprint_version = historical_pnl_cache.version
+        return self._fingerprint
+
+    async def _load_running(self, conn, fingerprint: tuple) -> RunningPerformance:
+        """
+        전체 기간 상태를 증분(가능하면) 또는 전체 재계산으로 최신화합니다.
+        self._running_lock 을 잡은 상태에서 호출해야 합니다.
+        """
+        running = self._running
+        if running is not None:
+            rows = await conn.fetch(
+                """
+                SELECT period_start, total_pnl, updated_at
+                FROM pnl_rollup
+                WHERE account_id = '*' AND period_type = 'day'
+                  AND (period_start > $1 OR updated_at > $2)
+                ORDER BY period_start
+                """,
+                running.last_date,
+                self._running_as_of,
+            )
+            # 과거 날짜가 바뀌었으면 증분 계산이 불가능하므로 전체 재계산
+            if all(row["period_start"] > running.last_date for row in rows):
+                for row in rows:
+                    running.append(row["period_start"], float(row["total_pnl"]))
+                    self._running_as_of = max(self._running_as_of, row["updated_at"])
+                _, _, count, total_pnl = fingerprint
+                if running.n == count and math.isclose(
+                    running.total_pnl, total_pnl, abs_tol=0.5
+                ):
+                    self.incremental_updates += 1
+                    return running
+
+        rows = await conn.fetch(
+            """
+            SELECT period_start, total_pnl, updated_at
+            FROM pnl_rollup
+            WHERE account_id = '*' AND period_type = 'day'
+            ORDER BY period_start
+            """
+        )
+        days = [row["period_start"] for row in rows]
+        pnl = np.array([row["total_pnl"] for row in rows], dtype=np.float64)
+        self._running = RunningPerformance.from_series(
+            days, pnl, self.initial_capital
+        )
+        self._running_as_of = max(row["updated_at"] for row in rows)
+        self.full_loads += 1
+        return self._running
+
+    async def _compute_window(self, conn, start: Optional[date], end: Optional[date]):
+        rows = await conn.fetch(
+            """
+            SELECT period_start, total_pnl, cumulative_pnl
+            FROM pnl_rollup
+            WHERE account_id = '*' AND period_type = 'day'
+              AND period_start BETWEEN $1 AND $2
+            ORDER BY period_start
+            """,
+            start or date.min,
+            end or date.max,
+        )
+        if not rows:
+            return None
+        days = [row["period_start"] for row in rows]
+        pnl = np.array([row["total_pnl"] for row in rows], dtype=np.float64)
+        # 구간 시작 전까지의 누적손익을 반영한 평가금액에서 출발
+        equity_start = (
+            self.initial_capital
+            + float(rows[0]["cumulative_pnl"])
+            - float(rows[0]["total_pnl"])
+        )
+        return RunningPerformance.from_series(days, pnl, equity_start)
+
+    async def get_metrics(
+        self, start: Optional[date] = None, end: Optional[date] = None
+    ) -> Optional[Dict[str, float]]:
+        """
+        구간의 성과 지표를 반환합니다. 데이터가 없으면 None.
+
+        Args:
+            start: 시작 날짜 (없으면 처음부터)
+            end: 종료 날짜 (없으면 마지막 적재일까지)
+
+        Raises:
+            HTTPException: 투자원금이 설정되지 않았거나(503) 평가금액이 0 이하가 되어
+                           수익률을 계산할 수 없는 경우(422)
+        """
+        if not self.initial_capital:
+            raise HTTPException(
+                status_code=503,
+                detail="Performance metrics unavailable: PORTFOLIO_INITIAL_CAPITAL is not configured",
+            )
+
+        async with get_db_connection() as conn:
+            fingerprint = await self._get_fingerprint(conn)
+            if not fingerprint[2]:
+                return None
+
+            key = (start, end, fingerprint)
+            cached = self._results.get(key)
+            if cached is not MISSING:
+                return cached
+
+            if start is None and end is None:
+                async with self._running_lock:
+                    # 락을 기다리는 사이 다른 요청이 같은 상태로 계산했을 수 있음
+                    cached = self._results.get(key)
+                    if cached is not MISSING:
+                        return cached
+                    state = await self._load_running(conn, fingerprint)
+                    result = self._metrics(state)
+                    self._results.set(key, result)
+                return result
+
+            state = await self._compute_window(conn, start, end)
+
+        result = self._metrics(state) if state else None
+        self._results.set(key, result)
+        return result
+
+    def _metrics(self, state: RunningPerformance) -> Dict[str, float]:
+        # 손실이 원금을 넘으면 지표가 inf/NaN 이 되어 null 로 직렬화되므로 오류로 알림
+        if state.depleted:
+            raise HTTPException(
+                status_code=422,
+                detail="Performance metrics undefined: equity fell to or below zero (check PORTFOLIO_INITIAL_CAPITAL)",
+            )
+        return state.metrics(self.risk_free_rate)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._results.stats()
+        stats["incremental_updates"] = self.incremental_updates
+        stats["full_loads"] = self.full_loads
+        return stats
+
+
+def _initial_capital() -> Optional[float]:
+    value = os.getenv("PORTFOLIO_INITIAL_CAPITAL")
+    return float(value) if value else None
+
+
+performance_engine = PerformanceEngine(
+    _initial_capital(), float(os.getenv("RISK_FREE_RATE", "0"))
+)
+
+
+def format_metrics(metrics: Optional[Dict[str, float]]) -> list:
+    """대시보드 표시용 label/value 목록으로 변환합니다."""
+    metrics = metrics or dict.fromkeys(
+        ("total_return", "cagr", "max_drawdown", "volatility", "sharpe"), 0.0
+    )
+    return [
+        {"label": "Total Return", "value": f"{metrics['total_return'] * 100:.2f}%"},
+        {"label": "CAGR(Annualized)", "value": f"{metrics['cagr'] * 100:.2f}%"},
+        {"label": "Max Drawdown", "value": f"{metrics['max_drawdown'] * 100:.2f}%"},
+        {"label": "Volatility", "value": f"{metrics['volatility'] * 100:.2f}%"},
+        {"label": "Sharpe Ratio", "value": f"{metrics['sharpe']:.2f}"},
+    ]
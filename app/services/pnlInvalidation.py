@@ -0,0 +1,128 @@
+import os
+import uuid
+import asyncio
+from datetime import date
+from typing import Iterable, Optional
+
+import asyncpg
+import orjson
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+from app.utils.pnl_cache import historical_pnl_cache
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+# pnl_rollup 이 바뀌었음을 알리는 NOTIFY 채널
+PNL_CHANGED_CHANNEL = "pnl_rollup_changed"
+
+PNL_INVALIDATION_LISTEN = os.getenv("PNL_INVALIDATION_LISTEN", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# LISTEN 연결이 끊겼을 때 다시 연결하기까지 대기(초)
+PNL_INVALIDATION_RETRY_SECONDS = float(os.getenv("PNL_INVALIDATION_RETRY_SECONDS", "5"))
+
+# 알림을 보낸 프로세스 식별자. pid 는 레플리카(컨테이너)마다 겹칠 수 있으므로 임포트 시 무작위로 만듦
+INSTANCE_ID = uuid.uuid4().hex
+
+# NOTIFY payload 는 8000 바이트 제한이 있으므로 날짜가 많으면 전체 무효화로 보냄
+_MAX_NOTIFY_DATES = 500
+
+
+async def notify_pnl_changed(
+    conn: asyncpg.Connection, dates: Optional[Iterable[date]] = None
+) -> None:
+    """
+    다른 워커/레플리카의 손익 캐시를 무효화하도록 알립니다.
+
+    트랜잭션 안에서 호출하면 커밋될 때 전달되고 롤백되면 전달되지 않으므로,
+    pnl_rollup 을 갱신한 트랜잭션 안에서 호출합니다.
+
+    Args:
+        conn: DB 연결
+        dates: 바뀐 날짜 목록. None 이면 전체 무효화
+    """
+    days = None if dates is None else sorted({d.isoformat() for d in dates})
+    if days is not None and len(days) > _MAX_NOTIFY_DATES:
+        days = None
+    payload = orjson.dumps({"instance": INSTANCE_ID, "dates": days}).decode()
+    await conn.execute("SELECT pg_notify($1, $2)", PNL_CHANGED_CHANNEL, payload)
+
+
+class PnlInvalidationListener:
+    """
+    pnl_rollup 변경 알림(LISTEN)을 받아 이 프로세스의 손익 이력 캐시를 무효화합니다.
+
+    여러 워커 프로세스나 레플리카로 실행하면 적재는 한 프로세스에서만 일어나므로,
+    나머지 프로세스는 이 알림으로 캐시를 맞춥니다. 풀과 별도의 전용 연결을 쓰며,
+    연결이 끊기면 그동안의 알림을 놓쳤을 수 있으므로 다시 연결할 때 캐시 전체를 비웁니다.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.received = 0
+        self.reconnects = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        try:
+            message = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            message = {}
+        # 보낸 프로세스는 커밋 직후 이미 직접 무효화함
+        if message.get("instance") == INSTANCE_ID:
+            return
+        self.received += 1
+        days = message.get("dates")
+        if days is None:
+            historical_pnl_cache.invalidate_all()
+        else:
+            historical_pnl_cache.invalidate_dates(date.fromisoformat(d) for d in days)
+
+    async def _run(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(os.getenv("DATABASE_URL"))
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(PNL_CHANGED_CHANNEL, self._on_notify)
+                if self.reconnects:
+                    historical_pnl_cache.invalidate_all()
+                self.connected = True
+                await lost.wait()
+                logger.warning("pnl_invalidation.connection_lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("pnl_invalidation.listen_failed", error=e)
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            self.reconnects += 1
+            await asyncio.sleep(PNL_INVALIDATION_RETRY_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
+
+
+pnl_invalidation_listener = PnlInvalidationListener()
@@ -0,0 +1,213 @@
+import os
+import time
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+import asyncpg
+from dotenv import load_dotenv
+
+from app.crud.balance_snapshots import insert_balance_snapshots
+from app.database.tables import FUTURE_SNAPSHOT_TABLE
+from app.services.accounts import KisAccount, gather_accounts
+from app.services.kisClient import get_kis_client
+from app.utils.market_hours import KST, is_trading_hours, next_open, now_kst
+from app.utils.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# 장중 잔고 수집 주기(초). 스냅샷 시각은 이 주기 단위로 내림하여 저장
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "30"))
+
+# 버퍼에 이만큼 쌓이거나 마지막 쓰기 후 이 시간이 지나면 DB 에 씀
+SNAPSHOT_FLUSH_SIZE = int(os.getenv("SNAPSHOT_FLUSH_SIZE", "20"))
+SNAPSHOT_FLUSH_SECONDS = float(os.getenv("SNAPSHOT_FLUSH_SECONDS", "120"))
+
+# DB 장애 시 버퍼에 보관하는 최대 스냅샷 수 (넘으면 오래된 것부터 버림)
+SNAPSHOT_BUFFER_MAX = int(os.getenv("SNAPSHOT_BUFFER_MAX", "2000"))
+
+# 수집 리더 선출용 advisory lock 키 (SCHEMA_LOCK_KEY, PNL_ROLLUP_LOCK_KEY 와 겹치지 않게)
+SNAPSHOT_LOCK_KEY = 7_301_003
+
+
+def _aligned_now() -> datetime:
+    """현재 시각을 수집 주기 단위로 내림합니다. 레플리카가 여럿이어도 같은 시각 키로 모임."""
+    ts = time.time()
+    return datetime.fromtimestamp(ts - ts % SNAPSHOT_INTERVAL, tz=KST)
+
+
+async def _fetch_account_balance(account: KisAccount) -> dict:
+    """계좌 하나의 선물옵션 잔고 요약(output2)."""
+    response = await get_kis_client(**account.future).get_futureoption_balance()
+    output2 = response.get("output2") or {}
+    if isinstance(output2, list):
+        output2 = output2[0] if output2 else {}
+    return output2
+
+
+class SnapshotRecorder:
+    """
+    장중 선물옵션 잔고를 주기적으로 수집해 future_balance_snapshots 에 쓰는 write-behind 버퍼.
+    KIS_ACCOUNTS 의 모든 선물옵션 계좌를 같은 시각 키로 계좌별 행에 기록합니다.
+
+    수집은 요청 경로와 분리된 백그라운드 태스크에서 하고, 스냅샷은 메모리 버퍼에 모았다가
+    SNAPSHOT_FLUSH_SIZE 개 또는 SNAPSHOT_FLUSH_SECONDS 마다 executemany 한 번으로 씁니다.
+    쓰기가 실패하면 버퍼에 남겨 두고 다음 flush 때 다시 시도합니다.
+
+    여러 워커/레플리카 중 전용 연결로 advisory lock 을 잡은 한 프로세스만 수집합니다(KIS 호출 중복 방지).
+    리더의 연결이 끊기면 잠금이 풀리므로 다른 프로세스가 다음 시도 때 이어받습니다.
+    """
+
+    def __init__(self):
+        self._buffer: deque = deque(maxlen=SNAPSHOT_BUFFER_MAX)
+        self._task: Optional[asyncio.Task] = None
+        self._last_flush = time.monotonic()
+        self.leader = False
+        self.captured = 0
+        self.written = 0
+        self.flushes = 0
+        self.capture_errors = 0
+        self.flush_errors = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        # 남은 스냅샷을 최대한 기록
+        await self.flush()
+
+    async def capture(self) -> None:
+        """
+        모든 선물옵션 계좌의 현재 잔고를 조회해 계좌별 행으로 버퍼에 추가합니다.
+
+        한 계좌라도 조회에 실패하면 예외를 그대로 올려 그 시각의 스냅샷을 통째로 건너뜁니다.
+        일부 계좌만 기록되면 시각별 합계(OHLC)가 출렁이기 때문입니다.
+        """
+        captured_at = _aligned_now()
+        balances = await gather_accounts("future", _fetch_account_balance)
+        for account_id, output2 in balances.items():
+            if not output2:
+                continue
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(
+                FUTURE_SNAPSHOT_TABLE.record_from_kis(
+                    output2, account_id=account_id, captured_at=captured_at
+                )
+            )
+        self.captured += 1
+
+    async def flush(self) -> None:
+        """버퍼의 스냅샷을 DB 에 씁니다."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        records = list(self._buffer)
+        self._buffer.clear()
+        try:
+            await insert_balance_snapshots(records)
+        except Exception as e:
+            self.flush_errors += 1
+            logger.warning("snapshot.flush_failed", kept=len(records), error=e)
+            # 쓰는 동안 추가된 스냅샷 앞에 되돌려 놓음 (넘치면 오래된 것부터 버림)
+            pending = records + list(self._buffer)
+            self.dropped += max(len(pending) - SNAPSHOT_BUFFER_MAX, 0)
+            self._buffer = deque(pending[-SNAPSHOT_BUFFER_MAX:], maxlen=SNAPSHOT_BUFFER_MAX)
+            return
+        self.written += len(records)
+        self.flushes += 1
+
+    async def _loop(self) -> None:
+        """리더로 선출될 때까지 SNAPSHOT_INTERVAL 마다 시도하고, 선출되면 연결이 끊길 때까지 수집합니다."""
+        while True:
+            conn = None
+            recording = None
+            try:
+                conn = await asyncpg.connect(os.getenv("DATABASE_URL"))
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                while not await conn.fetchval(
+                    "SELECT pg_try_advisory_lock($1)", SNAPSHOT_LOCK_KEY
+                ):
+                    await asyncio.sleep(SNAPSHOT_INTERVAL)
+
+                self.leader = True
+                logger.info("snapshot.leader_acquired")
+                recording = asyncio.create_task(self._record())
+                waiting = asyncio.create_task(lost.wait())
+                try:
+                    await asyncio.wait(
+                        {recording, waiting}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    waiting.cancel()
+                if recording.done():
+                    recording.result()
+                logger.warning("snapshot.leader_lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("snapshot.election_failed", error=e)
+            finally:
+                self.leader = False
+                if recording is not None:
+                    recording.cancel()
+                    await asyncio.gather(recording, return_exceptions=True)
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await self.flush()
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
+
+    async def _record(self) -> None:
+        while True:
+            if not is_trading_hours():
+                await self.flush()
+                await asyncio.sleep(
+                    max((next_open() - now_kst()).total_seconds(), SNAPSHOT_INTERVAL)
+                )
+                continue
+
+            try:
+                await self.capture()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.capture_errors += 1
+                logger.warning("snapshot.capture_failed", error=e)
+
+            if (
+                len(self._buffer) >= SNAPSHOT_FLUSH_SIZE
+                or time.monotonic() - self._last_flush >= SNAPSHOT_FLUSH_SECONDS
+            ):
+                await self.flush()
+
+            # 다음 주기 경계까지 대기
+            await asyncio.sleep(SNAPSHOT_INTERVAL - time.time() % SNAPSHOT_INTERVAL)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._task is not None and not self._task.done(),
+            "leader": self.leader,
+            "interval_seconds": SNAPSHOT_INTERVAL,
+            "buffered": len(self._buffer),
+            "captured": self.captured,
+            "written": self.written,
+            "flushes": self.flushes,
+            "capture_errors": self.capture_errors,
+            "flush_errors": self.flush_errors,
+            "dropped": self.dropped,
+        }
+
+
+snapshot_recorder = SnapshotRecorder()
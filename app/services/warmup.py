@@ -0,0 +1,139 @@
+import os
+import time
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+
+from app.database.connection import get_db_connection, get_pool_stats
+from app.crud.portfolio import prepare_pnl_statements
+from app.services.accounts import get_accounts
+from app.services.kisClient import get_kis_client
+from app.services.kisSpotClient import get_kis_spot_client
+from app.services.kisTransport import get_kis_transport
+from app.utils.token_cache import get_access_token
+from app.utils.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# 단계별 최대 소요 시간(초). 넘으면 실패로 기록하고 준비 완료로 넘어감
+WARMUP_STEP_TIMEOUT = float(os.getenv("WARMUP_STEP_TIMEOUT", "20"))
+# 미리 열어 둘 DB 커넥션 수 (기본값: 풀 최소 크기)
+WARMUP_DB_CONNECTIONS = os.getenv("WARMUP_DB_CONNECTIONS")
+# KIS 도메인별로 미리 맺어 둘 keep-alive 커넥션 수
+WARMUP_KIS_CONNECTIONS = int(os.getenv("WARMUP_KIS_CONNECTIONS", "2"))
+
+
+def _kis_clients() -> list:
+    """등록된 계좌들의 선물/현물 클라이언트. 자격증명이 없는 상품은 건너뜀."""
+    clients = []
+    for account in get_accounts():
+        for factory, credentials in (
+            (get_kis_client, account.future),
+            (get_kis_spot_client, account.spot),
+        ):
+            if credentials is None:
+                continue
+            try:
+                clients.append(factory(**credentials))
+            except Exception:
+                continue
+    return clients
+
+
+async def _warm_db() -> dict:
+    """풀 커넥션을 미리 열고, 커넥션마다 손익 조회 쿼리를 statement 캐시에 올립니다."""
+    count = int(WARMUP_DB_CONNECTIONS or get_pool_stats().get("min_size", 1))
+    async with AsyncExitStack() as stack:
+        # 동시에 빌려야 서로 다른 커넥션이 열림
+        conns = await asyncio.gather(
+            *[stack.enter_async_context(get_db_connection()) for _ in range(count)]
+        )
+        prepared = await asyncio.gather(*[prepare_pnl_statements(conn) for conn in conns])
+    return {"connections": len(conns), "statements": sum(prepared)}
+
+
+async def _prefetch_tokens() -> dict:
+    """계좌들이 쓰는 KIS 접근 토큰을 미리 캐시에 올립니다. (boto3 임포트와 클라이언트 생성 포함)"""
+    secret_ids = {client.aws_secret_id for client in _kis_clients() if client.aws_secret_id}
+    await asyncio.gather(*[get_access_token(secret_id) for secret_id in secret_ids])
+    return {"secrets": len(secret_ids)}
+
+
+async def _preconnect_kis() -> dict:
+    """KIS 도메인별로 keep-alive 커넥션을 미리 맺어 첫 조회의 TCP/TLS 핸드셰이크를 없앱니다."""
+    domains = {client.domain for client in _kis_clients() if client.domain}
+    transport = get_kis_transport()
+    # 응답 코드와 무관하게 연결만 맺으면 되므로 가벼운 HEAD 요청 사용
+    results = await asyncio.gather(
+        *[
+            transport.head(domain)
+            for domain in domains
+            for _ in range(WARMUP_KIS_CONNECTIONS)
+        ],
+        return_exceptions=True,
+    )
+    failed = [r for r in results if isinstance(r, Exception)]
+    if failed and len(failed) == len(results):
+        raise failed[0]
+    return {"domains": len(domains), "connections": len(results) - len(failed)}
+
+
+class WarmUp:
+    """
+    서버 시작 직후 백그라운드에서 DB/토큰/KIS 연결을 예열하고 준비 상태를 관리합니다.
+
+    각 단계는 서로 독립적으로 동시에 진행되며, 실패하거나 시간을 넘겨도 기록만 하고 준비 완료로 넘어갑니다.
+    (KIS 나 Secrets Manager 장애가 DB 이력 조회까지 막지 않도록) 준비 완료 전에는 /health/ready 가 503 을 반환합니다.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    def start(self) -> None:
+        if not WARMUP_ENABLED:
+            self.ready = True
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        self.ready = False
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _step(self, name: str, step: Callable[[], Awaitable[dict]]) -> None:
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(step(), WARMUP_STEP_TIMEOUT)
+            self.steps[name] = {"status": "ok", **detail}
+        except Exception as e:
+            self.steps[name] = {"status": "failed", "error": str(e) or type(e).__name__}
+            logger.warning("warmup.step_failed", step=name, error=e)
+        self.steps[name]["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def run(self) -> None:
+        self.started_at = time.perf_counter()
+        await asyncio.gather(
+            self._step("db", _warm_db),
+            self._step("tokens", _prefetch_tokens),
+            self._step("kis", _preconnect_kis),
+        )
+        self.duration_ms = round((time.perf_counter() - self.started_at) * 1000, 1)
+        self.ready = True
+        logger.info("warmup.done", duration_ms=self.duration_ms, steps=self.steps)
+
+    def stats(self) -> dict:
+        return {"ready": self.ready, "duration_ms": self.duration_ms, "steps": self.steps}
+
+
+warmup = WarmUp()
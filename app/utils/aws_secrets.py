@@ -1,13 +1,41 @@
-import boto3
 import json
+import threading
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_secrets_client():
+    """
+    Secrets Manager 클라이언트는 생성 비용이 크므로 프로세스당 한 번만 만든다.
+    boto3 는 임포트만으로도 무거워서 처음 필요할 때(토큰 조회 스레드 안에서) 임포트한다.
+
+    boto3.client() 는 기본 세션을 공유하므로 여러 스레드에서 동시에 만들면 안전하지 않다.
+    잠금 안에서 전용 세션으로 한 번만 만들고, 만들어진 클라이언트는 스레드 간에 공유해도 된다.
+    """
+    global _client
+    client = _client
+    if client is None:
+        with _client_lock:
+            if _client is None:
+                import boto3
+
+                session = boto3.session.Session()
+                _client = session.client("secretsmanager", region_name="ap-northeast-2")
+            client = _client
+    return client
+
+
+def get_aws_secret_payload(secret_id: str) -> dict:
+    """
+    AWS Secrets Manager에서 JSON 시크릿 전체를 가져온다.
+    """
+    resp = _get_secrets_client().get_secret_value(SecretId=secret_id)
+    return json.loads(resp["SecretString"])
 
 
 def get_aws_secret(secret_id: str) -> str:
-    """w
+    """
     AWS Secrets Manager에서 문자열(또는 JSON)을 바로 가져온다.
     """
-    client = boto3.client("secretsmanager", region_name="ap-northeast-2")
-    resp = client.get_secret_value(SecretId=secret_id)
-
-    access_token = json.loads(resp["SecretString"])["access_token"]
-    return access_token
+    return get_aws_secret_payload(secret_id)["access_token"]
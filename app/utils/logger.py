@@ -0,0 +1,251 @@
+"""
+이벤트 루프를 막지 않는 구조화 로거.
+
+로그 한 건은 레벨 검사 → (설정된 경우) 샘플링 → 필드 정리(민감 필드 가림, 큰 값 자르기)까지만
+호출한 쪽에서 하고, JSON 직렬화와 stdout 쓰기는 백그라운드 스레드가 큐에서 꺼내 처리합니다.
+큐가 가득 차면 로그를 버리고 개수만 셉니다(응답 지연보다 로그 유실을 택함).
+
+출력 형식 (한 줄에 JSON 하나):
+    {"ts": "2024-06-25T10:12:01.123+09:00", "level": "warning", "logger": "app.services.livePnl",
+     "event": "live_pnl.fetch_failed", "error": "..."}
+
+사용법:
+    logger = get_logger(__name__)
+    logger.warning("live_pnl.fetch_failed", error=str(e))
+    logger.debug("kis.response", tr_id=tr_id, body=result)
+"""
+import os
+import sys
+import time
+import queue
+import atexit
+import random
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, Optional
+
+import orjson
+from dotenv import load_dotenv
+
+load_dotenv()
+
+KST = timezone(timedelta(hours=9))
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+_LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+_LEVELS = {name: level for level, name in _LEVEL_NAMES.items()}
+
+LOG_LEVEL = _LEVELS.get(os.getenv("LOG_LEVEL", "info").lower(), INFO)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# 문자열 필드 최대 길이, 리스트/딕셔너리 최대 항목 수, 중첩 깊이
+LOG_MAX_STRING = int(os.getenv("LOG_MAX_STRING", "1000"))
+LOG_MAX_ITEMS = int(os.getenv("LOG_MAX_ITEMS", "50"))
+LOG_MAX_DEPTH = int(os.getenv("LOG_MAX_DEPTH", "4"))
+
+# 값을 가릴 필드 이름 (대소문자 무시, 중첩된 딕셔너리에도 적용)
+_REDACT_FIELDS = frozenset(
+    field.strip().lower()
+    for field in (
+        "authorization,appkey,appsecret,app_key,app_secret,access_token,"
+        "secret,password,token,cano,acnt_prdt_cd,"
+        + os.getenv("LOG_REDACT_FIELDS", "")
+    ).split(",")
+    if field.strip()
+)
+_REDACTED = "***"
+
+
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    """ "kis.response=0.01,pnl.daily_maps=0.1" 형식의 이벤트별 샘플링 비율."""
+    rates = {}
+    for item in value.split(","):
+        event, _, rate = item.partition("=")
+        if event.strip() and rate.strip():
+            rates[event.strip()] = float(rate)
+    return rates
+
+
+LOG_SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+
+
+def _sanitize(value: Any, depth: int = 0) -> Any:
+    """민감 필드를 가리고 큰 값을 잘라 JSON 으로 직렬화할 수 있는 값으로 만듭니다."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) > LOG_MAX_STRING:
+            return f"{value[:LOG_MAX_STRING]}...(+{len(value) - LOG_MAX_STRING})"
+        return value
+    if depth >= LOG_MAX_DEPTH:
+        return f"<{type(value).__name__}>"
+    if isinstance(value, dict):
+        result = {}
+        for index, (key, item) in enumerate(value.items()):
+            if index >= LOG_MAX_ITEMS:
+                result["..."] = f"+{len(value) - LOG_MAX_ITEMS} keys"
+                break
+            key = str(key)
+            result[key] = (
+                _REDACTED if key.lower() in _REDACT_FIELDS else _sanitize(item, depth + 1)
+            )
+        return result
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)
+        result = [_sanitize(item, depth + 1) for item in items[:LOG_MAX_ITEMS]]
+        if len(items) > LOG_MAX_ITEMS:
+            result.append(f"...(+{len(items) - LOG_MAX_ITEMS})")
+        return result
+    if isinstance(value, BaseException):
+        return f"{type(value).__name__}: {value}"
+    return _sanitize(str(value), depth)
+
+
+class _Writer:
+    """큐에 쌓인 로그를 백그라운드 스레드에서 JSON 줄로 stdout 에 씁니다."""
+
+    def __init__(self, maxsize: int):
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def put(self, record: dict) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        stream = sys.stdout
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            lines = [record]
+            # 밀린 로그는 한 번에 모아 쓰기
+            while len(lines) < 256:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    self._write(stream, lines)
+                    return
+                lines.append(record)
+            self._write(stream, lines)
+
+    def _write(self, stream, records: list) -> None:
+        out = []
+        for record in records:
+            record["ts"] = datetime.fromtimestamp(record["ts"], KST).isoformat(
+                timespec="milliseconds"
+            )
+            out.append(orjson.dumps(record, default=str).decode())
+        try:
+            stream.write("\n".join(out) + "\n")
+            stream.flush()
+            self.written += len(records)
+        except Exception:
+            self.dropped += len(records)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """남은 로그를 모두 쓰고 스레드를 끝냅니다."""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        self._thread = None
+
+
+_writer = _Writer(LOG_QUEUE_SIZE)
+atexit.register(_writer.close)
+
+
+class Logger:
+    """이름(보통 모듈 __name__)이 붙은 구조화 로거."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def is_enabled(self, level: int) -> bool:
+        return level >= LOG_LEVEL
+
+    def log(self, level: int, event: str, sample: Optional[float] = None, **fields) -> None:
+        """
+        이벤트 하나를 기록합니다.
+
+        Args:
+            level: DEBUG/INFO/WARNING/ERROR
+            event: 점으로 구분한 이벤트 이름 (예: "kis.response")
+            sample: 기록할 비율 (0~1). LOG_SAMPLE_RATES 에 같은 이벤트가 있으면 그 값을 우선
+            **fields: 함께 남길 값. 민감 필드는 가리고 큰 값은 자름
+        """
+        if level < LOG_LEVEL:
+            return
+        rate = LOG_SAMPLE_RATES.get(event, sample)
+        if rate is not None and random.random() >= rate:
+            return
+        record = {
+            "ts": time.time(),
+            "level": _LEVEL_NAMES.get(level, str(level)),
+            "logger": self.name,
+            "event": event,
+        }
+        for key, value in fields.items():
+            record[key] = (
+                _REDACTED if key.lower() in _REDACT_FIELDS else _sanitize(value)
+            )
+        _writer.put(record)
+
+    def debug(self, event: str, **fields) -> None:
+        self.log(DEBUG, event, **fields)
+
+    def info(self, event: str, **fields) -> None:
+        self.log(INFO, event, **fields)
+
+    def warning(self, event: str, **fields) -> None:
+        self.log(WARNING, event, **fields)
+
+    def error(self, event: str, **fields) -> None:
+        self.log(ERROR, event, **fields)
+
+
+_loggers: Dict[str, Logger] = {}
+
+
+def get_logger(name: str) -> Logger:
+    """이름별 로거를 반환합니다."""
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers[name] = Logger(name)
+    return logger
+
+
+def close_logger() -> None:
+    """애플리케이션 종료 시 남은 로그를 모두 씁니다."""
+    _writer.close()
+
+
+def get_logger_stats() -> dict:
+    """로그 큐 지표를 반환합니다."""
+    return {
+        "level": _LEVEL_NAMES[LOG_LEVEL] if LOG_LEVEL in _LEVEL_NAMES else LOG_LEVEL,
+        "queued": _writer._queue.qsize(),
+        "written": _writer.written,
+        "dropped": _writer.dropped,
+    }
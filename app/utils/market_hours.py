@@ -0,0 +1,80 @@
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+KST = timezone(timedelta(hours=9))
+
+
+def _parse_time(value: str) -> time:
+    return datetime.strptime(value, "%H:%M").time()
+
+
+# KRX 파생상품 정규장 시간과 본정산 완료 예상 시각 (KST)
+KRX_OPEN = _parse_time(os.getenv("KRX_OPEN_TIME", "08:45"))
+KRX_CLOSE = _parse_time(os.getenv("KRX_CLOSE_TIME", "15:45"))
+KRX_SETTLEMENT = _parse_time(os.getenv("KRX_SETTLEMENT_TIME", "17:00"))
+
+# 주말 외 휴장일 (YYYY-MM-DD, 콤마 구분)
+KRX_HOLIDAYS = {
+    datetime.strptime(day.strip(), "%Y-%m-%d").date()
+    for day in os.getenv("KRX_HOLIDAYS", "").split(",")
+    if day.strip()
+}
+
+
+def now_kst() -> datetime:
+    return datetime.now(KST)
+
+
+def is_trading_day(day: date) -> bool:
+    """KRX 영업일(평일이면서 휴장일이 아닌 날)인지 확인합니다."""
+    return day.weekday() < 5 and day not in KRX_HOLIDAYS
+
+
+def is_trading_hours(now: Optional[datetime] = None) -> bool:
+    """KRX 정규장 시간인지 확인합니다."""
+    now = now or now_kst()
+    return is_trading_day(now.date()) and KRX_OPEN <= now.time() < KRX_CLOSE
+
+
+def next_trading_day(day: date) -> date:
+    """day 이후(당일 제외) 첫 KRX 영업일을 반환합니다."""
+    day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def next_open(now: Optional[datetime] = None) -> datetime:
+    """다음 정규장 개시 시각을 반환합니다."""
+    now = now or now_kst()
+    day = now.date()
+    if not (is_trading_day(day) and now.time() < KRX_OPEN):
+        day = next_trading_day(day)
+    return datetime.combine(day, KRX_OPEN, tzinfo=KST)
+
+
+def market_ttl(
+    market_ttl: float,
+    off_market_ttl: float,
+    settled_ttl: float,
+    now: Optional[datetime] = None,
+) -> float:
+    """
+    장 상태에 따른 캐시 TTL(초)을 계산합니다.
+
+    - 정규장 중: market_ttl (짧게)
+    - 장 마감 후 본정산 전: off_market_ttl
+    - 본정산 후/휴장일/장 시작 전: settled_ttl (단, 다음 장 개시 시각을 넘기지 않음)
+    """
+    now = now or now_kst()
+    if is_trading_day(now.date()):
+        if KRX_OPEN <= now.time() < KRX_CLOSE:
+            return market_ttl
+        if KRX_CLOSE <= now.time() < KRX_SETTLEMENT:
+            return off_market_ttl
+    until_open = (next_open(now) - now).total_seconds()
+    return max(1.0, min(settled_ttl, until_open))
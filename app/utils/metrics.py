@@ -0,0 +1,219 @@
+"""
+Prometheus 텍스트 형식(/metrics)으로 내보내는 경량 지표 레지스트리.
+
+prometheus_client 없이 카운터/히스토그램과, 조회 시점에 값을 모으는 수집기(collector)만 지원합니다.
+모든 갱신은 이벤트 루프 스레드에서 일어나므로 잠금 없이 dict/list 를 직접 갱신합니다.
+(시크릿 조회처럼 스레드에서 실행되는 작업도 기록은 await 이후 루프 스레드에서 합니다.)
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# 기본 지연 버킷(초): 1ms ~ 30s
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 수집기 반환 형식: (지표 이름, 타입, 설명, [(레이블 dict, 값), ...])
+Sample = Tuple[Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+_metrics: list = []
+_collectors: List[Callable[[], Iterable[Family]]] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _metrics.append(self)
+
+    def _labels(self, values: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터. 레이블 값은 선언한 labelnames 순서대로 위치 인자로 넘깁니다."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, value in sorted(self._values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(self._labels(labels))} {_format_value(value)}"
+            )
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    고정 버킷 히스토그램.
+
+    observe() 는 해당 버킷 하나만 증가시키고, 누적 합은 render() 에서 계산합니다.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 -> [버킷별 개수 (+Inf 포함), 합계, 개수]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self._values[labels] = state
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def time(self, *labels: str) -> "_Timer":
+        """with 블록의 실행 시간을 기록합니다."""
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                bucket_labels = _format_labels({**base, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(base)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(base)} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._started, *self._labels)
+        return False
+
+
+def register_collector(collector: Callable[[], Iterable[Family]]) -> None:
+    """
+    /metrics 조회 시점에 값을 모으는 수집기를 등록합니다.
+    캐시 적중률이나 풀 크기처럼 이미 다른 곳에서 집계 중인 값을 내보낼 때 사용합니다.
+    """
+    _collectors.append(collector)
+
+
+def render() -> str:
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로 만듭니다."""
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        for name, metric_type, documentation, samples in collector():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+# HTTP 요청 지표
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route"),
+)
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP responses by route template and status code",
+    ("method", "route", "status"),
+)
+
+# 지연을 재지 않는 경로 (지표 조회 자체, SSE 처럼 오래 열려 있는 스트림)
+_UNTIMED_ROUTES = frozenset({"/metrics", "/pnl/live"})
+
+
+class MetricsMiddleware:
+    """
+    라우트 템플릿(예: /pnl/intraday) 단위로 요청 지연과 상태 코드를 기록하는 ASGI 미들웨어.
+
+    실제 경로 대신 템플릿을 레이블로 써서 경로 파라미터나 잘못된 URL 때문에 시계열이 늘어나지 않게 합니다.
+    매칭되는 라우트가 없는 요청은 route="<unmatched>" 로 묶습니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "<unmatched>")
+            method = scope["method"]
+            http_requests_total.inc(method, path, str(status))
+            if path not in _UNTIMED_ROUTES:
+                http_request_duration.observe(time.perf_counter() - started, method, path)
@@ -0,0 +1,84 @@
+import os
+from datetime import date
+from typing import Any, Iterable
+from dotenv import load_dotenv
+
+from app.utils.cache import LRUCache
+
+load_dotenv()
+
+
+class PnlRangeCache(LRUCache):
+    """
+    날짜 구간으로 키가 정해지는 손익 이력 캐시.
+
+    키는 (granularity, start, end) 형태이며, 적재(ingest) 경로에서 특정 날짜가
+    쓰이면 그 날짜를 포함하는 구간의 항목만 무효화합니다.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        super().__init__(maxsize=maxsize)
+        # 무효화가 일어날 때마다 증가. 조회 도중 무효화된 결과가 저장되는 것을 막는다
+        self.version = 0
+        self.invalidations = 0
+
+    def set_if_unchanged(self, key: tuple, value: Any, version: int) -> None:
+        """조회를 시작한 시점(version) 이후 무효화가 없었을 때만 저장합니다."""
+        if version == self.version:
+            self.set(key, value)
+
+    def invalidate_dates(self, dates: Iterable[date]) -> int:
+        """
+        주어진 날짜를 포함하는 구간의 캐시 항목을 제거합니다.
+
+        Returns:
+            int: 제거된 항목 수
+        """
+        dates = list(dates)
+        self.version += 1
+        removed = 0
+        for key in self.keys():
+            _, start, end = key
+            if any(start <= d <= end for d in dates):
+                self.pop(key)
+                removed += 1
+        self.invalidations += removed
+        return removed
+
+    def invalidate_all(self) -> int:
+        """
+        모든 항목을 제거합니다. (전체 재계산이나, 다른 프로세스의 무효화 알림을 놓쳤을 수 있을 때)
+
+        Returns:
+            int: 제거된 항목 수
+        """
+        self.version += 1
+        removed = len(self)
+        self.clear()
+        self.invalidations += removed
+        return removed
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+# DB 이력 손익 (적재 시 무효화)
+historical_pnl_cache = PnlRangeCache(maxsize=int(os.getenv("PNL_CACHE_SIZE", "128")))
+
+# KIS 에서 가져온 오늘 손익 (짧은 TTL)
+live_pnl_cache = LRUCache(maxsize=16, ttl=float(os.getenv("PNL_LIVE_TTL", "10")))
+
+
+def invalidate_pnl_dates(dates: Iterable[date]) -> int:
+    """적재 경로에서 날짜가 쓰였을 때 호출하여 해당 날짜의 손익 캐시를 무효화합니다."""
+    return historical_pnl_cache.invalidate_dates(dates)
+
+
+def get_pnl_cache_stats() -> dict:
+    """손익 캐시 지표를 반환합니다."""
+    return {
+        "historical": historical_pnl_cache.stats(),
+        "live": live_pnl_cache.stats(),
+    }
@@ -0,0 +1,172 @@
+import os
+import time
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+
+from app.utils.aws_secrets import get_aws_secret_payload
+from app.utils.metrics import Histogram
+from app.utils.tracing import span
+
+load_dotenv()
+
+KST = timezone(timedelta(hours=9))
+
+# KIS 토큰 발급 응답의 만료시각 필드 (예: "2024-06-25 10:12:01", KST)
+_EXPIRY_FIELD = "access_token_token_expired"
+_EXPIRY_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+secret_fetch_duration = Histogram(
+    "secret_fetch_duration_seconds", "Secrets Manager token fetch latency", ("result",)
+)
+
+
+@dataclass
+class _TokenEntry:
+    token: str
+    fetched_at: float
+    refresh_at: float
+    expires_at: float
+
+
+class TokenCache:
+    """
+    시크릿 ID 별 KIS 접근 토큰 캐시.
+
+    - 토큰의 만료시각을 따르고, 만료 전에 미리(백그라운드로) 갱신합니다.
+    - 같은 시크릿에 대한 동시 갱신 요청은 하나의 조회로 합칩니다(single-flight).
+    - 시크릿 조회(fetcher)는 블로킹 호출이므로 스레드에서 실행합니다.
+
+    Args:
+        fetcher: secret_id 를 받아 시크릿 JSON(dict)을 반환하는 동기 함수
+        default_ttl: 만료시각을 알 수 없을 때 사용할 TTL(초)
+        refresh_margin: 만료 몇 초 전부터 미리 갱신할지
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[str], dict],
+        default_ttl: float = 300.0,
+        refresh_margin: float = 300.0,
+    ):
+        self._fetcher = fetcher
+        self._default_ttl = default_ttl
+        self._refresh_margin = refresh_margin
+        self._entries: Dict[str, _TokenEntry] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def _parse_expiry(self, payload: dict, fetched_at: float) -> float:
+        expired = payload.get(_EXPIRY_FIELD)
+        if expired:
+            try:
+                return (
+                    datetime.strptime(expired, _EXPIRY_FORMAT)
+                    .replace(tzinfo=KST)
+                    .timestamp()
+                )
+            except ValueError:
+                pass
+        return fetched_at + self._default_ttl
+
+    async def _fetch(self, secret_id: str) -> str:
+        self.refreshes += 1
+        started = time.perf_counter()
+        try:
+            with span("secret.fetch", secret_id=secret_id):
+                payload = await asyncio.to_thread(self._fetcher, secret_id)
+        except Exception:
+            self.errors += 1
+            secret_fetch_duration.observe(time.perf_counter() - started, "error")
+            raise
+        secret_fetch_duration.observe(time.perf_counter() - started, "ok")
+
+        fetched_at = time.time()
+        expires_at = self._parse_expiry(payload, fetched_at)
+        # 유효기간이 짧은 토큰은 절반이 지났을 때 갱신
+        margin = min(self._refresh_margin, (expires_at - fetched_at) / 2)
+        entry = _TokenEntry(
+            token=payload["access_token"],
+            fetched_at=fetched_at,
+            refresh_at=expires_at - margin,
+            expires_at=expires_at,
+        )
+        self._entries[secret_id] = entry
+        return entry.token
+
+    def _start_refresh(self, secret_id: str) -> asyncio.Task:
+        task = self._inflight.get(secret_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch(secret_id))
+            self._inflight[secret_id] = task
+            task.add_done_callback(lambda t: self._on_refresh_done(secret_id, t))
+        return task
+
+    def _on_refresh_done(self, secret_id: str, task: asyncio.Task) -> None:
+        self._inflight.pop(secret_id, None)
+        # 백그라운드 갱신 실패는 다음 요청에서 다시 시도되므로 예외만 소비한다
+        if not task.cancelled():
+            task.exception()
+
+    async def get(self, secret_id: str) -> str:
+        """
+        시크릿 ID 에 해당하는 접근 토큰을 반환합니다.
+
+        Args:
+            secret_id (str): AWS 시크릿 ID
+
+        Returns:
+            str: 접근 토큰
+        """
+        entry = self._entries.get(secret_id)
+        now = time.time()
+        if entry is not None and now < entry.expires_at:
+            self.hits += 1
+            if now >= entry.refresh_at:
+                self._start_refresh(secret_id)
+            return entry.token
+
+        self.misses += 1
+        # 요청이 취소되어도 다른 대기자를 위해 조회는 계속 진행
+        return await asyncio.shield(self._start_refresh(secret_id))
+
+    def invalidate(self, secret_id: Optional[str] = None) -> None:
+        """캐시된 토큰을 제거합니다. secret_id 가 없으면 전체를 비웁니다."""
+        if secret_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(secret_id, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "inflight": len(self._inflight),
+        }
+
+
+token_cache = TokenCache(
+    get_aws_secret_payload,
+    default_ttl=float(os.getenv("KIS_TOKEN_DEFAULT_TTL", "300")),
+    refresh_margin=float(os.getenv("KIS_TOKEN_REFRESH_MARGIN", "300")),
+)
+
+
+async def get_access_token(secret_id: str) -> str:
+    """공유 토큰 캐시에서 KIS 접근 토큰을 가져옵니다."""
+    return await token_cache.get(secret_id)
+
+
+def get_token_cache_stats() -> dict:
+    """토큰 캐시 적중/미스 지표를 반환합니다."""
+    return token_cache.stats()
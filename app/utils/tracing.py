@@ -0,0 +1,214 @@
+"""
+요청 단위 경량 span 추적.
+
+요청마다 Trace 하나를 contextvar 에 두고, DB 커넥션 획득/쿼리, 토큰 조회, KIS 호출 구간을 span 으로 기록합니다.
+응답에는 span 이름별 합계를 Server-Timing 헤더로 붙이고(브라우저 개발자 도구의 Timing 탭에서 확인,
+TRACE_ENABLED 로 켰을 때만),
+TRACE_DEBUG_SAMPLE_RATE 비율로 샘플링된 요청은 span 트리 전체를 로그로 남깁니다.
+
+추적 중이 아닌 곳(백그라운드 작업, 응답이 끝난 뒤 남은 작업)에서 span() 은 contextvar 조회 한 번 뒤
+아무것도 하지 않는 공용 객체를 돌려주므로 비용이 거의 없습니다.
+
+사용법:
+    with span("kis.request", tr_id="CTFO6118R"):
+        ...
+"""
+import os
+import time
+import random
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+# 응답에 Server-Timing 헤더를 붙일지 여부 (끄면 디버그 샘플링된 요청에만 Trace 를 만듦).
+# 헤더가 내부 구간(DB, Secrets Manager, KIS)의 시간을 외부에 드러내므로 개발/내부망에서만 켬
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "false").lower() in ("1", "true", "yes")
+# span 트리를 로그로 남길 요청 비율 (0 이면 남기지 않음)
+TRACE_DEBUG_SAMPLE_RATE = float(os.getenv("TRACE_DEBUG_SAMPLE_RATE", "0"))
+# 요청 하나에 기록하는 최대 span 수 (SSE 처럼 오래 열린 요청의 메모리 상한)
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "256"))
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_parent: ContextVar[Optional["Span"]] = ContextVar("trace_parent", default=None)
+
+
+class Span:
+    __slots__ = ("trace", "name", "attrs", "parent", "start", "end", "_token")
+
+    def __init__(self, trace: "Trace", name: str, attrs: dict, parent: Optional["Span"]):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.start = 0.0
+        self.end = 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        self._token = _parent.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end = time.perf_counter()
+        _parent.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.trace.add(self)
+        return False
+
+
+class _NoopSpan:
+    """추적 중이 아닐 때 span() 이 돌려주는 객체."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Trace:
+    """요청 하나의 span 모음."""
+
+    __slots__ = ("name", "started", "spans", "dropped", "closed", "debug")
+
+    def __init__(self, name: str, debug: bool = False):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.closed = False
+        self.debug = debug
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < TRACE_MAX_SPANS:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def totals(self) -> Dict[str, tuple]:
+        """span 이름별 (개수, 합계 초). 동시에 진행된 span 은 합계가 요청 시간보다 클 수 있음."""
+        totals: Dict[str, list] = {}
+        for span in self.spans:
+            entry = totals.setdefault(span.name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += span.duration
+        return {name: tuple(entry) for name, entry in totals.items()}
+
+    def server_timing(self) -> str:
+        parts = [
+            f'{name};dur={total * 1000:.1f};desc="x{count}"'
+            for name, (count, total) in self.totals().items()
+        ]
+        parts.append(f"app;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+    def tree_lines(self) -> List[str]:
+        """span 마다 시작 시각 기준 오프셋과 소요 시간을 담은 줄을 부모-자식 순서로 들여써서 만듭니다."""
+        children: Dict[Optional[Span], List[Span]] = {}
+        recorded = set(map(id, self.spans))
+        for span in self.spans:
+            # 부모가 기록되지 않았으면(상한 초과 등) 최상위로 올림
+            parent = span.parent if span.parent is not None and id(span.parent) in recorded else None
+            children.setdefault(parent, []).append(span)
+
+        lines: List[str] = []
+
+        def walk(parent: Optional[Span], depth: int) -> None:
+            for span in sorted(children.get(parent, []), key=lambda s: s.start):
+                attrs = " ".join(f"{k}={v}" for k, v in span.attrs.items())
+                lines.append(
+                    f"{'  ' * depth}+{(span.start - self.started) * 1000:.1f}ms "
+                    f"{span.name} {span.duration * 1000:.1f}ms {attrs}".rstrip()
+                )
+                walk(span, depth + 1)
+
+        walk(None, 0)
+        return lines
+
+
+def span(name: str, **attrs):
+    """
+    현재 요청의 Trace 에 구간 하나를 기록하는 컨텍스트 매니저를 반환합니다.
+    추적 중이 아니면 아무것도 하지 않습니다.
+    """
+    trace = _trace.get()
+    if trace is None or trace.closed:
+        return _NOOP
+    return Span(trace, name, attrs, _parent.get())
+
+
+def record_span(name: str, duration: float, **attrs) -> None:
+    """
+    이미 끝난 구간(예: asyncpg 쿼리 로거가 알려 주는 쿼리 시간)을 지금 끝난 것으로 기록합니다.
+    """
+    trace = _trace.get()
+    if trace is None or trace.closed:
+        return
+    finished = Span(trace, name, attrs, _parent.get())
+    finished.end = time.perf_counter()
+    finished.start = finished.end - duration
+    trace.add(finished)
+
+
+class TracingMiddleware:
+    """
+    요청마다 Trace 를 만들고, 응답 시작 시 Server-Timing 헤더를 붙이는 ASGI 미들웨어.
+
+    TRACE_ENABLED 가 꺼져 있으면 헤더는 붙이지 않고, 디버그 샘플링된 요청에만 Trace 를 만들어 로그로 남깁니다.
+
+    스트리밍 응답은 헤더를 보내는 시점까지의 span 만 헤더에 포함됩니다.
+    요청이 끝나면 Trace 를 닫아 요청 중에 시작된 백그라운드 작업(실시간 손익 poller 등)의 span 이
+    더 이상 쌓이지 않게 합니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (TRACE_ENABLED or TRACE_DEBUG_SAMPLE_RATE > 0):
+            await self.app(scope, receive, send)
+            return
+
+        debug = TRACE_DEBUG_SAMPLE_RATE > 0 and random.random() < TRACE_DEBUG_SAMPLE_RATE
+        if not TRACE_ENABLED and not debug:
+            await self.app(scope, receive, send)
+            return
+        trace = Trace(f"{scope['method']} {scope['path']}", debug=debug)
+        token = _trace.set(trace)
+
+        async def send_wrapper(message):
+            if TRACE_ENABLED and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            trace.closed = True
+            _trace.reset(token)
+            if trace.debug:
+                logger.info(
+                    "trace.sampled",
+                    request=trace.name,
+                    duration_ms=round((time.perf_counter() - trace.started) * 1000, 1),
+                    dropped=trace.dropped,
+                    spans=trace.tree_lines(),
+                )
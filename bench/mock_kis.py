@@ -0,0 +1,291 @@
+"""
+벤치마크용 로컬 KIS 대역 서버.
+
+실제 KIS 대신 CTFO6117R(잔고정산손익), CTFO6118R(잔고현황), TTTC8708R(기간별손익일별합산)
+응답을 날짜별로 결정적인 값으로 만들어 돌려주고, 지연/오류/연속조회를 설정할 수 있습니다.
+접근 토큰은 AWS Secrets Manager 를 흉내 낸 엔드포인트(POST /)가 발급하므로
+앱 쪽에 AWS_ENDPOINT_URL_SECRETS_MANAGER 만 지정하면 코드 변경 없이 붙일 수 있습니다.
+
+사용법:
+    python -m bench.mock_kis --port 9443 --latency-ms 80 --jitter-ms 40 \\
+        --error-rate 0.01 --rate-limit-rate 0.02 --page-size 20
+"""
+import os
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import List, Tuple
+
+import orjson
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
+
+from app.utils.market_hours import KST, is_trading_day
+
+
+class MockSettings:
+    """대역 서버 동작 설정. 실행 중에도 POST /__config 로 바꿀 수 있습니다."""
+
+    def __init__(self):
+        self.latency_ms = float(os.getenv("MOCK_KIS_LATENCY_MS", "50"))
+        self.jitter_ms = float(os.getenv("MOCK_KIS_JITTER_MS", "20"))
+        # HTTP 500 으로 응답할 비율
+        self.error_rate = float(os.getenv("MOCK_KIS_ERROR_RATE", "0"))
+        # 초당 거래건수 초과(EGW00201)로 응답할 비율
+        self.rate_limit_rate = float(os.getenv("MOCK_KIS_RATE_LIMIT_RATE", "0"))
+        # 연속조회 한 페이지의 행 수
+        self.page_size = int(os.getenv("MOCK_KIS_PAGE_SIZE", "20"))
+        # 잔고현황/잔고정산손익의 종목 행 수
+        self.positions = int(os.getenv("MOCK_KIS_POSITIONS", "30"))
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+settings = MockSettings()
+stats: Counter = Counter()
+
+app = FastAPI(title="Mock KIS", default_response_class=ORJSONResponse)
+
+
+def seeded_rng(*parts) -> random.Random:
+    """같은 인자에는 항상 같은 값을 내도록 인자로부터 난수 생성기를 만듭니다."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+
+def random_amount(rng: random.Random, scale: int = 1_000_000) -> str:
+    return str(int(rng.gauss(0, scale)))
+
+
+async def _simulate_upstream(tr_id: str):
+    """
+    설정된 지연을 적용하고, 확률에 따라 오류 응답을 반환합니다.
+
+    Returns:
+        오류 응답 또는 정상 처리할 때 None
+    """
+    stats[f"requests:{tr_id}"] += 1
+    delay = settings.latency_ms + random.uniform(-1, 1) * settings.jitter_ms
+    await asyncio.sleep(max(delay, 0) / 1000)
+
+    roll = random.random()
+    if roll < settings.error_rate:
+        stats[f"errors:{tr_id}"] += 1
+        return Response(status_code=500, content=b"mock upstream error")
+    if roll < settings.error_rate + settings.rate_limit_rate:
+        stats[f"rate_limited:{tr_id}"] += 1
+        return ORJSONResponse(
+            {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+        )
+    return None
+
+
+def _page(rows: List[dict], request: Request, key_param: str) -> Tuple[List[dict], str, str]:
+    """
+    연속조회 키(행 오프셋)로 한 페이지를 잘라냅니다.
+
+    Returns:
+        (페이지 행, 다음 페이지 키, 응답 헤더 tr_cont)
+    """
+    offset = int(request.query_params.get(key_param) or 0)
+    end = offset + settings.page_size
+    page = rows[offset:end]
+    if end < len(rows):
+        return page, str(end), "M" if offset else "F"
+    return page, "", "E" if offset else "D"
+
+
+def _ok(body: dict, tr_cont: str) -> Response:
+    body.update(rt_cd="0", msg_cd="MCA00000", msg1="정상처리 되었습니다.")
+    return Response(
+        orjson.dumps(body), media_type="application/json", headers={"tr_cont": tr_cont}
+    )
+
+
+def future_output2(day: date, account_id: str = "") -> dict:
+    """CTFO6117R/CTFO6118R output2 (계좌 잔고 합계)."""
+    rng = seeded_rng("future", account_id, day)
+    trad = int(rng.gauss(0, 2_000_000))
+    evlu = int(rng.gauss(0, 1_000_000))
+    return {
+        "dnca_cash": str(rng.randint(50_000_000, 60_000_000)),
+        "tot_dncl_amt": str(rng.randint(80_000_000, 90_000_000)),
+        "mgna_tota": str(rng.randint(10_000_000, 20_000_000)),
+        "futr_trad_pfls_amt": str(trad),
+        "opt_trad_pfls_amt": random_amount(rng, 200_000),
+        "futr_evlu_pfls_amt": str(evlu),
+        "opt_evlu_pfls_amt": random_amount(rng, 100_000),
+        "trad_pfls_amt_smtl": str(trad),
+        "evlu_pfls_amt_smtl": str(evlu),
+        "fee": str(rng.randint(1_000, 50_000)),
+    }
+
+
+def spot_row(day: date, account_id: str = "") -> dict:
+    """TTTC8708R output1 의 일자 행 하나."""
+    rng = seeded_rng("spot", account_id, day)
+    return {
+        "trad_dt": day.strftime("%Y%m%d"),
+        "buy_amt": str(rng.randint(0, 50_000_000)),
+        "sll_amt": str(rng.randint(0, 50_000_000)),
+        "rlzt_pfls": random_amount(rng),
+        "fee": str(rng.randint(0, 30_000)),
+        "loan_int": "0",
+        "tl_tax": str(rng.randint(0, 50_000)),
+        "pfls_rt": f"{rng.gauss(0, 1):.2f}",
+        "sll_qty1": str(rng.randint(0, 1_000)),
+        "buy_qty1": str(rng.randint(0, 1_000)),
+    }
+
+
+def _future_positions(day: date) -> List[dict]:
+    rng = seeded_rng("positions", day)
+    return [
+        {
+            "pdno": f"1{index:07d}",
+            "prdt_name": f"MOCK F {index}",
+            "cblc_qty": str(rng.randint(1, 20)),
+            "evlu_pfls_amt": random_amount(rng, 300_000),
+        }
+        for index in range(settings.positions)
+    ]
+
+
+@app.get("/uapi/domestic-futureoption/v1/trading/inquire-balance-settlement-pl")
+async def balance_settlement(request: Request):
+    """CTFO6117R 선물옵션 잔고정산손익내역 (INQR_DT 기준)."""
+    error = await _simulate_upstream("CTFO6117R")
+    if error is not None:
+        return error
+    day = datetime.strptime(request.query_params["INQR_DT"], "%Y%m%d").date()
+    if not is_trading_day(day):
+        return _ok({"output1": [], "output2": {}}, "D")
+    rows, next_key, tr_cont = _page(_future_positions(day), request, "CTX_AREA_NK200")
+    return _ok(
+        {
+            "output1": rows,
+            "output2": future_output2(day),
+            "ctx_area_fk200": "",
+            "ctx_area_nk200": next_key,
+        },
+        tr_cont,
+    )
+
+
+@app.get("/uapi/domestic-futureoption/v1/trading/inquire-balance")
+async def futureoption_balance(request: Request):
+    """CTFO6118R 선물옵션 잔고현황 (오늘 기준)."""
+    error = await _simulate_upstream("CTFO6118R")
+    if error is not None:
+        return error
+    today = datetime.now(KST).date()
+    rows, next_key, tr_cont = _page(_future_positions(today), request, "CTX_AREA_NK200")
+    return _ok(
+        {
+            "output1": rows,
+            "output2": future_output2(today),
+            "ctx_area_fk200": "",
+            "ctx_area_nk200": next_key,
+        },
+        tr_cont,
+    )
+
+
+@app.get("/uapi/domestic-stock/v1/trading/inquire-period-profit")
+async def period_profit(request: Request):
+    """TTTC8708R 기간별손익일별합산 (INQR_STRT_DT ~ INQR_END_DT, 최근 순)."""
+    error = await _simulate_upstream("TTTC8708R")
+    if error is not None:
+        return error
+    start = datetime.strptime(request.query_params["INQR_STRT_DT"], "%Y%m%d").date()
+    end = datetime.strptime(request.query_params["INQR_END_DT"], "%Y%m%d").date()
+
+    days = []
+    day = end
+    while day >= start:
+        if is_trading_day(day):
+            days.append(day)
+        day -= timedelta(days=1)
+
+    rows = [spot_row(day) for day in days]
+    page, next_key, tr_cont = _page(rows, request, "CTX_AREA_NK100")
+    return _ok(
+        {
+            "output1": page,
+            "output2": {"tot_rlzt_pfls": str(sum(int(r["rlzt_pfls"]) for r in rows))},
+            "ctx_area_fk100": "",
+            "ctx_area_nk100": next_key,
+        },
+        tr_cont,
+    )
+
+
+@app.post("/")
+async def secrets_manager(request: Request):
+    """AWS Secrets Manager GetSecretValue 대역. 모든 시크릿에 같은 모의 토큰을 돌려줍니다."""
+    stats["secret_fetches"] += 1
+    body = orjson.loads(await request.body() or b"{}")
+    expires = datetime.now(KST) + timedelta(hours=24)
+    secret = {
+        "access_token": "mock-access-token",
+        "access_token_token_expired": expires.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return Response(
+        orjson.dumps(
+            {
+                "ARN": f"arn:aws:secretsmanager:ap-northeast-2:000000000000:secret:{body.get('SecretId')}",
+                "Name": body.get("SecretId"),
+                "SecretString": orjson.dumps(secret).decode(),
+                "VersionId": "mock",
+                "CreatedDate": time.time(),
+            }
+        ),
+        media_type="application/x-amz-json-1.1",
+    )
+
+
+@app.get("/__stats")
+async def get_stats():
+    """tr_id 별 요청/오류 수와 현재 설정."""
+    return {"settings": settings.as_dict(), "counters": dict(stats)}
+
+
+@app.post("/__config")
+async def update_config(request: Request):
+    """실행 중에 지연/오류율/페이지 크기 등을 바꿉니다. (시나리오별 조건 변경용)"""
+    for key, value in (await request.json()).items():
+        if hasattr(settings, key):
+            setattr(settings, key, type(getattr(settings, key))(value))
+    stats.clear()
+    return settings.as_dict()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="벤치마크용 로컬 KIS 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--latency-ms", type=float, default=settings.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=settings.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=settings.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=settings.rate_limit_rate)
+    parser.add_argument("--page-size", type=int, default=settings.page_size)
+    parser.add_argument("--positions", type=int, default=settings.positions)
+    args = parser.parse_args()
+
+    settings.latency_ms = args.latency_ms
+    settings.jitter_ms = args.jitter_ms
+    settings.error_rate = args.error_rate
+    settings.rate_limit_rate = args.rate_limit_rate
+    settings.page_size = args.page_size
+    settings.positions = args.positions
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+실행 중인 API 서버에 부하 시나리오를 보내고 처리량과 지연 분위수(p50/p95/p99)를 보고합니다.
+
+시나리오마다 --concurrency 개의 워커가 --duration 초 동안 요청을 연속으로 보내며,
+처음 --warmup 초의 요청은 집계에서 뺍니다 (커넥션 풀, 토큰, 캐시 예열).
+--baseline 으로 이전 결과(JSON)를 주면 p95 나 처리량이 --max-regression 비율보다 나빠진
+시나리오를 표시하고 종료 코드 1 로 끝나므로 배포 전 점검에 사용할 수 있습니다.
+
+사용법:
+    python -m bench.run --base-url http://127.0.0.1:8000 --scenarios pnl_daily,pnl_monthly \\
+        --concurrency 16 --duration 30 --output bench-result.json
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+# 요청 하나: (경로, 쿼리 파라미터)
+Request = Tuple[str, Dict[str, str]]
+
+
+def _random_past_day(years: int = 3) -> date:
+    return date.today() - timedelta(days=random.randint(1, 365 * years))
+
+
+def _kis_settlement() -> Request:
+    day = _random_past_day()
+    return "/kis/futures/balance-settlement", {"inqr_dt": day.strftime("%Y%m%d")}
+
+
+def _kis_spot_profit() -> Request:
+    start = _random_past_day()
+    end = start + timedelta(days=random.randint(1, 60))
+    return "/kis/spot/inquire-balance-daily-profit", {
+        "start_date": start.strftime("%Y%m%d"),
+        "end_date": end.strftime("%Y%m%d"),
+    }
+
+
+def _pnl_range() -> Request:
+    start = _random_past_day()
+    return "/pnl", {
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=random.randint(30, 730))).isoformat(),
+        "granularity": random.choice(("day", "week", "month")),
+    }
+
+
+def _mixed() -> Request:
+    # 대시보드 접속 비율을 흉내 낸 혼합 부하
+    return random.choices(
+        [
+            lambda: ("/pnl/daily", {}),
+            lambda: ("/pnl/monthly", {}),
+            _pnl_range,
+            lambda: ("/kis/futureoption/balance", {}),
+            _kis_settlement,
+        ],
+        weights=[50, 20, 15, 10, 5],
+    )[0]()
+
+
+# 시나리오 이름 -> 요청 생성 함수
+SCENARIOS: Dict[str, Callable[[], Request]] = {
+    "pnl_daily": lambda: ("/pnl/daily", {}),
+    "pnl_monthly": lambda: ("/pnl/monthly", {}),
+    "pnl_range": _pnl_range,
+    "kis_futureoption_balance": lambda: ("/kis/futureoption/balance", {}),
+    "kis_balance_settlement": _kis_settlement,
+    "kis_spot_profit": _kis_spot_profit,
+    "mixed": _mixed,
+}
+
+
+@dataclass
+class ScenarioResult:
+    """시나리오 하나의 측정 결과."""
+
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    transport_errors: int = 0
+    elapsed: float = 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    def summary(self) -> dict:
+        count = len(self.latencies_ms)
+        failed = sum(n for status, n in self.statuses.items() if status >= 400)
+        return {
+            "requests": count,
+            "throughput_rps": count / self.elapsed if self.elapsed else 0.0,
+            "error_rate": (failed + self.transport_errors) / count if count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": max(self.latencies_ms, default=0.0),
+            "mean_ms": sum(self.latencies_ms) / count if count else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "transport_errors": self.transport_errors,
+        }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> ScenarioResult:
+    """워커 concurrency 개로 duration 초 동안 요청을 보내고 예열 이후 요청만 집계합니다."""
+    make_request = SCENARIOS[name]
+    result = ScenarioResult(name)
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    async def worker():
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            path, params = make_request()
+            try:
+                response = await client.get(path, params=params)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            finished = time.perf_counter()
+            if now < measure_from:
+                continue
+            result.latencies_ms.append((finished - now) * 1000)
+            if status is None:
+                result.transport_errors += 1
+            else:
+                result.statuses[status] += 1
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    result.elapsed = time.perf_counter() - measure_from
+    return result
+
+
+def _compare(
+    results: Dict[str, dict], baseline: Dict[str, dict], max_regression: float
+) -> List[str]:
+    """기준 결과보다 p95 가 늘었거나 처리량이 줄어든 시나리오를 찾습니다."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']:.1f}ms -> {current['p95_ms']:.1f}ms"
+            )
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - max_regression):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']:.1f} -> "
+                f"{current['throughput_rps']:.1f} req/s"
+            )
+    return regressions
+
+
+def _print_table(results: Dict[str, dict]) -> None:
+    header = f"{'scenario':<26}{'req':>8}{'req/s':>10}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, s in results.items():
+        print(
+            f"{name:<26}{s['requests']:>8}{s['throughput_rps']:>10.1f}"
+            f"{s['error_rate'] * 100:>6.1f}%{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}"
+        )
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="API 부하 시나리오 벤치마크")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--scenarios",
+        default="pnl_daily,pnl_monthly,kis_futureoption_balance,kis_balance_settlement,kis_spot_profit",
+        help=f"콤마로 구분 ({', '.join(SCENARIOS)})",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0, help="요청 파라미터 난수 시드")
+    parser.add_argument("--mock-url", help="대역 KIS 서버 주소 (시나리오별 upstream 호출 수 보고)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",")]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    random.seed(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results: Dict[str, dict] = {}
+    async with httpx.AsyncClient(
+        base_url=args.base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        for name in names:
+            if args.mock_url:
+                # 시나리오별 upstream 호출 수를 보기 위해 대역 서버 카운터 초기화
+                await client.post(f"{args.mock_url}/__config", json={})
+            result = await run_scenario(
+                client, name, args.concurrency, args.duration, args.warmup
+            )
+            results[name] = result.summary()
+            if args.mock_url:
+                counters = (await client.get(f"{args.mock_url}/__stats")).json()["counters"]
+                results[name]["upstream"] = counters
+
+    _print_table(results)
+
+    report = {
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["scenarios"]
+        regressions = _compare(results, baseline, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,103 @@
+"""
+벤치마크용 로컬 Postgres 에 수년 치 daily_*_balance_kis 행을 채우고 pnl_rollup 을 다시 계산합니다.
+
+값은 대역 KIS 서버(bench.mock_kis)와 같은 생성 함수로 (계좌, 날짜)별로 정해지므로 실행할 때마다 같은 데이터가 만들어집니다.
+운영 DB 에 실수로 쓰지 않도록 DATABASE_URL 의 DB 이름에 "bench" 가 들어 있거나 --force 를 줘야 실행합니다.
+
+사용법:
+    DATABASE_URL=postgresql://postgres@localhost/dash_bench python -m bench.seed --years 5
+"""
+import os
+import time
+import asyncio
+import argparse
+from datetime import date, timedelta
+from typing import List
+
+from app.database.connection import init_db_pool, close_db_pool, get_db_connection
+from app.database.schema import ensure_schema
+from app.database.tables import FUTURE_BALANCE_TABLE, SPOT_BALANCE_TABLE, DEFAULT_ACCOUNT_ID
+from app.crud.pnl_rollup import rebuild_pnl_rollup
+from app.utils.market_hours import is_trading_day, now_kst
+from bench.mock_kis import future_output2, spot_row
+
+# 한 번의 executemany 로 쓰는 행 수
+SEED_BATCH_SIZE = 1000
+
+
+def _trading_days(years: int) -> List[date]:
+    end = now_kst().date() - timedelta(days=1)
+    day = end - timedelta(days=365 * years)
+    days = []
+    while day <= end:
+        if is_trading_day(day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+async def _write(query: str, records: list) -> None:
+    for i in range(0, len(records), SEED_BATCH_SIZE):
+        async with get_db_connection() as conn:
+            await conn.executemany(query, records[i : i + SEED_BATCH_SIZE])
+
+
+async def seed(years: int, accounts: List[str], reset: bool) -> None:
+    await ensure_schema()
+    days = _trading_days(years)
+
+    if reset:
+        async with get_db_connection() as conn:
+            await conn.execute(
+                "TRUNCATE daily_future_balance_kis, daily_spot_balance_kis, pnl_rollup"
+            )
+
+    started = time.perf_counter()
+    for account_id in accounts:
+        future_records = [
+            FUTURE_BALANCE_TABLE.record_from_kis(
+                future_output2(day, account_id), account_id=account_id, date=day
+            )
+            for day in days
+        ]
+        spot_records = [
+            SPOT_BALANCE_TABLE.record_from_kis(
+                spot_row(day, account_id), account_id=account_id
+            )
+            for day in days
+        ]
+        await _write(FUTURE_BALANCE_TABLE.upsert_sql, future_records)
+        await _write(SPOT_BALANCE_TABLE.upsert_sql, spot_records)
+        print(f"{account_id}: 영업일 {len(days)}일 x 2 테이블 적재")
+
+    count = await rebuild_pnl_rollup()
+    print(
+        f"pnl_rollup 재계산 완료: 일별 {count}건 "
+        f"({days[0]} ~ {days[-1]}, {time.perf_counter() - started:.1f}s)"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="벤치마크용 DB 시드")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument(
+        "--accounts",
+        default=DEFAULT_ACCOUNT_ID,
+        help="콤마로 구분된 계좌 ID 목록",
+    )
+    parser.add_argument("--reset", action="store_true", help="기존 잔고/롤업 행을 지우고 시작")
+    parser.add_argument("--force", action="store_true", help="DB 이름 검사를 건너뜀")
+    args = parser.parse_args()
+
+    if "bench" not in os.getenv("DATABASE_URL", "") and not args.force:
+        raise SystemExit("DATABASE_URL 에 'bench' 가 없습니다. 벤치마크 전용 DB 인지 확인 후 --force")
+
+    await init_db_pool()
+    try:
+        await seed(args.years, [a.strip() for a in args.accounts.split(",")], args.reset)
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())